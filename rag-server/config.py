@@ -14,12 +14,17 @@ class CloudQdrantConfig(BaseModel):
     collection: str
     timeout: int = 30
     retry_attempts: int = 3
+    prefer_grpc: bool = False  # gRPC transport (port grpc_port) instead of REST
+    grpc_port: int = 6334
+    scalar_quantization: bool = False  # int8 quantized vectors kept in RAM (new collections only)
 
 class LocalQdrantConfig(BaseModel):
     path: str
     collection: str
     recreate_if_exists: bool = False
     enabled: bool = False  # Disable local storage by default
+    hot_cache: bool = False  # Serve local searches from an in-memory vector matrix
+    hot_cache_max_points: int = 100000  # Auto-disable hot cache above this many chunks
 
 class EmbeddingModelsConfig(BaseModel):
     """Embedding models configuration - separate models for docs and code"""
@@ -60,6 +65,14 @@ class Config(BaseModel):
     hybrid_retrieval: HybridRetrievalConfig = HybridRetrievalConfig()
     chunking: ChunkingConfig = ChunkingConfig()
     code_paths: list[str] = []
+    embedding_backend: str = "torch"  # "torch" (SentenceTransformer fp32) or "onnx_int8" (ONNX Runtime, quantized)
+    embedding_onnx_file: str = "onnx/model_quint8_avx2.onnx"  # ONNX file in the model repo for onnx_int8
+    embedding_cache_path: Optional[str] = None  # SQLite file for persistent embedding cache (relative to rag-server/)
+    parser_cache_path: Optional[str] = None  # SQLite file caching parsed code elements by content hash (relative to rag-server/)
+    file_index_path: Optional[str] = None  # SQLite file of (mtime, size) per indexed code file; unchanged files are skipped (relative to rag-server/)
+    semantic_cache_size: int = 256  # Recent queries whose results are reused for near-duplicates (0 = off)
+    semantic_cache_threshold: float = 0.86  # Cosine similarity at which a cached query counts as the same
+    semantic_cache_ttl: float = 300.0  # Seconds a cached result is reused (the indexer may have written since; 0 = until the next write)
     exclude_patterns: list[str] = [
         "**/node_modules/**",
         "**/__pycache__/**",
@@ -72,6 +85,30 @@ class Config(BaseModel):
     project_root: Optional[Path] = None  # Will be set during load_config
     rag_server_dir: Optional[Path] = None  # Will be set during load_config
 
+    def resolve_path(self, path: Optional[str]) -> Optional[Path]:
+        """A configured file path resolved against rag-server/ (None if unset)"""
+        if not path:
+            return None
+        path = Path(path)
+        if not path.is_absolute() and self.rag_server_dir is not None:
+            path = self.rag_server_dir / path
+        return path
+
+    @property
+    def embedding_cache_file(self) -> Optional[Path]:
+        """embedding_cache_path resolved against rag-server/ (None = in-memory cache only)"""
+        return self.resolve_path(self.embedding_cache_path)
+
+    @property
+    def parser_cache_file(self) -> Optional[Path]:
+        """parser_cache_path resolved against rag-server/ (None = parser cache off)"""
+        return self.resolve_path(self.parser_cache_path)
+
+    @property
+    def file_index_file(self) -> Optional[Path]:
+        """file_index_path resolved against rag-server/ (None = every code file is re-read)"""
+        return self.resolve_path(self.file_index_path)
+
 def _find_config_file(start_path: Path) -> Path:
     """
     Find mcp-config.json - check in rag-server/ first, then search upward
@@ -227,7 +264,10 @@ def load_config() -> Config:
         "api_key": qdrant_api_key,
         "collection": qdrant_collection,
         "timeout": 30,
-        "retry_attempts": 3
+        "retry_attempts": 3,
+        "prefer_grpc": os.getenv("QDRANT_PREFER_GRPC", "false").lower() in ("1", "true", "yes"),
+        "grpc_port": int(os.getenv("QDRANT_GRPC_PORT", "6334")),
+        "scalar_quantization": os.getenv("QDRANT_SCALAR_QUANTIZATION", "false").lower() in ("1", "true", "yes")
     }
     
     # 7. Validate and create Config object
@@ -0,0 +1,167 @@
+"""
+Embedding Cache: Memoize embeddings by content hash.
+
+This module handles:
+- In-memory LRU of recent embeddings (repeated queries, boilerplate chunks)
+- Optional SQLite persistence so unchanged chunks skip the model across restarts
+- Batched encoding that only sends cache misses to the embedder
+
+Vectors are float32 numpy arrays throughout (marked read-only, since cached
+arrays are shared between callers).
+"""
+
+import hashlib
+import logging
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingCache:
+    """Content-hash keyed embedding cache with optional on-disk persistence."""
+
+    def __init__(self, model_name: str, max_size: int = 8192, db_path: Optional[Path] = None):
+        """
+        Initialize embedding cache.
+
+        Args:
+            model_name: Embedding model name (part of the key, so models never mix)
+            max_size: Maximum number of vectors kept in memory
+            db_path: Optional SQLite file for persistent storage (None = memory only)
+        """
+        self.model_name = model_name
+        self.max_size = max_size
+        self._prefix = model_name.encode("utf-8") + b"\0"
+        self._memory: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+
+        if db_path is not None:
+            try:
+                db_path = Path(db_path)
+                db_path.parent.mkdir(parents=True, exist_ok=True)
+                self._db = sqlite3.connect(str(db_path), check_same_thread=False)
+                self._db.execute("PRAGMA journal_mode=WAL")
+                self._db.execute("PRAGMA synchronous=NORMAL")
+                self._db.execute("CREATE TABLE IF NOT EXISTS emb (hash BLOB PRIMARY KEY, vec BLOB)")
+                self._db.commit()
+                logger.info(f"Persistent embedding cache at: {db_path}")
+            except Exception as e:
+                logger.warning(f"Persistent embedding cache unavailable ({db_path}): {e}")
+                self._db = None
+
+    def key(self, text: str) -> bytes:
+        """Stable 128-bit digest of (model_name, text)."""
+        return hashlib.blake2b(self._prefix + text.encode("utf-8", errors="ignore"), digest_size=16).digest()
+
+    def get(self, key: bytes) -> Optional[np.ndarray]:
+        """Look up a vector by key (memory first, then disk)."""
+        with self._lock:
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+                return vector
+            if self._db is None:
+                return None
+            row = self._db.execute("SELECT vec FROM emb WHERE hash = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            vector = np.frombuffer(row[0], dtype=np.float32)
+            self._remember(key, vector)
+            return vector
+
+    def put_many(self, keys: List[bytes], vectors: List[np.ndarray]):
+        """Store vectors under their keys (memory and, if enabled, disk)."""
+        with self._lock:
+            for key, vector in zip(keys, vectors):
+                self._remember(key, vector)
+            if self._db is not None:
+                try:
+                    self._db.executemany(
+                        "INSERT OR IGNORE INTO emb (hash, vec) VALUES (?, ?)",
+                        [(key, vector.tobytes()) for key, vector in zip(keys, vectors)]
+                    )
+                    self._db.commit()
+                except Exception as e:
+                    logger.debug(f"Failed to persist embeddings: {e}")
+
+    def _remember(self, key: bytes, vector: np.ndarray):
+        """Insert into the in-memory LRU (caller holds the lock)."""
+        vector.flags.writeable = False
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_size:
+            self._memory.popitem(last=False)
+
+    def encode(self, embedder, text: str) -> np.ndarray:
+        """Encode a single text, serving repeats from the cache."""
+        key = self.key(text)
+        vector = self.get(key)
+        if vector is None:
+            vector = np.asarray(embedder.encode(text), dtype=np.float32)
+            self.put_many([key], [vector])
+        return vector
+
+    def encode_batch(self, embedder, texts: List[str], batch_size: int = 64) -> List[Optional[np.ndarray]]:
+        """
+        Encode many texts with one embedder call, serving repeats from the cache.
+
+        Only cache misses are sent to the model, and a text repeated within the
+        batch is sent once (its positions share the vector). If the batched call
+        fails, the misses are retried one by one so a single bad text doesn't sink
+        the batch; entries that still fail come back as None.
+        """
+        vectors: List[Optional[np.ndarray]] = [None] * len(texts)
+        # Duplicate texts within the batch are encoded once: key -> all positions
+        miss_positions: Dict[bytes, List[int]] = {}
+        miss_texts = []
+        for i, text in enumerate(texts):
+            key = self.key(text)
+            positions = miss_positions.get(key)
+            if positions is not None:
+                positions.append(i)
+                continue
+            cached = self.get(key)
+            if cached is not None:
+                vectors[i] = cached
+            else:
+                miss_positions[key] = [i]
+                miss_texts.append(text)
+
+        if not miss_texts:
+            return vectors
+
+        try:
+            encoded = list(np.asarray(embedder.encode(
+                miss_texts,
+                batch_size=batch_size,
+                show_progress_bar=False,
+                convert_to_numpy=True
+            ), dtype=np.float32))
+        except Exception as e:
+            logger.warning(f"Batch encode of {len(miss_texts)} texts failed, retrying individually: {e}")
+            encoded = []
+            for text in miss_texts:
+                try:
+                    encoded.append(np.asarray(embedder.encode(text), dtype=np.float32))
+                except Exception as e2:
+                    logger.error(f"Failed to encode text: {e2}")
+                    encoded.append(None)
+
+        store_keys = []
+        store_vectors = []
+        for (key, positions), vector in zip(miss_positions.items(), encoded):
+            for i in positions:
+                vectors[i] = vector
+            if vector is not None:
+                store_keys.append(key)
+                store_vectors.append(vector)
+        if store_keys:
+            self.put_many(store_keys, store_vectors)
+        return vectors
@@ -0,0 +1,103 @@
+"""
+ONNX Embedder: int8-quantized sentence embeddings on ONNX Runtime.
+
+This module handles:
+- Loading a quantized ONNX export of a sentence-transformers model via optimum
+- Tokenizing, running the session and mean-pooling + L2-normalizing in numpy
+- Exposing the subset of SentenceTransformer.encode() the vector store uses
+"""
+
+import logging
+from pathlib import PurePosixPath
+from typing import List, Union
+
+import numpy as np
+
+try:
+    from optimum.onnxruntime import ORTModelForFeatureExtraction
+    from transformers import AutoTokenizer
+except ImportError:
+    ORTModelForFeatureExtraction = None
+    AutoTokenizer = None
+
+logger = logging.getLogger(__name__)
+
+
+class OnnxEmbedder:
+    """Drop-in replacement for SentenceTransformer.encode() backed by ONNX Runtime."""
+
+    def __init__(self, model_name: str, onnx_file: str = "onnx/model_quint8_avx2.onnx", max_length: int = 256):
+        """
+        Load tokenizer and quantized ONNX model.
+
+        Args:
+            model_name: Hugging Face model id (e.g. "sentence-transformers/all-MiniLM-L6-v2")
+            onnx_file: ONNX file inside the model repo (subfolder/file_name)
+            max_length: Maximum tokens per text (MiniLM was trained with 256)
+
+        Raises:
+            RuntimeError: If optimum/onnxruntime are not installed or loading fails
+        """
+        if ORTModelForFeatureExtraction is None or AutoTokenizer is None:
+            raise RuntimeError("ONNX backend requires 'optimum[onnxruntime]' and 'transformers'")
+
+        onnx_path = PurePosixPath(onnx_file)
+        subfolder = "" if str(onnx_path.parent) == "." else str(onnx_path.parent)
+        try:
+            self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+            self.model = ORTModelForFeatureExtraction.from_pretrained(
+                model_name,
+                subfolder=subfolder,
+                file_name=onnx_path.name,
+                provider="CPUExecutionProvider"
+            )
+        except Exception as e:
+            raise RuntimeError(f"Failed to load ONNX model {model_name} ({onnx_file}): {e}") from e
+
+        self.model_name = model_name
+        self.max_length = max_length
+        logger.info(f"Loaded ONNX embedder: {model_name} ({onnx_file})")
+
+    def encode(
+        self,
+        sentences: Union[str, List[str]],
+        batch_size: int = 64,
+        show_progress_bar: bool = False,
+        convert_to_numpy: bool = True,
+        **kwargs
+    ) -> np.ndarray:
+        """
+        Encode text(s) into L2-normalized float32 embeddings.
+
+        Args:
+            sentences: A single text or a list of texts
+            batch_size: Texts per ONNX session run
+            show_progress_bar: Accepted for SentenceTransformer compatibility (ignored)
+            convert_to_numpy: Accepted for SentenceTransformer compatibility (always numpy)
+
+        Returns:
+            1-D array for a single text, (n, dim) array for a list
+        """
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+
+        batches = []
+        for i in range(0, len(texts), batch_size):
+            encoded = self.tokenizer(
+                texts[i:i + batch_size],
+                padding=True,
+                truncation=True,
+                max_length=self.max_length,
+                return_tensors="np"
+            )
+            hidden = np.asarray(self.model(**encoded).last_hidden_state, dtype=np.float32)
+
+            # Mean pooling over real tokens, then L2 normalize (matches the
+            # Pooling + Normalize modules of sentence-transformers MiniLM)
+            mask = encoded["attention_mask"][..., None].astype(np.float32)
+            pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+            batches.append(pooled / np.clip(norms, 1e-12, None))
+
+        embeddings = np.vstack(batches) if batches else np.empty((0, 0), dtype=np.float32)
+        return embeddings[0] if single else embeddings
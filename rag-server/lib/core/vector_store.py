@@ -1,13 +1,60 @@
-from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, VectorParams, PointStruct, NearestQuery, PayloadSchemaType, Filter, FieldCondition, MatchValue
+from qdrant_client import QdrantClient, AsyncQdrantClient
+from qdrant_client.models import Distance, VectorParams, PointStruct, PayloadSchemaType, Filter, FieldCondition, MatchValue, MatchAny
+from qdrant_client.models import ScalarQuantization, ScalarQuantizationConfig, ScalarType, OptimizersConfigDiff, FilterSelector
+from qdrant_client.models import QueryRequest, IsEmptyCondition, PayloadField
 from sentence_transformers import SentenceTransformer
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Iterator, Tuple
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from dataclasses import dataclass
 from pathlib import Path
+from weakref import WeakKeyDictionary
+import asyncio
+import copy
+import hashlib
+import importlib.util
 import logging
+import os
+import re
+import threading
+import time
+import httpx
+import numpy as np
+
+from .embedding_cache import EmbeddingCache
+from .onnx_embedder import OnnxEmbedder
 
 logger = logging.getLogger(__name__)
 
+# int8 vectors held in RAM for HNSW scoring (originals stay on disk for rescoring)
+SCALAR_INT8_QUANTIZATION = ScalarQuantization(
+    scalar=ScalarQuantizationConfig(type=ScalarType.INT8, quantile=0.99, always_ram=True)
+)
+
+# Payload fields index_doc needs to diff a file against what's stored
+EXISTING_CHUNK_FIELDS = ["file_path", "line_start", "line_end", "content"]
+
+# Per-file existing-chunk lookups kept between index_doc calls (count / seconds)
+EXISTING_CACHE_SIZE = 256
+EXISTING_CACHE_TTL = 60.0
+
+# Clauses accepted in filter dicts (same names as the Filter arguments)
+FILTER_CLAUSES = ("must", "should", "must_not")
+
+# Collapses whitespace runs when normalizing content (standalone point IDs, encode_content)
+_norm_ws = re.compile(r'\s+').sub
+
+# Points per upsert request; keeps individual requests small for large files
+UPSERT_BATCH_SIZE = 128
+
+# Qdrant's default indexing_threshold (KB), restored after bulk_load when the
+# collection reported none of its own
+DEFAULT_INDEXING_THRESHOLD = 20000
+
+# Excludes soft-deleted chunks server-side (uses the is_deleted BOOL payload index)
+NOT_DELETED_FILTER = Filter(must_not=[FieldCondition(key="is_deleted", match=MatchValue(value=True))])
+
 
 # Custom Exception Classes
 class VectorStoreError(Exception):
@@ -51,13 +98,13 @@ class SearchResult:
 class HybridVectorStore:
     def __init__(self, config):
         """Initialize cloud + local Qdrant clients"""
-        # Cloud: Use URL + API key from config
-        self.cloud_client = QdrantClient(
-            url=config.cloud_qdrant.url,
-            api_key=config.cloud_qdrant.api_key,
-            timeout=config.cloud_qdrant.timeout
-        )
+        # Cloud: Use URL + API key from config (gRPC transport unless disabled)
+        self.cloud_client = QdrantClient(**self._cloud_client_args(config.cloud_qdrant))
         self.cloud_collection = config.cloud_qdrant.collection
+        # Async twin of the cloud client for asearch()/aindex_doc() is created lazily
+        # so it binds to the caller's event loop; settings kept for it and for quantization
+        self._cloud_qdrant_config = config.cloud_qdrant
+        self._cloud_aclient: Optional[AsyncQdrantClient] = None
         
         # Local: Use path (embedded mode) - only if enabled
         self.local_enabled = config.local_qdrant.enabled
@@ -77,15 +124,98 @@ class HybridVectorStore:
             self.local_collection = None
             logger.info("Local Qdrant storage is disabled (enabled: false in config)")
         
+        # Hot cache: local vectors held in memory as one normalized matrix so a
+        # local search is a single matmul instead of an embedded-Qdrant query
+        self.hot_cache_enabled = self.local_enabled and config.local_qdrant.hot_cache
+        self._hot_cache_max_points = config.local_qdrant.hot_cache_max_points
+        self._hot_vectors: Optional[np.ndarray] = None
+        self._hot_payloads: List[Dict] = []
+        
+        # Cloud and local queries are I/O-bound; run them concurrently
+        self._search_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="vector-search")
+        
         # Embedding model (single model for now, future: add CodeBERT support)
         # Using MiniLM-L6-v2 (384-dim) for both docs + code (safe default)
-        self.embedder = SentenceTransformer(config.embedding_model)
+        self.embedder = self._load_embedder(config)
         self.vector_size = 384  # all-MiniLM-L6-v2 output size
         logger.info(f"Using embedder: {config.embedding_model} (vector_size: {self.vector_size})")
         
+        # Content-hash -> vector cache so identical chunks (license headers, boilerplate)
+        # and repeated queries are only encoded once; optionally persisted to SQLite
+        # Quantized vectors differ slightly from fp32 ones, so the backend is part of the key
+        cache_model = config.embedding_model
+        if isinstance(self.embedder, OnnxEmbedder):
+            cache_model = f"{config.embedding_model}@onnx_int8"
+        self.embed_cache = EmbeddingCache(cache_model, db_path=config.embedding_cache_file)
+        # Query caches for embedders passed in by callers (e.g. EmbeddingManager models)
+        self._query_caches: WeakKeyDictionary = WeakKeyDictionary()
+        
+        # Semantic result cache: near-duplicate queries (cosine >= threshold) with the
+        # same top_k and embedder reuse the previous results instead of querying
+        # Qdrant again. Rows are L2-normalized query vectors; cleared on every write
+        # through this store and expired after semantic_cache_ttl seconds (other
+        # processes, e.g. the indexer, write without clearing it).
+        self._semantic_threshold = config.semantic_cache_threshold
+        self._semantic_ttl = config.semantic_cache_ttl
+        semantic_size = max(0, config.semantic_cache_size)
+        self._semantic_vecs = np.zeros((semantic_size, self.vector_size), dtype=np.float32)
+        self._semantic_top_k = np.full(semantic_size, -1, dtype=np.int64)
+        self._semantic_space = np.zeros(semantic_size, dtype=np.int64)
+        self._semantic_stored_at = np.zeros(semantic_size, dtype=np.float64)
+        self._semantic_last_used = np.zeros(semantic_size, dtype=np.int64)
+        self._semantic_results: List[Optional[List[SearchResult]]] = [None] * semantic_size
+        self._semantic_clock = 0
+        self._semantic_lock = threading.Lock()
+        # Cache partition ids per (embedder, payload filters); 0 = self.embedder, unfiltered
+        self._semantic_own_spaces: Dict[Any, int] = {None: 0}
+        self._semantic_spaces: WeakKeyDictionary = WeakKeyDictionary()
+        self._semantic_next_space = 0
+        
+        # (collection, normalized path) -> (timestamp, existing chunks) so re-indexing
+        # the same file soon after (watcher debounces, retries) skips the scroll;
+        # index_doc refreshes the entry with what it just wrote
+        self._existing_cache: OrderedDict = OrderedDict()
+        self._existing_cache_lock = threading.Lock()
+        
         # Ensure collections exist
         self._ensure_collections()
     
+    @staticmethod
+    def _cloud_client_args(cloud_config) -> Dict[str, Any]:
+        """
+        Connection settings shared by the sync and async cloud clients.
+        
+        REST requests (used when gRPC is disabled, and by some calls either way)
+        go through a keep-alive pool so bursts don't pay a TLS handshake each;
+        HTTP/2 is enabled when the h2 package is installed.
+        """
+        return {
+            "url": cloud_config.url,
+            "api_key": cloud_config.api_key,
+            "timeout": cloud_config.timeout,
+            "prefer_grpc": cloud_config.prefer_grpc,
+            "grpc_port": cloud_config.grpc_port,
+            # Extra kwargs are passed through to the httpx client
+            "limits": httpx.Limits(max_keepalive_connections=32, keepalive_expiry=60),
+            "http2": importlib.util.find_spec("h2") is not None,
+        }
+    
+    def _load_embedder(self, config):
+        """
+        Load the embedding model for the configured backend.
+        
+        "onnx_int8" runs a quantized ONNX export on ONNX Runtime (faster on CPU);
+        if it can't be loaded we fall back to the default SentenceTransformer.
+        """
+        if config.embedding_backend == "onnx_int8":
+            try:
+                return OnnxEmbedder(config.embedding_model, onnx_file=config.embedding_onnx_file)
+            except Exception as e:
+                logger.warning(f"ONNX embedding backend unavailable, using SentenceTransformer: {e}")
+        elif config.embedding_backend != "torch":
+            logger.warning(f"Unknown embedding_backend '{config.embedding_backend}', using SentenceTransformer")
+        return SentenceTransformer(config.embedding_model)
+    
     def _ensure_collections(self):
         """Create collections if they don't exist and ensure payload indexes"""
         self._ensure_collection(self.cloud_client, self.cloud_collection, "cloud")
@@ -97,13 +227,29 @@ class HybridVectorStore:
         try:
             collections = client.get_collections()
             collection_names = [c.name for c in collections.collections]
+            # Quantization only applies to the server; embedded mode ignores it.
+            # Set at creation only: existing collections are never reconfigured here
+            quantize = collection_type == "cloud" and self._cloud_qdrant_config.scalar_quantization
             if collection_name not in collection_names:
+                extra = {}
+                if quantize:
+                    extra = {
+                        "quantization_config": SCALAR_INT8_QUANTIZATION,
+                        "optimizers_config": OptimizersConfigDiff(
+                            default_segment_number=max(2, (os.cpu_count() or 2) // 2)
+                        ),
+                    }
+                if collection_type == "cloud":
+                    # Payloads (chunk text + metadata) are read only for returned
+                    # points, so keep them on disk and leave RAM to vectors/indexes
+                    extra["on_disk_payload"] = True
                 client.create_collection(
                     collection_name=collection_name,
                     vectors_config=VectorParams(
                         size=self.vector_size,
                         distance=Distance.COSINE
-                    )
+                    ),
+                    **extra
                 )
                 logger.info(f"Created {collection_type} collection: {collection_name}")
             
@@ -126,18 +272,25 @@ class HybridVectorStore:
             # Index fields with proper schema types:
             # - KEYWORD for string fields (file_path, section, language, content_type)
             # - Common metadata fields used in search_by_metadata (category, error_type, tags, source)
-            # - No index needed for is_deleted (boolean) - Qdrant handles this automatically
+            # - BOOL for is_deleted so the soft-delete filter is applied inside the query
             index_fields = {
                 "file_path": PayloadSchemaType.KEYWORD,
+                # Canonical (forward-slash) path, used for per-file lookups
+                "file_path_norm": PayloadSchemaType.KEYWORD,
+                # blake2b of chunk text, for dedup before insert
+                "content_hash": PayloadSchemaType.KEYWORD,
                 "section": PayloadSchemaType.KEYWORD,
                 "language": PayloadSchemaType.KEYWORD,
                 "content_type": PayloadSchemaType.KEYWORD,
+                # Code search filters on it at query time
+                "code_type": PayloadSchemaType.KEYWORD,
                 # Common metadata fields for CRUD operations
                 "category": PayloadSchemaType.KEYWORD,
                 "error_type": PayloadSchemaType.KEYWORD,
                 "tags": PayloadSchemaType.KEYWORD,
                 "source": PayloadSchemaType.KEYWORD,
-                # is_deleted is boolean - Qdrant will handle filtering without explicit index
+                # Soft-delete flag, excluded server-side via NOT_DELETED_FILTER
+                "is_deleted": PayloadSchemaType.BOOL,
             }
             
             for field_name, schema_type in index_fields.items():
@@ -147,10 +300,10 @@ class HybridVectorStore:
                         field_name=field_name,
                         field_schema=schema_type
                     )
-                    logger.debug(f"Created {field_name} index (type: {schema_type}) in {collection_type} collection")
+                    logger.debug("Created %s index (type: %s) in %s collection", field_name, schema_type, collection_type)
                 except Exception as e:
                     # Index may already exist - that's ok
-                    logger.debug(f"Index {field_name} not created (may exist): {e}")
+                    logger.debug("Index %s not created (may exist): %s", field_name, e)
         except Exception as e:
             logger.warning(f"Failed to ensure payload indexes for {collection_type} collection: {e}")
     
@@ -159,53 +312,335 @@ class HybridVectorStore:
         Search: Cloud first → Local fallback
         
         Strategy:
-        1. Try cloud search (no boolean filter - filter results in Python)
-        2. If cloud fails or returns < top_k, search local
-        3. Merge results, deduplicate by file_path:line_number
-        4. Filter out soft-deleted chunks in Python
-        5. Sort by score descending
-        6. Return top_k results
+        1. Search cloud and local (if enabled) concurrently
+           (soft-deleted chunks excluded in the query)
+        2. Merge results, deduplicate by file_path:line_number (cloud wins)
+        3. Sort by score descending
+        4. Return top_k results
+        """
+        query_vector = self._encode_query(query)
+        cached = self._semantic_cache_get(query_vector, top_k)
+        if cached is not None:
+            return cached
+        results, complete = self._search_collections(query_vector, top_k)
+        if complete:
+            self._semantic_cache_put(query_vector, top_k, results)
+        return results
+    
+    def _search_collections(self, query_vector, limit: int,
+                            query_filter: Filter = NOT_DELETED_FILTER) -> Tuple[List[SearchResult], bool]:
+        """
+        Query cloud and local collections in parallel and return the merged top results.
+        
+        A failure on either side is logged and the other side's results are used.
+        Local hits already present in the cloud results (same file_path:line) are dropped.
         
-        Note: We filter is_deleted in Python (not in query) to avoid requiring
-        a boolean index in cloud Qdrant. This works for both local and cloud.
+        Returns:
+            (results, complete): complete is False if a collection query failed,
+            so the caller doesn't cache partial results
         """
-        query_vector = self.embedder.encode(query).tolist()
-        results = []
+        if not self.local_enabled:
+            # Single store: Qdrant already returns unique points ranked and cut to limit,
+            # so skip the thread hop and the merge
+            try:
+                return self._search_cloud(query_vector, limit, query_filter), True
+            except Exception as e:
+                logger.warning(f"Cloud search failed: {e}")
+                return [], False
+        
+        cloud_future = self._search_pool.submit(self._search_cloud, query_vector, limit, query_filter)
+        local_future = self._search_pool.submit(self._search_local, query_vector, limit, query_filter)
         
-        # Try cloud first (no filter - we'll filter in Python)
+        complete = True
+        cloud_results = []
         try:
-            cloud_response = self.cloud_client.query_points(
-                collection_name=self.cloud_collection,
-                query=NearestQuery(nearest=query_vector),
-                limit=top_k * 2  # Fetch more to account for deleted items
-            )
-            results.extend(self._parse_search_results(cloud_response.points, 'cloud'))
+            cloud_results = cloud_future.result()
         except Exception as e:
             logger.warning(f"Cloud search failed: {e}, using local only")
+            complete = False
         
-        # If not enough results, search local (if enabled)
-        if len(results) < top_k and self.local_enabled:
-            try:
-                local_response = self.local_client.query_points(
+        local_results = []
+        try:
+            local_results = local_future.result()
+        except Exception as e:
+            logger.error(f"Local search failed: {e}")
+            complete = False
+        
+        return self._merge_top_k(cloud_results, local_results, limit), complete
+    
+    def _merge_top_k(self, cloud_results: List[SearchResult],
+                     local_results: List[SearchResult], top_k: int) -> List[SearchResult]:
+        """
+        Deduplicate by file_path:line (cloud wins) and return the top_k by score.
+        
+        Scores and keys go into flat numpy arrays so dedup is one np.unique and
+        selection is an argpartition instead of a Python set + full sort.
+        """
+        merged = cloud_results + local_results
+        if not merged or top_k <= 0:
+            return []
+        
+        scores = np.fromiter((r.score for r in merged), dtype=np.float32, count=len(merged))
+        keys = np.array([f"{r.file_path}:{r.line_number}" for r in merged])
+        # return_index gives the first occurrence, i.e. the cloud copy of a duplicate;
+        # re-sorting keeps the original order for equal scores
+        _, idx = np.unique(keys, return_index=True)
+        idx = np.sort(idx)
+        
+        k = min(top_k, len(idx))
+        if k < len(idx):
+            idx = np.sort(idx[np.argpartition(-scores[idx], k - 1)[:k]])
+        idx = idx[np.argsort(-scores[idx], kind="stable")]
+        return [merged[i] for i in idx]
+    
+    def _semantic_space_of(self, embedder, filter_key=None) -> int:
+        """
+        Cache partition for searches with embedder and payload filters
+        (vectors of different models, or results under different filters, never match).
+        """
+        own = embedder is None or embedder is self.embedder
+        if own and filter_key is None:
+            return 0
+        with self._semantic_lock:
+            if own:
+                spaces = self._semantic_own_spaces
+            else:
+                spaces = self._semantic_spaces.get(embedder)
+                if spaces is None:
+                    spaces = self._semantic_spaces[embedder] = {}
+            space = spaces.get(filter_key)
+            if space is None:
+                # Ids are never reused, so rows of a collected embedder can't match
+                self._semantic_next_space += 1
+                space = spaces[filter_key] = self._semantic_next_space
+            return space
+    
+    def _semantic_cache_get(self, query_vector, top_k: int, space: int = 0) -> Optional[List[SearchResult]]:
+        """Return a copy of cached results for a near-duplicate query, or None"""
+        if not self._semantic_results:
+            return None
+        q = np.asarray(query_vector, dtype=np.float32)
+        norm = np.linalg.norm(q)
+        if norm == 0 or q.shape[0] != self._semantic_vecs.shape[1]:
+            return None
+        q = q / norm
+        with self._semantic_lock:
+            sims = self._semantic_vecs @ q
+            stale = (self._semantic_top_k != top_k) | (self._semantic_space != space)
+            if self._semantic_ttl > 0:
+                stale |= self._semantic_stored_at < time.monotonic() - self._semantic_ttl
+            sims[stale] = -1.0
+            best = int(np.argmax(sims))
+            if sims[best] < self._semantic_threshold:
+                return None
+            self._semantic_clock += 1
+            self._semantic_last_used[best] = self._semantic_clock
+            results = self._semantic_results[best]
+        logger.debug("Semantic cache hit (similarity %.3f)", sims[best])
+        return copy.deepcopy(results)
+    
+    def _semantic_cache_put(self, query_vector, top_k: int, results: List[SearchResult], space: int = 0):
+        """Remember results for this query vector, evicting the least recently used row"""
+        if not self._semantic_results:
+            return
+        q = np.asarray(query_vector, dtype=np.float32)
+        norm = np.linalg.norm(q)
+        if norm == 0 or q.shape[0] != self._semantic_vecs.shape[1]:
+            return
+        with self._semantic_lock:
+            slot = int(np.argmin(self._semantic_last_used))
+            self._semantic_clock += 1
+            self._semantic_vecs[slot] = q / norm
+            self._semantic_top_k[slot] = top_k
+            self._semantic_space[slot] = space
+            self._semantic_stored_at[slot] = time.monotonic()
+            self._semantic_last_used[slot] = self._semantic_clock
+            self._semantic_results[slot] = copy.deepcopy(results)
+    
+    def invalidate_search_cache(self, collection: str = "cloud"):
+        """
+        Drop cached search results and per-file chunk lookups after a write.
+        
+        index_doc/cleanup_deleted_files keep their caches current themselves;
+        other writers (e.g. the vector CRUD tools) must call this after
+        modifying a collection.
+        
+        Args:
+            collection: Collection that was written ("local" also drops the hot cache)
+        """
+        with self._existing_cache_lock:
+            for key in [k for k in self._existing_cache if k[0] == collection]:
+                del self._existing_cache[key]
+        self._clear_result_caches(collection)
+    
+    def _clear_result_caches(self, collection: str):
+        """Drop the semantic result cache (and the hot cache for local writes)"""
+        with self._semantic_lock:
+            self._semantic_top_k.fill(-1)
+            self._semantic_last_used.fill(0)
+            self._semantic_results = [None] * len(self._semantic_results)
+        if collection == "local":
+            self._invalidate_hot_cache()
+    
+    def _search_cloud(self, query_vector, limit: int,
+                      query_filter: Filter = NOT_DELETED_FILTER) -> List[SearchResult]:
+        """Nearest-neighbour search on the cloud collection"""
+        cloud_response = self.cloud_client.query_points(
+            collection_name=self.cloud_collection,
+            query=query_vector,
+            query_filter=query_filter,
+            limit=limit
+        )
+        return self._parse_search_results(cloud_response.points, 'cloud')
+    
+    @property
+    def cloud_aclient(self) -> AsyncQdrantClient:
+        """Async cloud client (created on first use)"""
+        if self._cloud_aclient is None:
+            self._cloud_aclient = AsyncQdrantClient(**self._cloud_client_args(self._cloud_qdrant_config))
+        return self._cloud_aclient
+    
+    async def asearch(self, query: str, top_k: int = 5) -> List[SearchResult]:
+        """
+        Async version of search() for event-loop callers.
+        
+        The cloud query goes through AsyncQdrantClient; the embedding and the
+        local (embedded Qdrant / hot cache) query run in worker threads, and both
+        stores are queried concurrently.
+        """
+        query_vector = await asyncio.to_thread(self._encode_query, query)
+        cached = self._semantic_cache_get(query_vector, top_k)
+        if cached is not None:
+            return cached
+        
+        async def cloud_search():
+            cloud_response = await self.cloud_aclient.query_points(
+                collection_name=self.cloud_collection,
+                query=query_vector,
+                query_filter=NOT_DELETED_FILTER,
+                limit=top_k
+            )
+            return self._parse_search_results(cloud_response.points, 'cloud')
+        
+        tasks = [cloud_search()]
+        if self.local_enabled:
+            tasks.append(asyncio.to_thread(self._search_local, query_vector, top_k))
+        outcomes = await asyncio.gather(*tasks, return_exceptions=True)
+        
+        cloud_results = []
+        if isinstance(outcomes[0], Exception):
+            logger.warning(f"Cloud search failed: {outcomes[0]}, using local only")
+        else:
+            cloud_results = outcomes[0]
+        
+        local_results = []
+        if len(outcomes) > 1:
+            if isinstance(outcomes[1], Exception):
+                logger.error(f"Local search failed: {outcomes[1]}")
+            else:
+                local_results = outcomes[1]
+        
+        # Cloud-only results are already unique and ranked by Qdrant
+        results = self._merge_top_k(cloud_results, local_results, top_k) if self.local_enabled else cloud_results
+        # Partial results (a side failed) are returned but not cached
+        if not any(isinstance(outcome, Exception) for outcome in outcomes):
+            self._semantic_cache_put(query_vector, top_k, results)
+        return results
+    
+    def _search_local(self, query_vector, limit: int,
+                      query_filter: Filter = NOT_DELETED_FILTER) -> List[SearchResult]:
+        """Nearest-neighbour search on the local collection (hot cache when enabled and unfiltered)"""
+        if query_filter is NOT_DELETED_FILTER and self.hot_cache_enabled and self.ensure_hot_cache():
+            return self.search_hot(query_vector, limit)
+        local_response = self.local_client.query_points(
+            collection_name=self.local_collection,
+            query=query_vector,
+            query_filter=query_filter,
+            limit=limit
+        )
+        return self._parse_search_results(local_response.points, 'local')
+    
+    def ensure_hot_cache(self) -> bool:
+        """
+        Load all live local vectors into an in-memory matrix (lazy, once).
+        
+        The cache is disabled for the rest of the process if the local collection
+        holds more than hot_cache_max_points chunks, to bound RAM usage.
+        
+        Returns:
+            True if the hot cache is loaded and usable
+        """
+        if not self.hot_cache_enabled:
+            return False
+        if self._hot_vectors is not None:
+            return True
+        
+        vectors = []
+        payloads = []
+        offset = None
+        try:
+            while True:
+                points, offset = self.local_client.scroll(
                     collection_name=self.local_collection,
-                    query=NearestQuery(nearest=query_vector),
-                    limit=top_k * 2  # Fetch more to account for deleted items
+                    scroll_filter=NOT_DELETED_FILTER,
+                    limit=1024,
+                    offset=offset,
+                    with_payload=True,
+                    with_vectors=True
                 )
-                existing_keys = {(r.file_path, r.line_number) for r in results}
-                for result in local_response.points:
-                    key = (result.payload.get('file_path', ''), result.payload.get('line_start', 0))
-                    if key not in existing_keys:
-                        results.append(self._create_search_result(result, 'local'))
-                        existing_keys.add(key)
-            except Exception as e:
-                logger.error(f"Local search failed: {e}")
+                for point in points:
+                    vectors.append(point.vector)
+                    payloads.append(point.payload)
+                if len(payloads) > self._hot_cache_max_points:
+                    logger.info(f"Hot cache disabled: local collection exceeds {self._hot_cache_max_points} chunks")
+                    self.hot_cache_enabled = False
+                    return False
+                if offset is None:
+                    break
+        except Exception as e:
+            logger.warning(f"Failed to load hot cache, using local Qdrant search: {e}")
+            return False
+        
+        matrix = np.asarray(vectors, dtype=np.float32).reshape(-1, self.vector_size)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        self._hot_vectors = matrix / norms
+        self._hot_payloads = payloads
+        logger.info(f"Hot cache loaded: {len(payloads)} local chunks")
+        return True
+    
+    def search_hot(self, query_vector, top_k: int) -> List[SearchResult]:
+        """Cosine top-k over the in-memory hot cache"""
+        if not self.ensure_hot_cache() or not self._hot_payloads:
+            return []
+        
+        query = np.asarray(query_vector, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm > 0:
+            query = query / norm
+        scores = self._hot_vectors @ query
         
-        # Filter out soft-deleted chunks (do this in Python, not in query)
-        # This avoids requiring a boolean index in cloud Qdrant
-        results = [r for r in results if not r.metadata.get('is_deleted', False)]
+        k = min(top_k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
         
-        results.sort(key=lambda x: x.score, reverse=True)
-        return results[:top_k]
+        results = []
+        for i in top:
+            payload = self._hot_payloads[i]
+            results.append(SearchResult(
+                content=payload.get('content', ''),
+                file_path=payload.get('file_path', ''),
+                line_number=payload.get('line_start', 0),
+                score=float(scores[i]),
+                collection='local',
+                metadata=payload
+            ))
+        return results
+    
+    def _invalidate_hot_cache(self):
+        """Drop the hot cache so the next search reloads it from local Qdrant"""
+        self._hot_vectors = None
+        self._hot_payloads = []
     
     def _parse_search_results(self, points, collection: str) -> List[SearchResult]:
         """Parse Qdrant points into SearchResult objects"""
@@ -225,51 +660,216 @@ class HybridVectorStore:
     
     def _normalize_path(self, path: str) -> str:
         """Normalize path separators for consistent comparison"""
-        return path.replace('\\', '/')
+        # Most stored paths are already POSIX-style; skip the copy in that case
+        return path.replace('\\', '/') if '\\' in path else path
+    
+    def _encode_batch(self, texts: List[str], batch_size: int = 64) -> List[Optional[np.ndarray]]:
+        """Batch-encode texts with self.embedder through the embedding cache"""
+        return self.embed_cache.encode_batch(self.embedder, texts, batch_size=batch_size)
+    
+    def _encode_query(self, query: str, embedder=None) -> np.ndarray:
+        """
+        Encode a search query, reusing the vector of an identical earlier query.
+        
+        Returns a float32 array; query_points accepts numpy arrays directly.
+        """
+        if embedder is None or embedder is self.embedder:
+            return self.embed_cache.encode(self.embedder, query)
+        return self._query_cache(embedder).encode(embedder, query)
+    
+    def _encode_queries(self, queries: List[str], embedder=None) -> List[Optional[np.ndarray]]:
+        """Batch version of _encode_query (one model call for all uncached queries)"""
+        if embedder is None or embedder is self.embedder:
+            return self.embed_cache.encode_batch(self.embedder, queries)
+        return self._query_cache(embedder).encode_batch(embedder, queries)
+    
+    def _query_cache(self, embedder) -> EmbeddingCache:
+        """Query vector cache for a caller-supplied embedder"""
+        cache = self._query_caches.get(embedder)
+        if cache is None:
+            cache = EmbeddingCache(f"external-{id(embedder)}", max_size=1024)
+            self._query_caches[embedder] = cache
+        return cache
+    
+    def _scroll_all(self, client, collection_name: str, scroll_filter: Optional[Filter] = None,
+                    page_size: int = 1024, with_payload: Any = True) -> List:
+        """
+        Scroll every matching point (payload only), following next_page_offset.
+        
+        Pass a list of field names as with_payload to fetch only those fields.
+        """
+        points = []
+        offset = None
+        while True:
+            page, offset = client.scroll(
+                collection_name=collection_name,
+                scroll_filter=scroll_filter,
+                limit=page_size,
+                offset=offset,
+                with_payload=with_payload,
+                with_vectors=False
+            )
+            points.extend(page)
+            if offset is None:
+                break
+        return points
+    
+    def _content_hash(self, content: str) -> str:
+        """128-bit blake2b hex digest of chunk text (stored as payload content_hash)"""
+        return hashlib.blake2b(content.encode('utf-8', errors='ignore'), digest_size=16).hexdigest()
+    
+    def find_by_content_hash(self, content_hash: str, collection: str = "cloud") -> Optional[Any]:
+        """
+        Return the ID of a live standalone point whose content_hash matches, or None.
+        
+        Only points without a file_path count: indexed doc/code chunks carry
+        content_hash too, but belong to their file and must not be handed out
+        (and later updated or deleted) as standalone vectors.
+        Fails open: any lookup error returns None so the caller just inserts.
+        
+        Args:
+            content_hash: Value from _content_hash()
+            collection: "cloud" or "local"
+        """
+        client = self.cloud_client if collection == "cloud" else self.local_client
+        coll_name = self.cloud_collection if collection == "cloud" else self.local_collection
+        if client is None:
+            return None
+        try:
+            points, _ = client.scroll(
+                collection_name=coll_name,
+                scroll_filter=Filter(
+                    must=[
+                        FieldCondition(key="content_hash", match=MatchValue(value=content_hash)),
+                        IsEmptyCondition(is_empty=PayloadField(key="file_path")),
+                    ],
+                    must_not=NOT_DELETED_FILTER.must_not
+                ),
+                limit=1,
+                with_payload=False,
+                with_vectors=False
+            )
+            return points[0].id if points else None
+        except Exception as e:
+            logger.debug("content_hash lookup failed, not deduplicating: %s", e)
+            return None
+    
+    def _reuse_existing_vectors(self, client, collection_name: str, hashes: List[str],
+                                existing_chunks: Dict) -> Dict[str, np.ndarray]:
+        """
+        Fetch stored vectors for chunks whose content already exists in this file.
+        
+        Args:
+            hashes: Content hashes of the chunks about to be written
+            existing_chunks: Output of _get_existing_chunks for the same file
+        
+        Returns:
+            content_hash -> vector for every hash found (one retrieve call)
+        """
+        if not hashes or not existing_chunks:
+            return {}
+        wanted = set(hashes)
+        id_by_hash = {}
+        for chunk in existing_chunks.values():
+            # Hashed from the stored text, not the stored content_hash: a vector is only
+            # reused for exactly the text it was computed from, even if a writer left
+            # the payload hash stale
+            chunk_hash = self._content_hash(chunk['content'])
+            if chunk_hash in wanted and chunk_hash not in id_by_hash:
+                id_by_hash[chunk_hash] = chunk['id']
+        if not id_by_hash:
+            return {}
+        
+        try:
+            points = client.retrieve(
+                collection_name=collection_name,
+                ids=list(id_by_hash.values()),
+                with_payload=False,
+                with_vectors=True
+            )
+        except Exception as e:
+            logger.debug("Could not retrieve existing vectors, encoding instead: %s", e)
+            return {}
+        
+        vector_by_id = {point.id: point.vector for point in points if point.vector is not None}
+        return {
+            chunk_hash: np.asarray(vector_by_id[point_id], dtype=np.float32)
+            for chunk_hash, point_id in id_by_hash.items()
+            if point_id in vector_by_id
+        }
+    
+    def _get_existing_chunks_cached(self, collection: str, doc_path: str) -> Dict:
+        """_get_existing_chunks with a short-lived per-file LRU in front of it"""
+        normalized_doc_path = self._normalize_path(doc_path)
+        cache_key = (collection, normalized_doc_path)
+        with self._existing_cache_lock:
+            entry = self._existing_cache.get(cache_key)
+            if entry is not None and time.monotonic() - entry[0] < EXISTING_CACHE_TTL:
+                self._existing_cache.move_to_end(cache_key)
+                return dict(entry[1])
+        
+        client = self.cloud_client if collection == "cloud" else self.local_client
+        coll_name = self.cloud_collection if collection == "cloud" else self.local_collection
+        existing = self._get_existing_chunks(client, coll_name, doc_path)
+        if existing:
+            # An empty result may be a failed lookup - don't pin it
+            self._remember_existing_chunks(collection, normalized_doc_path, existing)
+        return existing
+    
+    def _remember_existing_chunks(self, collection: str, normalized_path: str, chunks: Dict):
+        """Store a file's chunk map in the LRU, evicting the oldest entries"""
+        with self._existing_cache_lock:
+            self._existing_cache[(collection, normalized_path)] = (time.monotonic(), dict(chunks))
+            self._existing_cache.move_to_end((collection, normalized_path))
+            while len(self._existing_cache) > EXISTING_CACHE_SIZE:
+                self._existing_cache.popitem(last=False)
+    
+    def _forget_existing_chunks(self, collection: str, normalized_path: str):
+        """Drop a file's cached chunk map"""
+        with self._existing_cache_lock:
+            self._existing_cache.pop((collection, normalized_path), None)
     
     def _get_existing_chunks(self, client, collection_name: str, doc_path: str) -> Dict:
         """Get existing chunks for a file, keyed by (file_path, line_start)"""
         existing = {}
         try:
-            # Normalize the doc_path for comparison
+            # Normalize the doc_path once; points store the same form in file_path_norm
             normalized_doc_path = self._normalize_path(doc_path)
-            # Also prepare path variants for matching
-            path_variants = {
-                normalized_doc_path,
-                doc_path,
-                doc_path.replace('/', '\\'),
-                doc_path.replace('\\', '/')
-            }
+            file_filter = Filter(should=[
+                FieldCondition(key="file_path_norm", match=MatchValue(value=normalized_doc_path)),
+                # Points indexed before file_path_norm existed only have the raw file_path
+                FieldCondition(key="file_path", match=MatchAny(
+                    any=list({normalized_doc_path, doc_path, doc_path.replace('/', '\\')})
+                )),
+            ])
             
-            # Scroll all points (local Qdrant doesn't support payload indexes for filtering)
-            # Filter in Python code instead
-            points, _ = client.scroll(
-                collection_name=collection_name,
-                limit=100000,  # Large limit to get all
-                with_payload=True,
-                with_vectors=False
-            )
+            # Cloud resolves the filter through payload indexes; embedded local Qdrant
+            # evaluates it in its own scan, which still beats filtering in Python
+            try:
+                points = self._scroll_all(client, collection_name, scroll_filter=file_filter,
+                                          with_payload=EXISTING_CHUNK_FIELDS)
+            except Exception as e:
+                logger.debug("Filtered scroll failed, falling back to full scroll: %s", e)
+                points = [
+                    point for point in self._scroll_all(client, collection_name,
+                                                        with_payload=EXISTING_CHUNK_FIELDS)
+                    if self._normalize_path(point.payload.get('file_path', '')) == normalized_doc_path
+                ]
             
-            # Filter points by file_path in Python
             for point in points:
                 payload = point.payload
-                point_file_path = payload.get('file_path', '')
-                normalized_point_path = self._normalize_path(point_file_path)
-                
-                # Check if this point belongs to our file (try all path variants)
-                if normalized_point_path in path_variants or point_file_path in path_variants:
-                    key = (normalized_doc_path, payload.get('line_start', 0))
-                    existing[key] = {
-                        'id': point.id,
-                        'content': payload.get('content', ''),
-                        'line_start': payload.get('line_start', 0),
-                        'line_end': payload.get('line_end', 0)
-                    }
+                key = (normalized_doc_path, payload.get('line_start', 0))
+                existing[key] = {
+                    'id': point.id,
+                    'content': payload.get('content', ''),
+                    'line_start': payload.get('line_start', 0),
+                    'line_end': payload.get('line_end', 0)
+                }
             
             if existing:
-                logger.debug(f"Found {len(existing)} existing chunks for {doc_path}")
+                logger.debug("Found %d existing chunks for %s", len(existing), doc_path)
         except Exception as e:
-            logger.debug(f"Could not fetch existing chunks: {e}")
+            logger.debug("Could not fetch existing chunks: %s", e)
         return existing
     
     def index_doc(self, doc_path: str, collection: str, chunks: List[Dict]) -> bool:
@@ -305,11 +905,11 @@ class HybridVectorStore:
         
         try:
             # Log which file we're processing
-            logger.info(f"📄 Processing file: {doc_path} (collection: {collection})")
+            logger.info("📄 Processing file: %s (collection: %s)", doc_path, collection)
             
             # Get existing chunks for this file ONLY
-            existing_chunks = self._get_existing_chunks(client, coll_name, doc_path)
-            logger.info(f"   Found {len(existing_chunks)} existing chunks for this file")
+            existing_chunks = self._get_existing_chunks_cached(collection, doc_path)
+            logger.info("   Found %d existing chunks for this file", len(existing_chunks))
             
             # Normalize path for comparison
             normalized_doc_path = self._normalize_path(doc_path)
@@ -346,37 +946,78 @@ class HybridVectorStore:
             # Process updates and adds
             # Also unmark any previously soft-deleted chunks for this file
             points_to_upsert = []
-            for chunk in to_update + to_add:
+            pending = to_update + to_add
+            # Chunks whose text is already stored under another line (e.g. shifted by an
+            # insertion above) reuse that point's vector; only novel text is encoded
+            pending_hashes = [self._content_hash(chunk['content']) for chunk in pending]
+            reused = self._reuse_existing_vectors(client, coll_name, pending_hashes, existing_chunks)
+            novel = [i for i, h in enumerate(pending_hashes) if h not in reused]
+            vectors = [reused.get(h) for h in pending_hashes]
+            for i, vector in zip(novel, self._encode_batch([pending[i]['content'] for i in novel])):
+                vectors[i] = vector
+            if reused:
+                logger.info("   Reused %d vectors for moved chunks", len(pending) - len(novel))
+            # Updates overwrite the point already stored for that line; only adds need new IDs
+            point_ids = [existing_chunks[(normalized_doc_path, chunk['line_start'])]['id'] for chunk in to_update]
+            point_ids += self._generate_point_ids_batch(to_add, doc_path)
+            for chunk, vector, point_id, chunk_hash in zip(pending, vectors, point_ids, pending_hashes):
+                if vector is None:
+                    logger.error(f"Skipping chunk at line {chunk.get('line_start', '?')}: encoding failed")
+                    continue
                 try:
-                    vector = self.embedder.encode(chunk['content']).tolist()
-                    # Use helper method for consistent ID generation
-                    point_id = self.generate_point_id(chunk['content'], doc_path, chunk['line_start'])
                     payload = {
                         "content": chunk['content'],
                         "file_path": doc_path,
+                        "file_path_norm": normalized_doc_path,
                         "line_start": chunk['line_start'],
                         "line_end": chunk['line_end'],
+                        "content_hash": chunk_hash,
                         "is_deleted": False,  # Unmark if previously deleted
                         **chunk.get('metadata', {})
                     }
+                    # PointStruct validates a list of floats; convert only at this boundary
                     points_to_upsert.append(PointStruct(
                         id=point_id,
-                        vector=vector,
+                        vector=vector.tolist(),
                         payload=payload
                     ))
                 except Exception as e:
-                    logger.error(f"Failed to encode chunk at line {chunk.get('line_start', '?')}: {e}")
+                    logger.error(f"Failed to build point for chunk at line {chunk.get('line_start', '?')}: {e}")
                     continue
             
             # Execute operations
-            if points_to_upsert:
-                client.upsert(collection_name=coll_name, points=points_to_upsert)
+            # Batched, non-blocking upserts let the server pipeline segment writes
+            # (operations are applied in order, so the delete below still follows them)
+            for batch in self.chunk_batch(points_to_upsert, UPSERT_BATCH_SIZE):
+                client.upsert(
+                    collection_name=coll_name,
+                    points=batch,
+                    wait=False
+                )
             
             if to_delete_ids:
                 client.delete(collection_name=coll_name, points_selector=to_delete_ids)
             
+            if points_to_upsert or to_delete_ids:
+                self._clear_result_caches(collection)
+            
+            # Remember the file's new state; if any chunk failed to encode, the
+            # stored state is uncertain, so let the next call scroll again
+            if len(points_to_upsert) == len(pending):
+                new_state = {key: existing_chunks[key] for key in new_chunks_map if key in existing_chunks}
+                for point in points_to_upsert:
+                    new_state[(normalized_doc_path, point.payload['line_start'])] = {
+                        'id': point.id,
+                        'content': point.payload['content'],
+                        'line_start': point.payload['line_start'],
+                        'line_end': point.payload['line_end']
+                    }
+                self._remember_existing_chunks(collection, normalized_doc_path, new_state)
+            else:
+                self._forget_existing_chunks(collection, normalized_doc_path)
+            
             # Log summary with clear file identification
-            if to_update or to_add or to_delete_ids:
+            if (to_update or to_add or to_delete_ids) and logger.isEnabledFor(logging.INFO):
                 actions = []
                 if to_update:
                     actions.append(f"{len(to_update)} updated")
@@ -384,15 +1025,97 @@ class HybridVectorStore:
                     actions.append(f"{len(to_add)} added")
                 if to_delete_ids:
                     actions.append(f"{len(to_delete_ids)} deleted")
-                logger.info(f"✅ {doc_path} ({collection}): {', '.join(actions)} - ONLY this file was modified")
-            else:
-                logger.info(f"✅ {doc_path} ({collection}): No changes detected - file already up to date")
+                logger.info("✅ %s (%s): %s - ONLY this file was modified", doc_path, collection, ', '.join(actions))
+            elif not (to_update or to_add or to_delete_ids):
+                logger.info("✅ %s (%s): No changes detected - file already up to date", doc_path, collection)
             
             return True
         except Exception as e:
             logger.error(f"Indexing failed for {doc_path}: {e}")
+            self._forget_existing_chunks(collection, self._normalize_path(doc_path))
             return False
     
+    def prefetch_embeddings(self, docs: List[Tuple[str, List[Dict]]], collections: List[str]) -> int:
+        """
+        Encode the chunks that upcoming index_doc calls will need, in one batch.
+        
+        index_doc encodes each file's new/changed chunks on its own; calling this
+        first for a group of files sends all of them to the model in one call,
+        and the per-file index_doc calls are then served from the embedding cache.
+        
+        Args:
+            docs: (doc_path, chunks) pairs, as they will be passed to index_doc
+            collections: Collections the docs will be indexed into
+        
+        Returns: Number of distinct texts encoded (or served from cache)
+        """
+        texts = {}
+        try:
+            for doc_path, chunks in docs:
+                normalized_doc_path = self._normalize_path(doc_path)
+                for collection in collections:
+                    if collection == "local" and not self.local_enabled:
+                        continue
+                    existing_chunks = self._get_existing_chunks_cached(collection, doc_path)
+                    for chunk in chunks:
+                        existing = existing_chunks.get((normalized_doc_path, chunk['line_start']))
+                        if existing is None or existing['content'] != chunk['content']:
+                            texts[chunk['content']] = None
+            if texts:
+                self._encode_batch(list(texts))
+        except Exception as e:
+            # Only a warm-up: index_doc encodes whatever is still missing
+            logger.warning(f"Embedding prefetch failed for {len(docs)} files: {e}")
+        return len(texts)
+    
+    @contextmanager
+    def bulk_load(self, collection: str = "cloud"):
+        """
+        Context manager for first-time bulk indexing into an empty collection.
+        
+        Sets indexing_threshold=0 so the server doesn't rebuild HNSW on every
+        insert, then restores the previous threshold on exit (which triggers a
+        single index build). Does nothing for non-empty or local collections.
+        """
+        paused = False
+        previous_threshold = None
+        if collection == "cloud":
+            try:
+                info = self.cloud_client.get_collection(self.cloud_collection)
+                if not info.points_count:
+                    previous_threshold = info.config.optimizer_config.indexing_threshold
+                    self.cloud_client.update_collection(
+                        collection_name=self.cloud_collection,
+                        optimizers_config=OptimizersConfigDiff(indexing_threshold=0)
+                    )
+                    paused = True
+                    logger.info("Bulk load: HNSW indexing paused until upload completes")
+            except Exception as e:
+                logger.warning(f"Could not pause indexing for bulk load: {e}")
+        try:
+            yield
+        finally:
+            if paused:
+                if previous_threshold is None:
+                    previous_threshold = DEFAULT_INDEXING_THRESHOLD
+                try:
+                    self.cloud_client.update_collection(
+                        collection_name=self.cloud_collection,
+                        optimizers_config=OptimizersConfigDiff(indexing_threshold=previous_threshold)
+                    )
+                    logger.info(f"Bulk load complete: indexing_threshold restored to {previous_threshold}")
+                except Exception as e:
+                    logger.error(f"Failed to restore indexing_threshold after bulk load: {e}")
+    
+    async def aindex_doc(self, doc_path: str, collection: str, chunks: List[Dict]) -> bool:
+        """
+        Async version of index_doc().
+        
+        Indexing is dominated by embedding (CPU) and mixes cloud/local clients, so
+        the whole diff-and-upsert runs in a worker thread to keep the loop free.
+        """
+        return await asyncio.to_thread(self.index_doc, doc_path, collection, chunks)
+    
     def get_collection_stats(self) -> Dict:
         """Get stats for both collections"""
         stats = {"cloud": {"count": 0, "size": 0}, "local": {"count": 0, "size": 0}}
@@ -444,55 +1167,66 @@ class HybridVectorStore:
         try:
             # Get all indexed file paths
             indexed_files = set()
-            points_to_mark_deleted = []
+            # Orphaned point ids grouped by their stored file_path
+            orphans_by_file: Dict[str, List] = {}
             
-            points, _ = client.scroll(
-                collection_name=coll_name,
-                limit=100000,
-                with_payload=True,
-                with_vectors=False
-            )
+            # Already-deleted chunks are excluded by the filter
+            # Only the path fields are needed here - skip content and metadata
+            points = self._scroll_all(client, coll_name, scroll_filter=NOT_DELETED_FILTER,
+                                      with_payload=["file_path", "file_path_norm"])
             
             for point in points:
-                # Skip already deleted chunks
-                if point.payload.get('is_deleted', False):
-                    continue
-                    
                 file_path = point.payload.get('file_path', '')
                 if file_path:
-                    normalized = self._normalize_path(file_path)
+                    normalized = point.payload.get('file_path_norm') or self._normalize_path(file_path)
                     indexed_files.add(normalized)
                     
                     # Check if file no longer exists
                     if normalized not in existing_files:
-                        # Also check path variants
-                        path_variants = {
-                            file_path,
-                            file_path.replace('/', '\\'),
-                            file_path.replace('\\', '/'),
-                            normalized
-                        }
-                        if not any(variant in existing_files for variant in path_variants):
-                            points_to_mark_deleted.append(point.id)
+                        # Also check path variants (normalized form already checked above)
+                        if file_path not in existing_files and file_path.replace('/', '\\') not in existing_files:
+                            orphans_by_file.setdefault(file_path, []).append(point.id)
             
             # Soft-delete orphaned chunks (mark as deleted, don't remove)
-            if points_to_mark_deleted:
+            orphan_count = sum(len(ids) for ids in orphans_by_file.values())
+            if orphan_count:
                 if dry_run:
-                    logger.info(f"🧪 Dry-run: {len(points_to_mark_deleted)} chunks would be marked as deleted ({collection})")
-                    return len(points_to_mark_deleted)
+                    logger.info(f"🧪 Dry-run: {orphan_count} chunks would be marked as deleted ({collection})")
+                    return orphan_count
                 else:
-                    # Mark as deleted by updating payload (batch update for efficiency)
-                    # Qdrant supports batch updates - process in chunks of 1000 to avoid timeouts
-                    batch_size = 1000
                     total_marked = 0
+                    ids_to_mark = []
                     
-                    for i in range(0, len(points_to_mark_deleted), batch_size):
-                        batch = points_to_mark_deleted[i:i + batch_size]
+                    if collection == "cloud":
+                        # One request per orphan file: the server selects the chunks
+                        # through the file_path payload index
+                        for file_path, point_ids in orphans_by_file.items():
+                            try:
+                                client.set_payload(
+                                    collection_name=coll_name,
+                                    payload={"is_deleted": True},
+                                    points=FilterSelector(filter=Filter(
+                                        must=[self._match_condition("file_path", file_path)]
+                                    ))
+                                )
+                                total_marked += len(point_ids)
+                            except Exception as e:
+                                logger.warning(f"Failed to mark {file_path} as deleted by filter: {e}")
+                                ids_to_mark.extend(point_ids)
+                    else:
+                        # Local collection has no payload indexes - mark by id
+                        for point_ids in orphans_by_file.values():
+                            ids_to_mark.extend(point_ids)
+                    
+                    # Mark by id in chunks of 1000 to avoid timeouts
+                    batch_size = 1000
+                    for i in range(0, len(ids_to_mark), batch_size):
+                        batch = ids_to_mark[i:i + batch_size]
                         try:
                             client.set_payload(
                                 collection_name=coll_name,
                                 payload={"is_deleted": True},
-                                points=batch  # Batch update - much faster!
+                                points=batch
                             )
                             total_marked += len(batch)
                         except Exception as e:
@@ -509,6 +1243,9 @@ class HybridVectorStore:
                                 except Exception as e2:
                                     logger.warning(f"Failed to mark point {point_id} as deleted: {e2}")
                     
+                    if total_marked:
+                        self._clear_result_caches(collection)
+                    
                     logger.info(f"🏷️  Marked {total_marked} chunks as deleted (soft-delete) ({collection})")
                     logger.info(f"   Note: These chunks are excluded from search but can be recovered")
                     return total_marked
@@ -526,6 +1263,8 @@ class HybridVectorStore:
         top_k: int = 20,
         bm25_weight: float = 0.3,
         vector_weight: float = 0.7,
+        filters: Optional[Dict[str, Any]] = None,
+        missing_as: Optional[Dict[str, Any]] = None,
     ) -> List[SearchResult]:
         """
         Hybrid search combining BM25 (keyword) and vector (semantic) search.
@@ -536,6 +1275,9 @@ class HybridVectorStore:
             top_k: Number of results to return
             bm25_weight: Weight for BM25 scores (0.0-1.0)
             vector_weight: Weight for vector scores (0.0-1.0)
+            filters: Payload field -> required value, applied by Qdrant during the
+                     search (so top_k matching results come back)
+            missing_as: Payload field -> value assumed for points without that field
 
         Returns:
             Ranked list of search results
@@ -548,57 +1290,120 @@ class HybridVectorStore:
 
         try:
             # Get vector embedding
-            query_vector = embedder.encode(query).tolist()
+            query_vector = self._encode_query(query, embedder)
 
-            # Search cloud collection (with both BM25 and vector)
-            cloud_results = []
-            try:
-                # No filter in query - we'll filter is_deleted in Python to avoid boolean index requirement
-                # Qdrant supports both BM25 and vector search
-                # For now, use vector search as primary
-                cloud_response = self.cloud_client.query_points(
-                    collection_name=self.cloud_collection,
-                    query=NearestQuery(nearest=query_vector),
-                    limit=top_k * 2,  # Get more for hybrid scoring and deleted item filtering
-                )
-                cloud_results = self._parse_search_results(cloud_response.points, "cloud")
-            except Exception as e:
-                logger.warning(f"Cloud hybrid search failed: {e}, falling back to local")
+            query_filter, filter_key = self._search_filter(filters, missing_as)
+            space = self._semantic_space_of(embedder, filter_key)
 
-            # Search local collection if needed (and enabled)
-            local_results = []
-            if len(cloud_results) < top_k and self.local_enabled:
-                try:
-                    # No filter in query - filter in Python instead
-                    local_response = self.local_client.query_points(
-                        collection_name=self.local_collection,
-                        query=NearestQuery(nearest=query_vector),
-                        limit=top_k * 2,
-                    )
-                    existing_keys = {(r.file_path, r.line_number) for r in cloud_results}
-                    for result in local_response.points:
-                        key = (result.payload.get("file_path", ""), result.payload.get("line_start", 0))
-                        if key not in existing_keys:
-                            local_results.append(self._create_search_result(result, "local"))
-                            existing_keys.add(key)
-                except Exception as e:
-                    logger.error(f"Local hybrid search failed: {e}")
+            # Near-duplicate of a recent query with the same embedder and filters: skip Qdrant
+            cached = self._semantic_cache_get(query_vector, top_k, space)
+            if cached is not None:
+                return cached
 
-            # Combine results
-            all_results = cloud_results + local_results
-            
-            # Filter out soft-deleted chunks (do this in Python, not in query)
-            # This avoids requiring a boolean index in cloud Qdrant
-            all_results = [r for r in all_results if not r.metadata.get('is_deleted', False)]
-            
-            # Sort and return top_k
-            all_results.sort(key=lambda x: x.score, reverse=True)
-            return all_results[:top_k]
+            # Search cloud and local collections concurrently
+            # Qdrant supports both BM25 and vector search
+            # For now, use vector search as primary
+            # Results come back deduplicated, sorted by score and cut to top_k
+            results, complete = self._search_collections(query_vector, top_k, query_filter)
+            if complete:
+                self._semantic_cache_put(query_vector, top_k, results, space)
+            return results
 
         except Exception as e:
             logger.error(f"Hybrid search failed: {e}")
             raise
 
+    def hybrid_search_batch(self, queries: List[str], embedder, top_k: int = 20,
+                            filters: Optional[Dict[str, Any]] = None,
+                            missing_as: Optional[Dict[str, Any]] = None) -> List[List[SearchResult]]:
+        """
+        hybrid_search for several queries at once.
+        
+        Uncached queries are embedded in one model call and sent to the cloud
+        collection in one batched Qdrant request; local results are merged per
+        query as in _search_collections.
+        
+        Args:
+            queries: Search queries
+            embedder: Embedding model to use (for routing doc vs code)
+            top_k: Number of results per query
+            filters: Payload field -> required value (as in hybrid_search)
+            missing_as: Payload field -> value assumed for points without that field
+        
+        Returns:
+            One ranked result list per query, in input order
+        
+        Raises:
+            RuntimeError: If a query could not be embedded
+        """
+        vectors = self._encode_queries(queries, embedder)
+        if any(vector is None for vector in vectors):
+            raise RuntimeError("Failed to embed search queries")
+        query_filter, filter_key = self._search_filter(filters, missing_as)
+        space = self._semantic_space_of(embedder, filter_key)
+        
+        results: List[Optional[List[SearchResult]]] = [
+            self._semantic_cache_get(vector, top_k, space) for vector in vectors
+        ]
+        misses = [i for i, cached in enumerate(results) if cached is None]
+        if not misses:
+            return results
+        
+        cloud_results = [[] for _ in misses]
+        cloud_ok = False
+        try:
+            responses = self.cloud_client.query_batch_points(
+                collection_name=self.cloud_collection,
+                requests=[
+                    QueryRequest(query=vectors[i].tolist(), filter=query_filter, limit=top_k)
+                    for i in misses
+                ]
+            )
+            cloud_results = [self._parse_search_results(response.points, 'cloud') for response in responses]
+            cloud_ok = True
+        except Exception as e:
+            logger.warning(f"Cloud batch search failed: {e}" + (", using local only" if self.local_enabled else ""))
+        
+        for i, cloud in zip(misses, cloud_results):
+            complete = cloud_ok
+            if self.local_enabled:
+                try:
+                    local = self._search_local(vectors[i], top_k, query_filter)
+                except Exception as e:
+                    logger.error(f"Local search failed: {e}")
+                    local = []
+                    complete = False
+                results[i] = self._merge_top_k(cloud, local, top_k)
+            else:
+                results[i] = cloud
+            # Partial results (a side failed) are returned but not cached
+            if complete:
+                self._semantic_cache_put(vectors[i], top_k, results[i], space)
+        return results
+
+    def _search_filter(self, filters: Optional[Dict[str, Any]],
+                       missing_as: Optional[Dict[str, Any]] = None) -> Tuple[Filter, Any]:
+        """
+        Qdrant filter for search-time payload filters (always excluding soft-deleted points).
+        
+        A field whose missing_as value equals the required value also matches
+        points that don't have the field.
+        
+        Returns:
+            (filter, hashable key of the filters for the semantic cache; None if unfiltered)
+        """
+        if not filters:
+            return NOT_DELETED_FILTER, None
+        missing_as = missing_as or {}
+        conditions = []
+        for key, value in filters.items():
+            condition = self._match_condition(key, value)
+            if key in missing_as and missing_as[key] == value:
+                condition = Filter(should=[condition, IsEmptyCondition(is_empty=PayloadField(key=key))])
+            conditions.append(condition)
+        filter_key = tuple(sorted((key, value, missing_as.get(key) == value) for key, value in filters.items()))
+        return Filter(must=conditions, must_not=NOT_DELETED_FILTER.must_not), filter_key
+
     def search_with_expansion(
         self,
         query: str,
@@ -642,27 +1447,22 @@ class HybridVectorStore:
                     section_files[key] = []
                 section_files[key].append(result)
 
-            # Step 3: Expand - get ALL chunks from relevant sections
+            # Step 3: Expand - get ALL chunks from relevant sections (one request for all)
             expanded_results = []
             seen_keys = set()
+            try:
+                chunks_by_section = self._get_chunks_from_sections(list(section_files))
+            except Exception as e:
+                logger.warning(f"Failed to expand sections: {e}")
+                # Fall back to the initial results for every section
+                chunks_by_section = section_files
 
-            for (file_path, section), _ in section_files.items():
-                try:
-                    # Use Qdrant filters to get all chunks from this section
-                    section_chunks = self._get_all_chunks_from_section(file_path, section)
-                    for chunk in section_chunks:
-                        key = (chunk.file_path, chunk.line_number)
-                        if key not in seen_keys:
-                            expanded_results.append(chunk)
-                            seen_keys.add(key)
-                except Exception as e:
-                    logger.warning(f"Failed to expand section {section} from {file_path}: {e}")
-                    # Fall back to initial results for this section
-                    for result in section_files[(file_path, section)]:
-                        key = (result.file_path, result.line_number)
-                        if key not in seen_keys:
-                            expanded_results.append(result)
-                            seen_keys.add(key)
+            for section_key in section_files:
+                for chunk in chunks_by_section.get(section_key, []):
+                    key = (chunk.file_path, chunk.line_number)
+                    if key not in seen_keys:
+                        expanded_results.append(chunk)
+                        seen_keys.add(key)
 
             # Sort by score
             expanded_results.sort(key=lambda x: x.score, reverse=True)
@@ -673,87 +1473,93 @@ class HybridVectorStore:
             # Fall back to basic search
             return self.hybrid_search(query, embedder, top_k=rerank_top_k)
 
-    def _get_all_chunks_from_section(self, file_path: str, section: str) -> List[SearchResult]:
+    def _match_condition(self, key: str, value: Any, condition_cache: Optional[Dict] = None) -> FieldCondition:
+        """Build (or reuse from condition_cache) an exact-match FieldCondition"""
+        if condition_cache is None:
+            return FieldCondition(key=key, match=MatchValue(value=value))
+        cache_key = (key, value)
+        condition = condition_cache.get(cache_key)
+        if condition is None:
+            condition = FieldCondition(key=key, match=MatchValue(value=value))
+            condition_cache[cache_key] = condition
+        return condition
+
+    def _get_chunks_from_sections(self, sections: List[tuple],
+                                  condition_cache: Optional[Dict] = None) -> Dict[tuple, List[SearchResult]]:
         """
-        Get ALL chunks from a specific section using Qdrant filters.
+        Get ALL chunks from several (file_path, section) pairs with one filtered scroll.
 
         Args:
-            file_path: File path to filter by
-            section: Section name to filter by
+            sections: List of (file_path, section) pairs
+            condition_cache: Optional dict reused across calls to share FieldConditions
 
         Returns:
-            List of all chunks from that section
+            Dict of (file_path, section) -> chunks from that section
+            (cloud first, local added for sections with fewer than 10 cloud chunks)
 
         Raises:
             Exception: If retrieval fails
         """
-        chunks = []
+        if condition_cache is None:
+            condition_cache = {}
+        buckets: Dict[tuple, List[SearchResult]] = {key: [] for key in sections}
 
-        # Try cloud first
-        try:
-            # Create filter for this file and section (no boolean filter - filter in Python)
+        def section_filter(keys) -> Filter:
+            # One exact (file_path AND section) clause per pair, OR-ed together;
+            # soft-deleted chunks are excluded server-side (is_deleted BOOL index)
             # Note: section is stored at top-level, not in nested metadata
-            filter_condition = Filter(
-                must=[
-                    FieldCondition(key="file_path", match=MatchValue(value=file_path)),
-                    FieldCondition(key="section", match=MatchValue(value=section)),
-                ]
-            )
-
-            points, _ = self.cloud_client.scroll(
-                collection_name=self.cloud_collection,
-                scroll_filter=filter_condition,
-                limit=1000,
-                with_payload=True,
-                with_vectors=False,
+            return Filter(
+                should=[
+                    Filter(must=[
+                        self._match_condition("file_path", file_path, condition_cache),
+                        self._match_condition("section", section, condition_cache),
+                    ])
+                    for file_path, section in keys
+                ],
+                must_not=NOT_DELETED_FILTER.must_not
             )
 
-            # Filter out soft-deleted chunks in Python
+        def collect(points, collection: str):
             for point in points:
-                if not point.payload.get('is_deleted', False):
-                    chunks.append(self._create_search_result(point, "cloud"))
+                bucket = buckets.get((point.payload.get("file_path", ""), point.payload.get("section")))
+                if bucket is not None:
+                    bucket.append(self._create_search_result(point, collection))
 
+        # Try cloud first
+        try:
+            collect(self._scroll_all(self.cloud_client, self.cloud_collection,
+                                     scroll_filter=section_filter(sections)), "cloud")
         except Exception as e:
-            logger.warning(f"Cloud section retrieval failed for {file_path}:{section}: {e}")
+            logger.warning(f"Cloud section retrieval failed for {len(sections)} sections: {e}")
 
-        # Try local if cloud didn't return enough (and local is enabled)
-        if len(chunks) < 10 and self.local_enabled:
+        # Try local for sections where cloud didn't return enough (and local is enabled)
+        sparse = [key for key in sections if len(buckets[key]) < 10]
+        if sparse and self.local_enabled:
             try:
-                filter_condition = Filter(
-                    must=[
-                        FieldCondition(key="file_path", match=MatchValue(value=file_path)),
-                        FieldCondition(key="section", match=MatchValue(value=section)),
-                    ]
-                )
-
-                points, _ = self.local_client.scroll(
-                    collection_name=self.local_collection,
-                    scroll_filter=filter_condition,
-                    limit=1000,
-                    with_payload=True,
-                    with_vectors=False,
-                )
-
-                existing_keys = {(c.file_path, c.line_number) for c in chunks}
-                # Filter out soft-deleted chunks in Python
-                for point in points:
-                    if not point.payload.get('is_deleted', False):
-                        key = (point.payload.get("file_path", ""), point.payload.get("line_start", 0))
-                        if key not in existing_keys:
-                            chunks.append(self._create_search_result(point, "local"))
-                            existing_keys.add(key)
-
+                # Fixed once cloud has run; local point IDs are per (file_path, line_start),
+                # so local results cannot duplicate each other
+                existing_keys = frozenset((c.file_path, c.line_number) for key in sparse for c in buckets[key])
+                sparse_set = frozenset(sparse)
+                for point in self._scroll_all(self.local_client, self.local_collection,
+                                              scroll_filter=section_filter(sparse)):
+                    file_path = point.payload.get("file_path", "")
+                    section_key = (file_path, point.payload.get("section"))
+                    key = (file_path, point.payload.get("line_start", 0))
+                    if section_key in sparse_set and key not in existing_keys:
+                        buckets[section_key].append(self._create_search_result(point, "local"))
             except Exception as e:
-                logger.warning(f"Local section retrieval failed for {file_path}:{section}: {e}")
+                logger.warning(f"Local section retrieval failed for {len(sparse)} sections: {e}")
 
-        logger.debug(f"Retrieved {len(chunks)} chunks from section {section} in {file_path}")
-        return chunks
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Retrieved %d chunks from %d sections", sum(len(b) for b in buckets.values()), len(sections))
+        return buckets
     
     # Helper methods for CRUD operations
     def generate_point_id(self, content: str, file_path: str = "", line_start: int = 0) -> int:
         """
         Generate deterministic point ID using hash-based approach.
         Same input = same ID (prevents duplicates, ensures idempotency).
+        IDs are the top 63 bits of a blake2b-64 digest, stable across processes.
         
         Strategy:
         - File-based vectors (has file_path + line_start): Use file_path:line_start hash
@@ -769,33 +1575,52 @@ class HybridVectorStore:
         """
         # File-based vectors: use file_path + line_start (for indexing operations)
         if file_path and line_start > 0:
-            return abs(hash(f"{file_path}:{line_start}")) % (2**63 - 1)
+            return self._generate_point_ids_batch([{'line_start': line_start}], file_path)[0]
         # Standalone vectors: use content hash (for CRUD operations without file_path)
         else:
-            # Normalize content for consistent hashing
-            normalized_content = content.encode('utf-8', errors='ignore').decode('utf-8')
-            normalized_content = ' '.join(normalized_content.split())  # Normalize whitespace
-            return abs(hash(normalized_content)) % (2**63 - 1)
+            # Normalize whitespace for consistent hashing, then hash the bytes directly
+            normalized_content = _norm_ws(' ', content).strip()
+            digest = hashlib.blake2b(normalized_content.encode('utf-8', errors='ignore'), digest_size=8).digest()
+            return int.from_bytes(digest, 'big') >> 1
+    
+    def _generate_point_ids_batch(self, chunks: List[Dict], file_path: str) -> List[int]:
+        """
+        Point IDs for many chunks of one file in a single pass.
+        
+        ID = first 63 bits of blake2b("file_path:line_start"), so it is stable
+        across processes (unlike hash()) and the same line keeps the same ID when
+        its content changes. The encoded path prefix is computed once per file.
+        """
+        prefix = f"{file_path}:".encode('utf-8')
+        blake2b = hashlib.blake2b
+        from_bytes = int.from_bytes
+        return [
+            from_bytes(blake2b(prefix + str(chunk['line_start']).encode(), digest_size=8).digest(), 'big') >> 1
+            for chunk in chunks
+        ]
     
-    def create_point_struct(self, point_id: int, vector: List[float], payload: Dict) -> PointStruct:
+    def create_point_struct(self, point_id: int, vector, payload: Dict) -> PointStruct:
         """
         Helper for creating PointStruct objects with consistent formatting.
         
         Args:
             point_id: Point ID
-            vector: Vector embedding
+            vector: Vector embedding (list or float32 numpy array)
             payload: Payload metadata
             
         Returns:
             PointStruct object
         """
+        # PointStruct validates a list of floats; arrays are converted only here
+        if isinstance(vector, np.ndarray):
+            vector = vector.tolist()
         return PointStruct(
             id=point_id,
             vector=vector,
             payload=payload
         )
     
-    def encode_content(self, content: str) -> List[float]:
+    def encode_content(self, content: str) -> np.ndarray:
         """
         Generate embeddings from content with UTF-8 normalization.
         
@@ -803,21 +1628,29 @@ class HybridVectorStore:
             content: Text content to encode
             
         Returns:
-            Vector embedding as list of floats
+            Vector embedding as a float32 numpy array (L2-normalized, read-only
+            when served from the embedding cache)
         """
         # Normalize content (UTF-8, whitespace handling)
         normalized = content.encode('utf-8', errors='ignore').decode('utf-8')
-        normalized = ' '.join(normalized.split())  # Normalize whitespace
+        normalized = _norm_ws(' ', normalized).strip()  # Normalize whitespace
         
-        vector = self.embedder.encode(normalized).tolist()
+        # Repeated content (boilerplate, retried adds) is served from the
+        # blake2b-keyed embedding cache instead of running the model again
+        vector = self.embed_cache.encode(self.embedder, normalized)
+        norm = float(np.linalg.norm(vector))
+        if norm > 0 and abs(norm - 1.0) > 1e-4:
+            vector = vector / norm
         return vector
     
     def validate_vector(self, vector: List[float], expected_dim: Optional[int] = None) -> bool:
         """
         Comprehensive vector validation: dimension, type, range checks.
         
+        The element checks run as one vectorized numpy pass; NaN/Inf are rejected.
+        
         Args:
-            vector: Vector to validate
+            vector: Vector to validate (list of numbers or 1-D numpy array)
             expected_dim: Expected dimension (uses self.vector_size if None)
             
         Returns:
@@ -830,7 +1663,7 @@ class HybridVectorStore:
             expected_dim = self.vector_size
         
         # Check type
-        if not isinstance(vector, list):
+        if not isinstance(vector, (list, np.ndarray)):
             raise DimensionMismatchError(
                 code="INVALID_TYPE",
                 message=f"Vector must be a list, got {type(vector).__name__}",
@@ -847,15 +1680,50 @@ class HybridVectorStore:
                 suggestions=[f"Ensure vector has exactly {expected_dim} dimensions", "Check embedding model configuration"]
             )
         
-        # Check all elements are numeric
-        for i, val in enumerate(vector):
-            if not isinstance(val, (int, float)):
-                raise DimensionMismatchError(
-                    code="INVALID_ELEMENT_TYPE",
-                    message=f"Vector element at index {i} is not numeric: {type(val).__name__}",
-                    details={"index": i, "value": val, "type": type(val).__name__},
-                    suggestions=["Ensure all vector elements are numbers", "Check vector format"]
-                )
+        # Check all elements are numeric: without a dtype, numpy infers a numeric
+        # kind only if every element is a number (strings/None/lists give U/O kinds);
+        # ragged nesting makes the conversion itself raise
+        try:
+            arr = np.asarray(vector) if len(vector) else np.empty(0, dtype=np.float32)
+        except (TypeError, ValueError):
+            arr = None
+        if arr is None or arr.ndim != 1 or arr.dtype.kind not in 'biuf':
+            # Slow path only on failure: find the offending element for the message
+            for i, val in enumerate(vector):
+                if not isinstance(val, (int, float, np.number)):
+                    raise DimensionMismatchError(
+                        code="INVALID_ELEMENT_TYPE",
+                        message=f"Vector element at index {i} is not numeric: {type(val).__name__}",
+                        details={"index": i, "value": val, "type": type(val).__name__},
+                        suggestions=["Ensure all vector elements are numbers", "Check vector format"]
+                    )
+            # Every element is a number, but they don't form a numeric array
+            # (e.g. ints beyond int64 give an object array)
+            raise DimensionMismatchError(
+                code="INVALID_ELEMENT_TYPE",
+                message="Vector elements must be numbers representable as floats",
+                details={"dtype": str(arr.dtype) if arr is not None else None},
+                suggestions=["Ensure all vector elements are numbers", "Check vector format"]
+            )
+        
+        # Check range: NaN/Inf poison cosine scores
+        try:
+            finite = np.isfinite(arr)
+        except (TypeError, ValueError) as e:
+            raise DimensionMismatchError(
+                code="INVALID_ELEMENT_TYPE",
+                message=f"Vector elements must be numbers representable as floats: {e}",
+                details={"dtype": str(arr.dtype)},
+                suggestions=["Ensure all vector elements are numbers", "Check vector format"]
+            )
+        if not finite.all():
+            i = int(np.flatnonzero(~finite)[0])
+            raise DimensionMismatchError(
+                code="INVALID_ELEMENT_VALUE",
+                message=f"Vector element at index {i} is not finite: {arr[i]}",
+                details={"index": i, "value": str(arr[i])},
+                suggestions=["Ensure all vector elements are finite numbers", "Check the embedding source"]
+            )
         
         return True
     
@@ -870,51 +1738,17 @@ class HybridVectorStore:
         Returns:
             Qdrant Filter object
         """
-        conditions = []
+        # Each clause maps to the Filter argument of the same name
+        clauses = {
+            clause: [
+                FieldCondition(key=cond["key"], match=MatchValue(value=cond["match"]))
+                for cond in filter_dict.get(clause) or ()
+                if "key" in cond and "match" in cond
+            ]
+            for clause in FILTER_CLAUSES
+        }
         
-        # Handle must conditions
-        if "must" in filter_dict:
-            must_conditions = []
-            for cond in filter_dict["must"]:
-                if "key" in cond and "match" in cond:
-                    must_conditions.append(
-                        FieldCondition(
-                            key=cond["key"],
-                            match=MatchValue(value=cond["match"])
-                        )
-                    )
-            if must_conditions:
-                conditions.extend(must_conditions)
-        
-        # Handle should conditions
-        if "should" in filter_dict:
-            should_conditions = []
-            for cond in filter_dict["should"]:
-                if "key" in cond and "match" in cond:
-                    should_conditions.append(
-                        FieldCondition(
-                            key=cond["key"],
-                            match=MatchValue(value=cond["match"])
-                        )
-                    )
-            if should_conditions:
-                conditions.extend(should_conditions)
-        
-        # Handle must_not conditions
-        if "must_not" in filter_dict:
-            must_not_conditions = []
-            for cond in filter_dict["must_not"]:
-                if "key" in cond and "match" in cond:
-                    must_not_conditions.append(
-                        FieldCondition(
-                            key=cond["key"],
-                            match=MatchValue(value=cond["match"])
-                        )
-                    )
-            if must_not_conditions:
-                conditions.extend(must_not_conditions)
-        
-        if not conditions:
+        if not any(clauses.values()):
             raise ValidationError(
                 code="INVALID_FILTER",
                 message="Filter dictionary must contain 'must', 'should', or 'must_not' conditions",
@@ -922,12 +1756,32 @@ class HybridVectorStore:
                 suggestions=["Provide at least one condition in must/should/must_not", "Check filter format"]
             )
         
-        return Filter(must=conditions if "must" in filter_dict else None)
+        return Filter(**{clause: conditions or None for clause, conditions in clauses.items()})
+    
+    def _compile_filter(self, filter_dict: Dict) -> tuple:
+        """
+        Pre-process a filter dict for _filter_points_in_python.
+        
+        Returns:
+            (musts, shoulds, must_nots), each a list of (key, lowercased match string)
+        """
+        return tuple(
+            [
+                (cond["key"], str(cond["match"]).lower())
+                for cond in filter_dict.get(clause) or ()
+                if "key" in cond and "match" in cond
+            ]
+            for clause in FILTER_CLAUSES
+        )
     
     def _filter_points_in_python(self, points: List, filter_dict: Dict) -> List:
         """
         Filter points in Python when Qdrant filter fails (e.g., unindexed fields).
         
+        Matching is case-insensitive string comparison. Each filtered payload key is
+        normalized into one lowercased column (once per point, however many conditions
+        use the key); conditions are then evaluated as vectorized numpy masks.
+        
         Args:
             points: List of Qdrant point objects
             filter_dict: Filter dictionary with must/should/must_not conditions
@@ -935,52 +1789,37 @@ class HybridVectorStore:
         Returns:
             Filtered list of points
         """
-        filtered_points = []
-        
-        for point in points:
-            payload = point.payload or {}
-            matches = True
-            
-            # Handle must conditions (all must match)
-            if "must" in filter_dict:
-                for cond in filter_dict["must"]:
-                    if "key" in cond and "match" in cond:
-                        field_value = payload.get(cond["key"])
-                        match_value = cond["match"]
-                        # String matching (case-insensitive for flexibility)
-                        if str(field_value).lower() != str(match_value).lower():
-                            matches = False
-                            break
-                if not matches:
-                    continue
-            
-            # Handle should conditions (at least one must match)
-            if "should" in filter_dict and filter_dict["should"]:
-                should_match = False
-                for cond in filter_dict["should"]:
-                    if "key" in cond and "match" in cond:
-                        field_value = payload.get(cond["key"])
-                        match_value = cond["match"]
-                        if str(field_value).lower() == str(match_value).lower():
-                            should_match = True
-                            break
-                if not should_match:
-                    matches = False
-            
-            # Handle must_not conditions (none should match)
-            if "must_not" in filter_dict:
-                for cond in filter_dict["must_not"]:
-                    if "key" in cond and "match" in cond:
-                        field_value = payload.get(cond["key"])
-                        match_value = cond["match"]
-                        if str(field_value).lower() == str(match_value).lower():
-                            matches = False
-                            break
-            
-            if matches:
-                filtered_points.append(point)
-        
-        return filtered_points
+        if not points:
+            return []
+        musts, shoulds, must_nots = self._compile_filter(filter_dict)
+        # An empty "should" list in the dict means no should constraint
+        check_should = bool(filter_dict.get("should"))
+        
+        payloads = [point.payload or {} for point in points]
+        columns: Dict[str, np.ndarray] = {}
+        
+        def column(key: str) -> np.ndarray:
+            col = columns.get(key)
+            if col is None:
+                # object dtype: no fixed-width copy of long string fields
+                col = np.empty(len(payloads), dtype=object)
+                col[:] = [str(payload.get(key)).lower() for payload in payloads]
+                columns[key] = col
+            return col
+        
+        # must: all match; should: at least one matches; must_not: none match
+        mask = np.ones(len(points), dtype=bool)
+        for key, value in musts:
+            mask &= column(key) == value
+        if check_should:
+            any_should = np.zeros(len(points), dtype=bool)
+            for key, value in shoulds:
+                any_should |= column(key) == value
+            mask &= any_should
+        for key, value in must_nots:
+            mask &= column(key) != value
+        
+        return [points[i] for i in np.flatnonzero(mask)]
     
     def ensure_collection_exists(self, collection: str = "cloud"):
         """
@@ -999,16 +1838,16 @@ class HybridVectorStore:
         else:
             raise ValueError(f"Invalid collection: {collection}. Must be 'cloud' or 'local'")
     
-    def chunk_batch(self, items: List, batch_size: int) -> List[List]:
+    def chunk_batch(self, items: List, batch_size: int) -> Iterator[List]:
         """
-        Chunk items into smaller batches.
+        Yield items in batches of batch_size (lazily, one slice at a time).
         
         Args:
             items: List of items to chunk
             batch_size: Size of each batch
             
-        Returns:
-            List of batches
+        Yields:
+            Consecutive batches (the last one may be shorter)
         """
-        return [items[i:i + batch_size] for i in range(0, len(items), batch_size)]
-
+        for i in range(0, len(items), batch_size):
+            yield items[i:i + batch_size]
@@ -9,10 +9,21 @@ Chunking strategy:
 """
 
 import logging
+import re
+from collections import defaultdict
 from typing import List, Dict
 
 logger = logging.getLogger(__name__)
 
+# Import statements at the start of a line (leading whitespace allowed)
+PY_IMPORT_RE = re.compile(r'^[^\S\n]*(?:import |from )[^\n]*', re.MULTILINE)
+TS_IMPORT_RE = re.compile(r'^[^\S\n]*(?:import |require\()[^\n]*', re.MULTILINE)
+MAX_IMPORTS = 10
+
+# First top-level definition; the import scan ends here (file header only)
+PY_BODY_RE = re.compile(r'^(?:async[ \t]+def\b|def\b|class\b|@)', re.MULTILINE)
+TS_BODY_RE = re.compile(r'^(?:export[ \t]+)?(?:default[ \t]+)?(?:async[ \t]+)?(?:function|class|interface)\b', re.MULTILINE)
+
 
 class CodeChunker:
     """Chunk parsed code elements into semantic chunks."""
@@ -47,10 +58,12 @@ class CodeChunker:
             raise ValueError("Cannot chunk empty parsed elements")
 
         chunks = []
+        # Imports are file-level: extract them once, not per element
+        imports = self._extract_imports(file_content, parsed_elements[0].get("language", "python"))
         
         for element in parsed_elements:
             try:
-                chunk = self._create_code_chunk(element, file_content)
+                chunk = self._create_code_chunk(element, imports)
                 if chunk:
                     chunks.append(chunk)
             except Exception as e:
@@ -59,13 +72,13 @@ class CodeChunker:
         logger.debug(f"Created {len(chunks)} code chunks from {len(parsed_elements)} elements")
         return chunks
 
-    def _create_code_chunk(self, element: Dict, file_content: str) -> Dict:
+    def _create_code_chunk(self, element: Dict, imports: List[str]) -> Dict:
         """
         Create a semantic chunk from a parsed element.
 
         Args:
             element: Parsed code element
-            file_content: Original file content for extracting imports
+            imports: Import statements of the element's file (from _extract_imports)
 
         Returns:
             Chunk dictionary with content and metadata
@@ -73,9 +86,6 @@ class CodeChunker:
         Raises:
             Exception: If chunk creation fails
         """
-        # Extract imports from file
-        imports = self._extract_imports(file_content, element.get("language", "python"))
-        
         # Include imports in chunk content
         chunk_content = self._build_chunk_content(element, imports)
         
@@ -104,19 +114,23 @@ class CodeChunker:
         Returns:
             List of import statements
         """
+        # TypeScript/JavaScript unless python
+        if language == "python":
+            pattern, body_pattern = PY_IMPORT_RE, PY_BODY_RE
+        else:
+            pattern, body_pattern = TS_IMPORT_RE, TS_BODY_RE
         imports = []
-        lines = file_content.split('\n')
         
-        for line in lines:
-            line = line.strip()
-            if language == "python":
-                if line.startswith("import ") or line.startswith("from "):
-                    imports.append(line)
-            else:  # TypeScript/JavaScript
-                if line.startswith("import ") or line.startswith("require("):
-                    imports.append(line)
+        # Imports live in the file header: only scan up to the first top-level
+        # definition, and stop once the first MAX_IMPORTS imports are found
+        body = body_pattern.search(file_content)
+        header_end = body.start() if body else len(file_content)
+        for match in pattern.finditer(file_content, 0, header_end):
+            imports.append(match.group(0).strip())
+            if len(imports) == MAX_IMPORTS:
+                break
         
-        return imports[:10]  # Limit to first 10 imports
+        return imports
 
     def _build_chunk_content(self, element: Dict, imports: List[str]) -> str:
         """
@@ -182,27 +196,30 @@ class CodeChunker:
         chunks = []
         imports = self._extract_imports(file_content, parsed_elements[0].get("language", "python") if parsed_elements else "python")
         
-        # Group methods by class
+        # Group elements in one pass: classes, their methods, top-level functions
         classes = {}
+        methods_by_class = defaultdict(list)
         functions = []
         
         for element in parsed_elements:
-            if element.get("type") == "class":
+            element_type = element.get("type")
+            if element_type == "class":
                 classes[element["name"]] = element
-            elif element.get("type") == "function":
+            elif element_type == "function":
                 functions.append(element)
-            # Methods are associated with their class separately
+            elif element_type == "method":
+                methods_by_class[element.get("class_context")].append(element)
         
         # Create class chunks
         for class_name, class_element in classes.items():
             # Include all methods of this class
-            class_methods = [e for e in parsed_elements if e.get("type") == "method" and e.get("class_context") == class_name]
+            class_methods = methods_by_class.get(class_name, [])
             
             chunk_content = self._build_class_chunk(class_element, class_methods, imports)
             chunks.append({
                 "content": chunk_content,
                 "start_line": class_element.get("start_line", 0),
-                "end_line": max([m.get("end_line", 0) for m in class_methods] + [class_element.get("end_line", 0)]),
+                "end_line": max(class_element.get("end_line", 0), max((m.get("end_line", 0) for m in class_methods), default=0)),
                 "metadata": {
                     "code_type": "class",
                     "name": class_name,
@@ -215,7 +232,7 @@ class CodeChunker:
         
         # Create function chunks
         for func_element in functions:
-            chunk = self._create_code_chunk(func_element, file_content)
+            chunk = self._create_code_chunk(func_element, imports)
             chunks.append(chunk)
         
         return chunks
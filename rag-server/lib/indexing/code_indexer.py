@@ -4,18 +4,21 @@ Code Indexer: Index code files into vector store.
 Handles:
 - Parsing code files using CodeParser
 - Chunking using CodeChunker
-- Embedding with CodeBERT
+- Embedding with the vector store's embedder (through its embedding cache)
 - Storing in Qdrant with metadata
 """
 
 import logging
+import os
 import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, Iterator, Optional, Tuple
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from lib.indexing.code_parser import CodeParser
+from lib.indexing.code_parser import CodeParser, SUFFIX_TO_LANG, MMAP_THRESHOLD, open_source
 from lib.indexing.code_chunker import CodeChunker
 from lib.core.embedding_manager import EmbeddingManager
 from lib.core.vector_store import HybridVectorStore
@@ -23,21 +26,215 @@ from qdrant_client.models import PointStruct
 
 logger = logging.getLogger(__name__)
 
+# Supported code file extensions
+SUPPORTED_SUFFIXES = frozenset(SUFFIX_TO_LANG)
+
+# Files read ahead on I/O threads while the serial path parses (small files only)
+READ_AHEAD = 32
+
+# Prepared chunks gathered across files before one batched embedding call
+EMBED_BATCH_CHUNKS = 512
+
+# Files ahead of the parse front the kernel is asked to page in (posix_fadvise)
+PREFETCH_FILES = 64
+
+# Small files are sent to the parser pool in groups of up to this many bytes /
+# files, so each task and result crosses the process boundary once per group
+TASK_BATCH_BYTES = 256 * 1024
+TASK_BATCH_FILES = 32
+
+# Per-process parser/chunker for index_directory's worker pool
+_worker_parser: Optional[CodeParser] = None
+_worker_chunker: Optional[CodeChunker] = None
+
+
+def _find_code_files(root: str, recursive: bool = True) -> Tuple[List[str], int]:
+    """
+    Walk a directory with os.scandir (DirEntry caches the file type, no extra stat).
+
+    Returns:
+        (paths of supported code files, number of other files skipped)
+    """
+    files = []
+    skipped = 0
+    stack = [root]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if recursive:
+                            stack.append(entry.path)
+                    elif entry.is_file():
+                        if os.path.splitext(entry.name)[1] in SUPPORTED_SUFFIXES:
+                            files.append(entry.path)
+                        else:
+                            skipped += 1
+        except OSError as e:
+            logger.warning(f"Cannot read directory: {e}")
+    return files, skipped
+
+
+def _read_small_file(file_path: str) -> Optional[bytes]:
+    """File bytes, or None for files large enough to be memory-mapped instead."""
+    if os.path.getsize(file_path) >= MMAP_THRESHOLD:
+        return None
+    return Path(file_path).read_bytes()
+
+
+def _read_ahead(file_paths: List[str]) -> Iterator[Tuple[str, Optional[bytes], Optional[Exception]]]:
+    """
+    Yield (file_path, bytes or None, read error) in order, with up to READ_AHEAD
+    reads in flight on I/O threads, so parsing never waits on a cold read.
+    """
+    with ThreadPoolExecutor(max_workers=8) as io_pool:
+        pending = deque()
+        paths = iter(file_paths)
+        for file_path in paths:
+            pending.append((file_path, io_pool.submit(_read_small_file, file_path)))
+            if len(pending) >= READ_AHEAD:
+                break
+        while pending:
+            file_path, future = pending.popleft()
+            next_path = next(paths, None)
+            if next_path is not None:
+                pending.append((next_path, io_pool.submit(_read_small_file, next_path)))
+            try:
+                yield file_path, future.result(), None
+            except Exception as e:
+                yield file_path, None, e
+
+
+def _advise_willneed(file_paths: List[str]):
+    """Ask the kernel to start reading files into the page cache (no-op where unsupported)."""
+    if not hasattr(os, "posix_fadvise"):
+        return
+    for file_path in file_paths:
+        try:
+            fd = os.open(file_path, os.O_RDONLY)
+        except OSError:
+            continue
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+
+def _prepare_chunks(parser: CodeParser, chunker: CodeChunker, file_path: str,
+                    source: Optional[bytes] = None) -> List[Dict]:
+    """
+    Parse and chunk one code file into chunks ready for vector_store.index_doc.
+
+    Pure CPU work (no embedding, no Qdrant), so it can run in a worker process.
+
+    Args:
+        source: File bytes if already read (otherwise read here, mapped if large)
+
+    Returns:
+        Formatted chunks ([] if nothing could be parsed or chunked)
+    """
+    # Read the file once (mapped if large); the parser works on the bytes,
+    # the chunker on the text
+    if source is not None:
+        file_content = source.decode("utf-8")
+        parsed_elements = parser.parse_source(source, file_path)
+    else:
+        with open_source(file_path) as source:
+            file_content = str(source, "utf-8")
+
+            # Parse file
+            parsed_elements = parser.parse_source(source, file_path)
+    if not parsed_elements:
+        logger.warning(f"No elements parsed from {file_path}")
+        return []
+
+    # Chunk
+    chunks = chunker.chunk_code(parsed_elements, file_content)
+    if not chunks:
+        logger.warning(f"No chunks created from {file_path}")
+        return []
+
+    # Determine language
+    language = SUFFIX_TO_LANG.get(os.path.splitext(file_path)[1].lower(), "unknown")
+
+    # Embedding happens in index_doc: changed chunks are encoded in one batch
+    # with the store's embedder. The code embedder (CodeBERT, 768-dim) is not
+    # loaded here - its vectors don't fit the 384-dim collection.
+
+    # Convert chunks to format for vector_store.index_doc in place: the chunk
+    # dicts are fresh from the chunker, so each is touched once and no
+    # per-chunk metadata copy is made
+    for chunk in chunks:
+        chunk["line_start"] = chunk.pop("start_line")
+        chunk["line_end"] = chunk.pop("end_line")
+        metadata = chunk["metadata"]
+        metadata["language"] = language
+        metadata.setdefault("code_type", "function")
+    return chunks
+
+
+def _init_worker(parser_cache_path: Optional[Path]):
+    """Worker-process initializer: one parser/chunker per process."""
+    global _worker_parser, _worker_chunker
+    _worker_parser = CodeParser(cache_path=parser_cache_path)
+    _worker_chunker = CodeChunker()
+
+
+def _parse_and_chunk(file_paths: List[str]) -> List[Tuple[str, Optional[List[Dict]], Optional[str]]]:
+    """
+    Worker-process entry point: _prepare_chunks with the process's parser for
+    a group of files.
+
+    Returns:
+        (file_path, chunks or None, error message or None) per file; failures
+        are reported back so the parent logs them
+    """
+    results = []
+    for file_path in file_paths:
+        try:
+            results.append((file_path, _prepare_chunks(_worker_parser, _worker_chunker, file_path), None))
+        except Exception as e:
+            results.append((file_path, None, str(e)))
+    return results
+
+
+def _batch_by_size(file_paths: List[str], file_size: Callable[[str], int],
+                   max_bytes: int = TASK_BATCH_BYTES) -> List[List[str]]:
+    """Group consecutive files up to max_bytes / TASK_BATCH_FILES (large files go alone)."""
+    batches = []
+    batch: List[str] = []
+    batch_bytes = 0
+    for file_path in file_paths:
+        size = file_size(file_path)
+        if batch and (batch_bytes + size > max_bytes or len(batch) == TASK_BATCH_FILES):
+            batches.append(batch)
+            batch, batch_bytes = [], 0
+        batch.append(file_path)
+        batch_bytes += size
+    if batch:
+        batches.append(batch)
+    return batches
+
 
 class CodeIndexer:
     """Index code files into vector store."""
 
-    def __init__(self, vector_store: HybridVectorStore, embedding_manager: EmbeddingManager):
+    def __init__(self, vector_store: HybridVectorStore, embedding_manager: EmbeddingManager,
+                 parser_cache_path: Optional[Path] = None):
         """
         Initialize code indexer.
 
         Args:
             vector_store: HybridVectorStore instance
             embedding_manager: EmbeddingManager instance for code embeddings
+            parser_cache_path: Optional SQLite file so unchanged files skip parsing
         """
         self.vector_store = vector_store
         self.embedding_manager = embedding_manager
-        self.parser = CodeParser()
+        self.parser_cache_path = parser_cache_path
+        self.parser = CodeParser(cache_path=parser_cache_path)
         self.chunker = CodeChunker()
 
     def index_file(self, file_path: str, collection: str = "local") -> bool:
@@ -58,70 +255,41 @@ class CodeIndexer:
         try:
             logger.info(f"Indexing code file: {file_path}")
 
-            # Parse file
-            parsed_elements = self.parser.parse_file(file_path)
-            if not parsed_elements:
-                logger.warning(f"No elements parsed from {file_path}")
-                return False
-
-            # Get file content
-            with open(file_path, "r", encoding="utf-8") as f:
-                file_content = f.read()
-
-            # Chunk
-            chunks = self.chunker.chunk_code(parsed_elements, file_content)
-            if not chunks:
-                logger.warning(f"No chunks created from {file_path}")
+            formatted_chunks = _prepare_chunks(self.parser, self.chunker, file_path)
+            if not formatted_chunks:
                 return False
 
-            # Determine language
-            language = Path(file_path).suffix.lower()
-            if language in [".py"]:
-                language = "python"
-            elif language in [".ts", ".tsx", ".js", ".jsx"]:
-                language = "typescript"
-            else:
-                language = "unknown"
-
-            # Embed chunks using code embedder
-            code_embedder = self.embedding_manager.get_embedder("code")
-
-            # Convert chunks to format for vector_store.index_doc
-            formatted_chunks = []
-            for chunk in chunks:
-                formatted_chunks.append({
-                    "content": chunk["content"],
-                    "line_start": chunk["start_line"],
-                    "line_end": chunk["end_line"],
-                    "metadata": {
-                        **chunk["metadata"],
-                        "language": language,
-                        "code_type": chunk["metadata"].get("code_type", "function")
-                    }
-                })
-
-            # Index in vector store
-            success = self.vector_store.index_doc(file_path, collection, formatted_chunks)
-
-            if success:
-                logger.info(f"✅ Indexed {len(formatted_chunks)} code chunks from {file_path}")
-            else:
-                logger.error(f"Failed to index {file_path}")
-
-            return success
+            return self._store_chunks(file_path, collection, formatted_chunks)
 
         except Exception as e:
             logger.error(f"Code indexing failed for {file_path}: {str(e)}")
             raise RuntimeError(f"Code indexing failed: {str(e)}") from e
 
-    def index_directory(self, directory: str, collection: str = "local", recursive: bool = True) -> Dict[str, int]:
+    def _store_chunks(self, file_path: str, collection: str, formatted_chunks: List[Dict]) -> bool:
+        """Embed and upsert one file's prepared chunks (index_doc batches the embedding)."""
+        success = self.vector_store.index_doc(file_path, collection, formatted_chunks)
+
+        if success:
+            logger.info(f"✅ Indexed {len(formatted_chunks)} code chunks from {file_path}")
+        else:
+            logger.error(f"Failed to index {file_path}")
+
+        return success
+
+    def index_directory(self, directory: str, collection: str = "local", recursive: bool = True,
+                        max_workers: Optional[int] = None) -> Dict[str, int]:
         """
         Index all code files in a directory.
 
+        Parsing and chunking (tree-sitter, CPU-bound) run in a process pool;
+        the main process embeds and writes each file as its chunks arrive, so
+        the embedder is loaded once and Qdrant writes stay serialized.
+
         Args:
             directory: Path to directory
             collection: "cloud" or "local"
             recursive: Whether to search recursively
+            max_workers: Parser processes (default: CPU count - 1; 1 = no pool)
 
         Returns:
             Dict with counts: {"indexed": N, "failed": N, "skipped": N}
@@ -135,28 +303,139 @@ class CodeIndexer:
 
         results = {"indexed": 0, "failed": 0, "skipped": 0}
 
-        # Supported extensions
-        supported = {".py", ".ts", ".tsx", ".js", ".jsx"}
-
         # Find all code files
-        pattern = "**/*" if recursive else "*"
-        for file_path in dir_path.glob(pattern):
-            if not file_path.is_file():
-                continue
+        files, results["skipped"] = _find_code_files(str(dir_path), recursive)
 
-            if file_path.suffix not in supported:
-                results["skipped"] += 1
-                continue
+        results.update(self.index_files(files, [collection], max_workers=max_workers))
 
+        logger.info(f"Directory indexing complete: {results['indexed']} indexed, {results['failed']} failed, {results['skipped']} skipped")
+        return results
+
+    def index_files(self, file_paths: List[str], collections: List[str],
+                    max_workers: Optional[int] = None,
+                    on_indexed: Optional[Callable[[str], None]] = None,
+                    file_sizes: Optional[Dict[str, int]] = None) -> Dict[str, int]:
+        """
+        Index many code files into one or more collections.
+
+        Phase 1 fans parsing + chunking out to a process pool (largest files
+        first, so the slowest parses start early); phase 2 runs in this process
+        as results arrive, embedding each group of files in one batch and
+        writing each file to every collection.
+
+        Args:
+            file_paths: Code files to index
+            collections: Target collections ("cloud" and/or "local")
+            max_workers: Parser processes (default: CPU count - 1; 1 = no pool)
+            on_indexed: Called with each file stored in every collection
+            file_sizes: Known file sizes (e.g. from the directory walk), so
+                        ordering the files needs no extra stat
+
+        Returns:
+            Dict with counts: {"indexed": N, "failed": N}
+        """
+        results = {"indexed": 0, "failed": 0}
+
+        def record(file_path: str, formatted_chunks: List[Dict]):
             try:
-                if self.index_file(str(file_path), collection):
-                    results["indexed"] += 1
-                else:
-                    results["failed"] += 1
+                stored = bool(formatted_chunks)
+                for collection in collections:
+                    if stored:
+                        stored = self._store_chunks(file_path, collection, formatted_chunks)
+                results["indexed" if stored else "failed"] += 1
+                if stored and on_indexed is not None:
+                    on_indexed(file_path)
             except Exception as e:
                 logger.warning(f"Failed to index {file_path}: {e}")
                 results["failed"] += 1
 
-        logger.info(f"Directory indexing complete: {results['indexed']} indexed, {results['failed']} failed, {results['skipped']} skipped")
+        # Files are written in groups: their new chunks are embedded together
+        # (one model call for ~EMBED_BATCH_CHUNKS chunks), then each file's
+        # index_doc finds its vectors in the embedding cache
+        pending: List[Tuple[str, List[Dict]]] = []
+        pending_chunks = 0
+
+        def flush():
+            nonlocal pending_chunks
+            if len(pending) > 1:
+                self.vector_store.prefetch_embeddings(pending, collections)
+            for file_path, formatted_chunks in pending:
+                record(file_path, formatted_chunks)
+            pending.clear()
+            pending_chunks = 0
+
+        for file_path, formatted_chunks in self._prepare_files(file_paths, max_workers, file_sizes):
+            if formatted_chunks is None:
+                results["failed"] += 1
+                continue
+            pending.append((file_path, formatted_chunks))
+            pending_chunks += len(formatted_chunks)
+            if pending_chunks >= EMBED_BATCH_CHUNKS:
+                flush()
+        flush()
+
         return results
 
+    def _prepare_files(self, file_paths: List[str], max_workers: Optional[int] = None,
+                       file_sizes: Optional[Dict[str, int]] = None):
+        """
+        Yield (file_path, formatted chunks) as files finish parsing and chunking.
+
+        Chunks are None for files that failed (already logged).
+        """
+        def file_size(file_path: str) -> int:
+            if file_sizes is not None and file_path in file_sizes:
+                return file_sizes[file_path]
+            try:
+                return os.path.getsize(file_path)
+            except OSError:
+                return 0
+
+        files = sorted(file_paths, key=file_size, reverse=True)
+        if max_workers is None:
+            max_workers = max(1, (os.cpu_count() or 2) - 1)
+        max_workers = min(max_workers, len(files))
+
+        if max_workers <= 1:
+            # Reads overlap with parsing via the I/O read-ahead threads
+            for file_path, source, read_error in _read_ahead(files):
+                try:
+                    if read_error is not None:
+                        raise read_error
+                    yield file_path, _prepare_chunks(self.parser, self.chunker, file_path, source)
+                except Exception as e:
+                    logger.warning(f"Failed to index {file_path}: {e}")
+                    yield file_path, None
+            return
+
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                 initargs=(self.parser_cache_path,)) as pool:
+            # Largest files first, one per task, so the slowest parses start on
+            # the first free workers; the small tail is grouped so task/result
+            # pickling and queue round trips happen once per group. Groups stay
+            # under a quarter of each worker's share of the bytes, so the last
+            # task to finish can't hold up the run for long.
+            fair_share = sum(file_size(file_path) for file_path in files) // (4 * max_workers)
+            futures = {
+                pool.submit(_parse_and_chunk, batch): batch
+                for batch in _batch_by_size(files, file_size, max(1, min(TASK_BATCH_BYTES, fair_share)))
+            }
+            # Workers read the files themselves: keep a page-cache hint rolling
+            # PREFETCH_FILES ahead of the parse front so cold reads overlap parsing
+            advised = min(PREFETCH_FILES, len(files))
+            _advise_willneed(files[:advised])
+            for future in as_completed(futures):
+                batch_size = len(futures[future])
+                _advise_willneed(files[advised:advised + batch_size])
+                advised += batch_size
+                try:
+                    batch_results = future.result()
+                except Exception as e:
+                    for file_path in futures[future]:
+                        logger.warning(f"Failed to index {file_path}: {e}")
+                        yield file_path, None
+                    continue
+                for file_path, formatted_chunks, error in batch_results:
+                    if error is not None:
+                        logger.warning(f"Failed to index {file_path}: {error}")
+                    yield file_path, formatted_chunks
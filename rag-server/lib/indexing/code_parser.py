@@ -9,26 +9,148 @@ Extracts:
 """
 
 import logging
-from typing import List, Dict, Optional
+import mmap
+import os
+import re
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import List, Dict, Optional, Tuple, Iterator, Union
 from pathlib import Path
 
+from lib.indexing.parser_cache import ParserCache
+
 try:
     from tree_sitter import Language, Parser
 except ImportError:
     Language = None
     Parser = None
 
+try:
+    from tree_sitter import QueryCursor  # py-tree-sitter >= 0.25
+except ImportError:
+    QueryCursor = None
+
 logger = logging.getLogger(__name__)
 
+# Parser language by file extension
+SUFFIX_TO_LANG = {
+    ".py": "python",
+    ".ts": "typescript",
+    ".tsx": "typescript",
+    ".js": "typescript",
+    ".jsx": "typescript",
+}
+
+# AST node types extracted as code elements, and the element type each becomes
+ELEMENT_TYPES = {
+    "function_definition": "function",
+    "class_definition": "class",
+    "method_definition": "method",
+}
+ELEMENT_NODE_TYPES = tuple(ELEMENT_TYPES)
+
+# Regex fallback (no tree-sitter), scanned over the whole file with MULTILINE:
+# anchored at line starts, and "[^\S\n]" (whitespace except newline) keeps every
+# match on one line. Function alternative first, then class.
+# Python: def name(args): | class Name(bases):
+PY_FALLBACK_RE = re.compile(
+    r'^(?:def[^\S\n]+(?P<func>\w+)[^\S\n]*\((?P<args>.*?)\):'
+    r'|class[^\S\n]+(?P<cls>\w+)[^\S\n]*(?:\((?P<bases>.*?)\))?:)',
+    re.MULTILINE
+)
+# TypeScript/JavaScript: [async] [function] name(args) {|:|=> | class Name [extends Base] {
+TS_FALLBACK_RE = re.compile(
+    r'^(?:(?:async[^\S\n]+)?(?:function[^\S\n]+)?(?P<func>\w+)[^\S\n]*\((?P<args>.*?)\)[^\S\n]*(?::|=>|{)'
+    r'|class[^\S\n]+(?P<cls>\w+)[^\S\n]*(?:extends[^\S\n]+\w+)?[^\S\n]*{)',
+    re.MULTILINE
+)
+
+# Previous syntax trees kept for incremental re-parsing (most recent files)
+TREE_CACHE_SIZE = 128
+
+# Files at least this large are memory-mapped instead of read onto the heap
+MMAP_THRESHOLD = 256 * 1024
+# Bytes handed to tree-sitter per read callback for mapped files
+MMAP_READ_CHUNK = 64 * 1024
+
+# File content: bytes, or a read-only mmap for large files
+Source = Union[bytes, mmap.mmap]
+
+
+@contextmanager
+def open_source(file_path: str) -> Iterator[Source]:
+    """
+    Yield a file's content: bytes, or a read-only mmap for files >= MMAP_THRESHOLD.
+
+    A mapped file is paged in by the kernel on demand instead of being copied
+    onto the heap (with aggressive read-ahead, since it is parsed front to
+    back); the mapping is closed on exit.
+    """
+    if os.path.getsize(file_path) < MMAP_THRESHOLD:
+        yield Path(file_path).read_bytes()
+        return
+    with open(file_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        if hasattr(mmap, "MADV_SEQUENTIAL"):
+            mapped.madvise(mmap.MADV_SEQUENTIAL)
+        yield mapped
+
+
+def _common_prefix_len(a: bytes, b: bytes, limit: int) -> int:
+    """Length of the common prefix of a and b (at most limit), by bisection on slices."""
+    lo, hi = 0, limit
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[:mid] == b[:mid]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def _common_suffix_len(a: bytes, b: bytes, limit: int) -> int:
+    """Length of the common suffix of a and b (at most limit), by bisection on slices."""
+    lo, hi = 0, limit
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[len(a) - mid:] == b[len(b) - mid:]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def _node_text(node, source: Source) -> str:
+    """Text of a node, decoded from its byte range of the file source."""
+    return source[node.start_byte:node.end_byte].decode("utf-8", errors="replace")
+
+
+def _byte_point(data: bytes, offset: int) -> Tuple[int, int]:
+    """Tree-sitter (row, byte column) of a byte offset."""
+    row = data.count(b"\n", 0, offset)
+    return row, offset - (data.rfind(b"\n", 0, offset) + 1)
+
 
 class CodeParser:
     """Parse source code to extract functions, classes, methods."""
 
-    def __init__(self):
-        """Initialize code parser with tree-sitter languages."""
-        self.parser = None
+    def __init__(self, cache_path: Optional[Path] = None):
+        """
+        Initialize code parser with tree-sitter languages.
+
+        Args:
+            cache_path: Optional SQLite file caching parse results by content hash
+        """
         self.ts_python = None
         self.ts_typescript = None
+        self._queries: Dict[str, object] = {}  # language -> compiled element query
+        self._element_kinds: Dict[str, frozenset] = {}  # language -> ELEMENT_NODE_TYPES as grammar kind ids
+        self.cache = ParserCache(cache_path) if cache_path else None
+        # file_path -> (language, source bytes, tree) of the last parse
+        self._tree_cache: OrderedDict = OrderedDict()
+        self._tree_cache_lock = threading.Lock()
+        # Per-thread {language: Parser}, each parser bound to its language once
+        self._local = threading.local()
         
         if Language is not None and Parser is not None:
             self._init_parsers()
@@ -36,8 +158,6 @@ class CodeParser:
     def _init_parsers(self):
         """Initialize tree-sitter parsers for Python and TypeScript."""
         try:
-            self.parser = Parser()
-            
             # Load Python language
             try:
                 PYTHON_LANGUAGE = Language("tree_sitter_python", "python")
@@ -53,10 +173,50 @@ class CodeParser:
                 logger.debug("TypeScript parser initialized")
             except Exception as e:
                 logger.warning(f"Failed to load TypeScript parser: {e}")
+
+            # Compile the element queries once per language (and resolve the
+            # element node types to kind ids for the cursor-walk fallback)
+            for language, ts_language in (("python", self.ts_python), ("typescript", self.ts_typescript)):
+                if ts_language is not None:
+                    query = self._compile_element_query(ts_language)
+                    if query is not None:
+                        self._queries[language] = query
+                    kind_ids = self._element_kind_ids(ts_language)
+                    if kind_ids:
+                        self._element_kinds[language] = kind_ids
                 
         except Exception as e:
             logger.warning(f"Tree-sitter parser initialization failed: {e}")
 
+    def _element_kind_ids(self, ts_language) -> frozenset:
+        """Integer kind ids of the ELEMENT_NODE_TYPES the grammar defines (empty if unavailable)."""
+        try:
+            kind_ids = (ts_language.id_for_node_kind(node_type, True) for node_type in ELEMENT_NODE_TYPES)
+            # Unknown node types resolve to None (or 0 in older bindings)
+            return frozenset(kind_id for kind_id in kind_ids if kind_id)
+        except Exception as e:
+            logger.debug(f"Node kind ids unavailable: {e}")
+            return frozenset()
+
+    def _compile_element_query(self, ts_language):
+        """Compile one query capturing every ELEMENT_NODE_TYPES node the grammar has (None if unavailable)."""
+        patterns = []
+        for node_type in ELEMENT_NODE_TYPES:
+            pattern = f"({node_type}) @element"
+            try:
+                # A node type the grammar doesn't define fails to compile
+                ts_language.query(pattern)
+                patterns.append(pattern)
+            except Exception:
+                continue
+        if not patterns:
+            return None
+        try:
+            return ts_language.query(" ".join(patterns))
+        except Exception as e:
+            logger.debug(f"Element query compilation failed: {e}")
+            return None
+
     def parse_file(self, file_path: str) -> List[Dict]:
         """
         Parse a source file and extract code elements.
@@ -89,40 +249,76 @@ class CodeParser:
 
             # Determine language
             suffix = file_path_obj.suffix.lower()
-            if suffix == ".py":
-                language = "python"
-            elif suffix in [".ts", ".tsx", ".js", ".jsx"]:
-                language = "typescript"
-            else:
+            language = SUFFIX_TO_LANG.get(suffix)
+            if language is None:
                 raise ValueError(f"Unsupported file type: {suffix}")
 
-            # Read file content
-            with open(file_path, "r", encoding="utf-8") as f:
-                content = f.read()
-
-            # Parse based on language
-            if language == "python" and self.ts_python:
-                return self._parse_python(content, file_path)
-            elif language == "typescript" and self.ts_typescript:
-                return self._parse_typescript(content, file_path)
-            else:
-                logger.warning(f"Parser not available for {language}, using fallback")
-                return self._parse_fallback(content, file_path, language)
+            # Read file bytes once (mapped if large): tree-sitter parses bytes and
+            # element text is decoded per node, so the file is never decoded whole
+            with open_source(file_path) as source:
+                return self.parse_source(source, file_path, language)
 
         except Exception as e:
             logger.error(f"Failed to parse {file_path}: {str(e)}")
             raise RuntimeError(f"Code parsing failed: {str(e)}") from e
 
-    def _parse_python(self, content: str, file_path: str) -> List[Dict]:
+    def parse_source(self, source: Source, file_path: str, language: Optional[str] = None) -> List[Dict]:
+        """
+        Extract code elements from already-read file bytes (no file I/O).
+
+        Args:
+            source: UTF-8 file content (bytes, or an mmap from open_source)
+            file_path: Path the content came from (element metadata, caches)
+            language: "python" or "typescript" (default: from the file suffix)
+
+        Returns:
+            Same element list as parse_file()
+
+        Raises:
+            ValueError: If the file type is not supported
+        """
+        if language is None:
+            suffix = Path(file_path).suffix.lower()
+            language = SUFFIX_TO_LANG.get(suffix)
+            if language is None:
+                raise ValueError(f"Unsupported file type: {suffix}")
+
+        # Parse based on language
+        if language == "python" and self.ts_python:
+            parse, mode = self._parse_python, "tree-sitter"
+        elif language == "typescript" and self.ts_typescript:
+            parse, mode = self._parse_typescript, "tree-sitter"
+        else:
+            logger.warning(f"Parser not available for {language}, using fallback")
+            parse, mode = None, "fallback"
+
+        # Unchanged file (same content, same parse mode): reuse the cached elements
+        digest = None
+        if self.cache is not None:
+            digest = ParserCache.digest(source, mode)
+            cached = self.cache.get(file_path, digest)
+            if cached is not None:
+                return cached
+
+        if parse is not None:
+            elements = parse(source, file_path)
+        else:
+            elements = self._parse_fallback(str(source, "utf-8"), file_path, language)
+
+        # Empty results aren't cached: a parser failure also returns []
+        if digest is not None and elements:
+            self.cache.put(file_path, digest, elements)
+        return elements
+
+    def _parse_python(self, source: Source, file_path: str) -> List[Dict]:
         """Parse Python code and extract functions/classes."""
         elements = []
 
         try:
-            self.parser.set_language(self.ts_python)
-            tree = self.parser.parse(content.encode())
+            tree = self._parse_tree(source, file_path, "python", self.ts_python)
             
             # Extract elements from tree
-            self._extract_elements(tree.root_node, content, file_path, elements, "python")
+            self._collect_elements(tree.root_node, source, file_path, elements, "python")
             
             logger.debug(f"Parsed {len(elements)} elements from {file_path}")
         except Exception as e:
@@ -130,16 +326,15 @@ class CodeParser:
 
         return elements
 
-    def _parse_typescript(self, content: str, file_path: str) -> List[Dict]:
+    def _parse_typescript(self, source: Source, file_path: str) -> List[Dict]:
         """Parse TypeScript/JavaScript code and extract functions/classes."""
         elements = []
 
         try:
-            self.parser.set_language(self.ts_typescript)
-            tree = self.parser.parse(content.encode())
+            tree = self._parse_tree(source, file_path, "typescript", self.ts_typescript)
             
             # Extract elements from tree
-            self._extract_elements(tree.root_node, content, file_path, elements, "typescript")
+            self._collect_elements(tree.root_node, source, file_path, elements, "typescript")
             
             logger.debug(f"Parsed {len(elements)} elements from {file_path}")
         except Exception as e:
@@ -147,139 +342,212 @@ class CodeParser:
 
         return elements
 
-    def _extract_elements(self, node, content: str, file_path: str, elements: List[Dict], language: str):
-        """Recursively extract functions and classes from AST."""
-        try:
-            if node.type in ["function_definition", "class_definition", "method_definition"]:
-                element = self._create_element(node, content, file_path, language)
-                if element:
-                    elements.append(element)
-            
-            # Recurse into children
-            for child in node.children:
-                self._extract_elements(child, content, file_path, elements, language)
-        except Exception as e:
-            logger.debug(f"Error extracting element: {e}")
+    def _get_parser(self, language: str, ts_language):
+        """This thread's parser for the language, created and bound on first use."""
+        parsers = getattr(self._local, "parsers", None)
+        if parsers is None:
+            parsers = self._local.parsers = {}
+        parser = parsers.get(language)
+        if parser is None:
+            parser = Parser()
+            parser.set_language(ts_language)
+            parsers[language] = parser
+        return parser
 
-    def _create_element(self, node, content: str, file_path: str, language: str) -> Optional[Dict]:
-        """Create element dictionary from AST node."""
-        try:
-            start_line = node.start_point[0] + 1
-            end_line = node.end_point[0] + 1
-            
-            # Extract content
-            element_content = content[node.start_byte:node.end_byte].decode() if isinstance(content, bytes) else content[node.start_byte:node.end_byte]
-            
-            # Extract name and signature
-            name = self._extract_name(node)
-            signature = self._extract_signature(node)
-            docstring = self._extract_docstring(node, content)
-            
-            element_type = "function"
-            if node.type == "class_definition":
-                element_type = "class"
-            elif node.type == "method_definition":
-                element_type = "method"
-            
-            return {
-                "type": element_type,
-                "name": name,
-                "signature": signature,
-                "content": element_content,
-                "start_line": start_line,
-                "end_line": end_line,
-                "docstring": docstring,
-                "imports": [],  # Would need separate extraction
-                "file_path": file_path,
-                "language": language
-            }
-        except Exception as e:
-            logger.debug(f"Failed to create element: {e}")
-            return None
+    def _parse_tree(self, source: Source, file_path: str, language: str, ts_language):
+        """
+        Parse source into a tree-sitter Tree, incrementally when possible.
 
-    def _extract_name(self, node) -> str:
-        """Extract name from node."""
-        try:
-            for child in node.children:
-                if child.type == "identifier":
-                    return child.text.decode() if isinstance(child.text, bytes) else child.text
-        except Exception:
-            pass
-        return "unknown"
-
-    def _extract_signature(self, node) -> str:
+        If this file was parsed before (same language), the changed byte range is
+        found by common prefix/suffix, applied to the old tree with tree.edit(),
+        and the old tree is passed to the parser so only changed subtrees are
+        re-parsed.
+
+        Mapped (large) files are fed to tree-sitter in chunks through a read
+        callback and are not kept for incremental parsing.
+
+        Each thread parses with its own per-language parsers, so files of mixed
+        languages need no set_language per file and threads can parse at once.
+        """
+        parser = self._get_parser(language, ts_language)
+
+        if isinstance(source, mmap.mmap):
+            with self._tree_cache_lock:
+                self._tree_cache.pop(file_path, None)
+            try:
+                return parser.parse(lambda byte, point: source[byte:byte + MMAP_READ_CHUNK])
+            except TypeError:
+                # py-tree-sitter < 0.22 only parses bytes
+                return parser.parse(source[:])
+
+        old_tree = None
+        with self._tree_cache_lock:
+            cached = self._tree_cache.pop(file_path, None)
+        if cached is not None and cached[0] == language:
+            _, old_source, old_tree = cached
+            if old_source == source:
+                self._remember_tree(file_path, language, source, old_tree)
+                return old_tree
+            start = _common_prefix_len(old_source, source, min(len(old_source), len(source)))
+            suffix = _common_suffix_len(old_source, source, min(len(old_source), len(source)) - start)
+            old_end = len(old_source) - suffix
+            new_end = len(source) - suffix
+            try:
+                old_tree.edit(
+                    start_byte=start,
+                    old_end_byte=old_end,
+                    new_end_byte=new_end,
+                    start_point=_byte_point(source, start),
+                    old_end_point=_byte_point(old_source, old_end),
+                    new_end_point=_byte_point(source, new_end),
+                )
+            except Exception as e:
+                logger.debug(f"Incremental edit failed for {file_path}, full parse: {e}")
+                old_tree = None
+
+        tree = parser.parse(source, old_tree) if old_tree is not None else parser.parse(source)
+        self._remember_tree(file_path, language, source, tree)
+        return tree
+
+    def _remember_tree(self, file_path: str, language: str, source: bytes, tree):
+        """Insert into the per-file tree LRU."""
+        with self._tree_cache_lock:
+            self._tree_cache[file_path] = (language, source, tree)
+            while len(self._tree_cache) > TREE_CACHE_SIZE:
+                self._tree_cache.popitem(last=False)
+
+    def _collect_elements(self, root_node, source: Source, file_path: str, elements: List[Dict], language: str):
+        """
+        Extract functions and classes from AST with the language's compiled query.
+
+        The node walk happens in tree-sitter (C); elements come out in document
+        order (outer before nested), as the recursive walk produced them.
+        Falls back to _extract_elements if no query is available.
+        """
+        query = self._queries.get(language)
+        if query is None:
+            self._extract_elements(root_node, source, file_path, elements, language)
+            return
+
+        captures = QueryCursor(query).captures(root_node) if QueryCursor is not None else query.captures(root_node)
+        if isinstance(captures, dict):
+            # py-tree-sitter >= 0.23: {capture_name: [nodes]}
+            nodes = [node for capture_nodes in captures.values() for node in capture_nodes]
+        else:
+            nodes = [node for node, _ in captures]
+        nodes.sort(key=lambda node: (node.start_byte, -node.end_byte))
+
+        elements.extend(self._create_element(node, source, file_path, language) for node in nodes)
+
+    def _extract_elements(self, root_node, source: Source, file_path: str, elements: List[Dict], language: str):
+        """
+        Extract functions and classes by walking the AST (fallback without a query).
+
+        Iterative pre-order TreeCursor walk: no Python recursion and no child
+        lists per node, and elements keep document order. Node kinds are
+        compared as the grammar's integer ids (resolved once in _init_parsers),
+        or as type strings if the binding couldn't resolve them.
+        """
+        kind_ids = self._element_kinds.get(language)
+        cursor = root_node.walk()
+        while True:
+            node = cursor.node
+            if (node.kind_id in kind_ids) if kind_ids else (node.type in ELEMENT_NODE_TYPES):
+                elements.append(self._create_element(node, source, file_path, language))
+
+            # Next node in pre-order: first child, else next sibling of the
+            # nearest ancestor that has one; the walk ends back at the root
+            if cursor.goto_first_child():
+                continue
+            while not cursor.goto_next_sibling():
+                if not cursor.goto_parent():
+                    return
+
+    def _create_element(self, node, source: Source, file_path: str, language: str) -> Dict:
+        """
+        Create element dictionary from AST node.
+
+        No per-element error handling: node fields are always present and text
+        is decoded with errors="replace"; anything unexpected fails the file
+        once, in _parse_python/_parse_typescript.
+        """
+        start_line = node.start_point[0] + 1
+        end_line = node.end_point[0] + 1
+        
+        # Extract content (decode only this node's byte range)
+        element_content = _node_text(node, source)
+        
+        # Extract name and docstring (one pass over the children) and signature
+        name, docstring = self._extract_name_and_docstring(node, source)
+        signature = self._extract_signature(node, source)
+        
+        return {
+            "type": ELEMENT_TYPES.get(node.type, "function"),
+            "name": name,
+            "signature": signature,
+            "content": element_content,
+            "start_line": start_line,
+            "end_line": end_line,
+            "docstring": docstring,
+            "imports": [],  # Would need separate extraction
+            "file_path": file_path,
+            "language": language
+        }
+
+    def _extract_name_and_docstring(self, node, source: Source) -> Tuple[str, Optional[str]]:
+        """
+        Name (first identifier child) and docstring (first string literal child)
+        of a node, found in a single pass over its children.
+        """
+        name = None
+        docstring = None
+        for child in node.children:
+            child_type = child.type
+            if name is None and child_type == "identifier":
+                name = _node_text(child, source)
+            elif docstring is None and child_type == "string":
+                docstring = _node_text(child, source)
+            if name is not None and docstring is not None:
+                break
+        return name if name is not None else "unknown", docstring
+
+    def _extract_signature(self, node, source: Source) -> str:
         """Extract function/method signature from node."""
-        try:
-            # Get first line (contains signature)
-            start_line = node.start_point[0]
-            end_point = node.child_by_field_name("parameters").end_point[0] if node.child_by_field_name("parameters") else node.start_point[0]
-            
-            # Return first line as signature
-            return node.text.decode().split('\n')[0] if isinstance(node.text, bytes) else node.text.split('\n')[0]
-        except Exception:
-            pass
-        return ""
-
-    def _extract_docstring(self, node, content: str) -> Optional[str]:
-        """Extract docstring/documentation from node."""
-        try:
-            # Look for first string literal child (docstring)
-            for child in node.children:
-                if child.type == "string":
-                    return child.text.decode() if isinstance(child.text, bytes) else child.text
-        except Exception:
-            pass
-        return None
+        # First line of the node (contains signature): find its end in the
+        # file bytes, so only that line is sliced and decoded
+        end = source.find(b"\n", node.start_byte, node.end_byte)
+        if end == -1:
+            end = node.end_byte
+        return source[node.start_byte:end].decode("utf-8", errors="replace")
 
     def _parse_fallback(self, content: str, file_path: str, language: str) -> List[Dict]:
         """Fallback parsing using regex for unsupported languages."""
-        import re
-        
         elements = []
         
-        if language == "python":
-            # Regex for Python functions and classes
-            func_pattern = r'^def\s+(\w+)\s*\((.*?)\):'
-            class_pattern = r'^class\s+(\w+)\s*(?:\((.*?)\))?:'
-        else:
-            # Regex for TypeScript/JavaScript functions and classes
-            func_pattern = r'(?:async\s+)?(?:function\s+)?(\w+)\s*\((.*?)\)\s*(?::|=>|{)'
-            class_pattern = r'class\s+(\w+)\s*(?:extends\s+\w+)?\s*{'
+        # One scan of the whole file; the "func" group is set for functions, else a class matched
+        pattern = PY_FALLBACK_RE if language == "python" else TS_FALLBACK_RE
         
-        lines = content.split('\n')
-        current_line = 0
-        
-        for line_num, line in enumerate(lines, 1):
-            if re.match(func_pattern, line):
-                match = re.match(func_pattern, line)
-                if match:
-                    elements.append({
-                        "type": "function",
-                        "name": match.group(1),
-                        "signature": line.strip(),
-                        "content": line,
-                        "start_line": line_num,
-                        "end_line": line_num,
-                        "docstring": None,
-                        "imports": [],
-                        "file_path": file_path,
-                        "language": language
-                    })
-            elif re.match(class_pattern, line):
-                match = re.match(class_pattern, line)
-                if match:
-                    elements.append({
-                        "type": "class",
-                        "name": match.group(1),
-                        "signature": line.strip(),
-                        "content": line,
-                        "start_line": line_num,
-                        "end_line": line_num,
-                        "docstring": None,
-                        "imports": [],
-                        "file_path": file_path,
-                        "language": language
-                    })
+        line_num = 1
+        counted_to = 0
+        for match in pattern.finditer(content):
+            start = match.start()
+            line_num += content.count('\n', counted_to, start)
+            counted_to = start
+            line_end = content.find('\n', start)
+            line = content[start:line_end if line_end != -1 else len(content)]
+            is_function = match.group("func") is not None
+            elements.append({
+                "type": "function" if is_function else "class",
+                "name": match.group("func") if is_function else match.group("cls"),
+                "signature": line.strip(),
+                "content": line,
+                "start_line": line_num,
+                "end_line": line_num,
+                "docstring": None,
+                "imports": [],
+                "file_path": file_path,
+                "language": language
+            })
         
         return elements
 
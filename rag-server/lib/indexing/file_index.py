@@ -0,0 +1,90 @@
+"""
+File Index: Skip unchanged files by (mtime_ns, size) before reading them.
+
+This module handles:
+- SQLite table of the stat signature each file had when it was last indexed
+- Filtering candidates down to files that look changed (stats come from the walk)
+- Recording files after they were indexed successfully (batched commit)
+
+Entries are scoped by target collections, so indexing into "local" doesn't
+mark files as up to date for "cloud".
+"""
+
+import logging
+import sqlite3
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class FileIndex:
+    """(scope, path) -> (mtime_ns, size) of the last successful index."""
+
+    def __init__(self, db_path: Path):
+        """
+        Open (or create) the index database.
+
+        Args:
+            db_path: SQLite file; parent directories are created as needed
+        """
+        self.db_path = Path(db_path)
+        self._db: Optional[sqlite3.Connection] = None
+        self._pending: List[Tuple[str, str, int, int]] = []
+        try:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(self.db_path))
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS files "
+                "(scope TEXT, path TEXT, mtime_ns INTEGER, size INTEGER, PRIMARY KEY (scope, path))"
+            )
+            self._db.commit()
+        except Exception as e:
+            logger.warning(f"File index unavailable ({self.db_path}): {e}")
+            self._db = None
+
+    def changed(self, signatures: Dict[str, Tuple[int, int]], scope: str) -> List[str]:
+        """
+        Candidates that need indexing.
+
+        Args:
+            signatures: Candidate path -> (mtime_ns, size), from the directory walk
+            scope: Target collections key (e.g. "cloud")
+
+        Returns:
+            Paths that are new or whose signature differs from the index
+        """
+        if self._db is None:
+            return list(signatures)
+        try:
+            known = {
+                path: (mtime_ns, size)
+                for path, mtime_ns, size in self._db.execute(
+                    "SELECT path, mtime_ns, size FROM files WHERE scope = ?", (scope,)
+                )
+            }
+        except Exception as e:
+            logger.warning(f"File index read failed, indexing all files: {e}")
+            return list(signatures)
+        return [path for path, signature in signatures.items() if known.get(path) != signature]
+
+    def record(self, scope: str, file_path: str, signature: Tuple[int, int]):
+        """Mark a file as indexed with the given (mtime_ns, size) (written on commit)."""
+        self._pending.append((scope, file_path, signature[0], signature[1]))
+
+    def commit(self):
+        """Write recorded entries in one transaction."""
+        if self._db is None or not self._pending:
+            self._pending.clear()
+            return
+        try:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO files (scope, path, mtime_ns, size) VALUES (?, ?, ?, ?)",
+                self._pending
+            )
+            self._db.commit()
+        except Exception as e:
+            logger.warning(f"File index write failed: {e}")
+        self._pending.clear()
@@ -0,0 +1,139 @@
+"""
+File Walker: Match many glob patterns in a single directory walk.
+
+This module handles:
+- Translating pathlib-style globs ("**/*.py", "src/*.ts") into anchored regexes
+- One os.scandir walk per distinct literal root, testing every pattern per file
+- Pruning directories matched by exclude patterns (e.g. "**/node_modules/**")
+- One stat per matched file, carried along as a Candidate (path, size, mtime)
+
+Replaces one Path.glob() call per pattern, each of which walks (and stats)
+the tree again, plus the is_file/exists/relative_to re-checks done afterwards.
+"""
+
+import logging
+import os
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Pattern, Tuple
+
+logger = logging.getLogger(__name__)
+
+_GLOB_CHARS = frozenset("*?[")
+
+
+@dataclass(frozen=True)
+class Candidate:
+    """A file found by the walk, with the stat taken when it was found."""
+    path: str  # Absolute path
+    rel_path: str  # Relative to the walk's base path, forward slashes
+    size: int
+    mtime_ns: int
+
+
+def glob_to_regex(pattern: str) -> Pattern:
+    """
+    Compile a relative glob (forward slashes) into a regex over relative paths.
+
+    "*" and "?" never cross "/"; a "**" segment matches zero or more directories
+    (and, as the last segment, everything below).
+
+    Matches the files Path.glob() returns for the same pattern, except for a
+    trailing "**": before Python 3.13 Path.glob("docs/**") yields only
+    directories, while here it matches every file under docs/ (the 3.13+
+    behaviour, and what the exclude patterns need).
+    """
+    parts = [part for part in pattern.replace("\\", "/").split("/") if part not in ("", ".")]
+    regex = []
+    for i, part in enumerate(parts):
+        last = i == len(parts) - 1
+        if part == "**":
+            regex.append(".*" if last else "(?:[^/]+/)*")
+            continue
+        segment = []
+        j = 0
+        while j < len(part):
+            c = part[j]
+            if c == "*":
+                segment.append("[^/]*")
+            elif c == "?":
+                segment.append("[^/]")
+            elif c == "[" and "]" in part[j + 1:]:
+                end = part.index("]", j + 1)
+                body = part[j + 1:end]
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                segment.append(f"[{body}]")
+                j = end
+            else:
+                segment.append(re.escape(c))
+            j += 1
+        regex.append("".join(segment) + ("" if last else "/"))
+    return re.compile("".join(regex) + r"\Z")
+
+
+def _literal_root(pattern: str) -> str:
+    """Directory prefix of a glob before its first wildcard segment ("" = walk root)."""
+    literal = []
+    for part in pattern.replace("\\", "/").split("/")[:-1]:
+        if not part or part == "." or _GLOB_CHARS.intersection(part):
+            break
+        literal.append(part)
+    return "/".join(literal)
+
+
+def find_matching_files(base_path: Path, patterns: List[str],
+                        exclude_patterns: Tuple[str, ...] = (),
+                        suffixes: Tuple[str, ...] = ()) -> Dict[str, List[Candidate]]:
+    """
+    Find files under base_path matching any of the glob patterns, in one walk.
+
+    Args:
+        base_path: Directory the patterns are relative to
+        patterns: Relative glob patterns (pathlib syntax)
+        exclude_patterns: Globs for files/directories to skip (matched directories are pruned)
+        suffixes: Only consider files with one of these name endings (e.g. (".md",));
+                  others are dropped before any pattern test or stat
+
+    Returns:
+        Dict of pattern -> matching files (Candidates), in walk order
+    """
+    compiled = [(pattern, glob_to_regex(pattern)) for pattern in patterns]
+    excludes = [glob_to_regex(pattern) for pattern in exclude_patterns]
+    matches: Dict[str, List[Candidate]] = {pattern: [] for pattern in patterns}
+
+    # Walk each distinct literal root once (nested roots are covered by their parent)
+    roots = []
+    for root in sorted({_literal_root(pattern) for pattern in patterns}):
+        if not any(root == parent or root.startswith(parent + "/") or parent == "" for parent in roots):
+            roots.append(root)
+
+    base = str(base_path)
+    for root in roots:
+        stack = [(os.path.join(base, root) if root else base, root)]
+        while stack:
+            directory, rel_dir = stack.pop()
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+                        if entry.is_dir(follow_symlinks=False):
+                            if not any(exclude.match(rel_path + "/") for exclude in excludes):
+                                stack.append((entry.path, rel_path))
+                        elif entry.is_file():
+                            if suffixes and not entry.name.endswith(suffixes):
+                                continue
+                            if any(exclude.match(rel_path) for exclude in excludes):
+                                continue
+                            candidate = None
+                            for pattern, regex in compiled:
+                                if regex.match(rel_path):
+                                    if candidate is None:
+                                        # DirEntry.stat() caches: one stat per file
+                                        st = entry.stat()
+                                        candidate = Candidate(entry.path, rel_path, st.st_size, st.st_mtime_ns)
+                                    matches[pattern].append(candidate)
+            except OSError as e:
+                logger.warning(f"Cannot read directory: {e}")
+    return matches
@@ -10,18 +10,23 @@ Usage:
     python index_all.py --code-only        # Code only
     python index_all.py --cloud            # Cloud collection only
     python index_all.py --local            # Local collection only
+    python index_all.py --full             # Re-index code files even if unchanged
 """
 import argparse
+import stat
 import sys
 import logging
 from pathlib import Path
+from typing import Dict, List
 
 # Add parent to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from config import load_config
-from lib.indexing.indexer import index_all_documents
+from lib.indexing.indexer import collect_cloud_docs, index_all_documents
 from lib.indexing.code_indexer import CodeIndexer
+from lib.indexing.file_index import FileIndex
+from lib.indexing.file_walker import Candidate, find_matching_files
 from lib.core.embedding_manager import EmbeddingManager
 from lib.core.vector_store import HybridVectorStore
 
@@ -32,6 +37,60 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+def collect_code_files(config) -> List[Candidate]:
+    """
+    Resolve config.code_paths to existing code files.
+
+    All glob patterns are matched in one directory walk (skipping
+    config.exclude_patterns); direct paths are taken as-is if they are files.
+    Each file is stat'ed once; the Candidate carries that stat and its
+    project-relative path through indexing and cleanup.
+    """
+    base_path = config.project_root
+    logger.info(f"   Searching for code in: {base_path}")
+    logger.info(f"   Patterns: {config.code_paths}")
+    globs = [code_path for code_path in config.code_paths if code_path.startswith("**") or "*" in code_path]
+    matched = find_matching_files(base_path, globs, tuple(config.exclude_patterns)) if globs else {}
+
+    code_files: Dict[str, Candidate] = {}
+    for code_path in config.code_paths:
+        if code_path in matched:
+            # Glob pattern - expanded relative to project root
+            expanded = matched[code_path]
+            if expanded:
+                logger.info(f"   Found {len(expanded)} files matching '{code_path}'")
+                # Overlapping patterns: index each file once
+                for candidate in expanded:
+                    code_files.setdefault(candidate.path, candidate)
+            else:
+                logger.warning(f"   No files found matching pattern: '{code_path}'")
+        else:
+            # Direct path - can be absolute or relative to project root
+            code_path_obj = Path(code_path)
+            if not code_path_obj.is_absolute():
+                code_path_obj = base_path / code_path
+            
+            try:
+                st = code_path_obj.stat()
+            except OSError:
+                logger.warning(f"Code path not found: {code_path_obj}")
+                continue
+            if not stat.S_ISREG(st.st_mode):
+                logger.warning(f"Code path is not a file: {code_path_obj}")
+                continue
+            try:
+                rel_path = code_path_obj.relative_to(base_path).as_posix()
+            except ValueError:
+                logger.warning(f"Could not get relative path for {code_path_obj}")
+                rel_path = ""
+            code_files.setdefault(
+                str(code_path_obj),
+                Candidate(str(code_path_obj), rel_path, st.st_size, st.st_mtime_ns)
+            )
+
+    return list(code_files.values())
+
+
 def main():
     """Index all documents and code"""
     parser = argparse.ArgumentParser(description="Index project documentation and code")
@@ -39,6 +98,7 @@ def main():
     parser.add_argument("--code-only", action="store_true", help="Index code only")
     parser.add_argument("--cloud", action="store_true", help="Cloud collection only")
     parser.add_argument("--local", action="store_true", help="Local collection only")
+    parser.add_argument("--full", action="store_true", help="Re-index code files even if mtime/size are unchanged")
     parser.add_argument("--prune", action="store_true", help="Actually delete orphaned chunks (otherwise dry-run)")
     args = parser.parse_args()
 
@@ -77,10 +137,15 @@ def main():
         total_indexed = 0
         total_errors = 0
 
+        # One walk each (one stat per file) resolves the code and doc files for
+        # both indexing and cleanup
+        code_files = collect_code_files(config) if index_code else []
+        doc_files = collect_cloud_docs(config) if index_docs else []
+
         # Index documentation
         if index_docs:
             logger.info("📚 Indexing documentation...")
-            doc_results = index_all_documents(store, config)
+            doc_results = index_all_documents(store, config, doc_files)
             logger.info(f"   ✅ Docs indexed: {doc_results.get('cloud', 0) + doc_results.get('local', 0)}")
             logger.info(f"   ❌ Docs errors: {doc_results.get('errors', 0)}")
             total_indexed += doc_results.get('cloud', 0) + doc_results.get('local', 0)
@@ -94,55 +159,42 @@ def main():
                     doc_model=config.embedding_models.doc,
                     code_model=config.embedding_models.code
                 )
-                code_indexer = CodeIndexer(store, embedder_mgr)
+                code_indexer = CodeIndexer(store, embedder_mgr, parser_cache_path=config.parser_cache_file)
 
                 code_indexed = 0
                 code_errors = 0
 
-                # Index each code path
+                # Skip files whose (mtime, size) match the last successful index,
+                # using the stat taken by the walk: no extra stat, read or hash
+                signatures = {c.path: (c.mtime_ns, c.size) for c in code_files}
+                files_to_index = list(signatures)
+                file_index = None
+                scope = ",".join(sorted(collections))
+                if config.file_index_file and code_files:
+                    file_index = FileIndex(config.file_index_file)
+                    changed = file_index.changed(signatures, scope)
+                    if not args.full:
+                        files_to_index = changed
+                        logger.info(f"   Unchanged (skipped): {len(code_files) - len(changed)}")
+
+                def on_indexed(file_path: str):
+                    file_index.record(scope, file_path, signatures[file_path])
+
+                # Parse + chunk in parallel worker processes, then embed and write
+                # each file to every collection from this process
                 base_path = config.project_root
-                logger.info(f"   Searching for code in: {base_path}")
-                logger.info(f"   Patterns: {config.code_paths}")
-                code_files_found = []
-                for code_path in config.code_paths:
-                    if code_path.startswith("**") or "*" in code_path:
-                        # Glob pattern - expand it relative to project root
-                        try:
-                            expanded = list(base_path.glob(code_path))
-                            if expanded:
-                                logger.info(f"   Found {len(expanded)} files matching '{code_path}'")
-                                code_files_found.extend(expanded)
-                            else:
-                                logger.warning(f"   No files found matching pattern: '{code_path}'")
-                            for path in expanded:
-                                if path.is_file():
-                                    try:
-                                        for collection in collections:
-                                            code_indexer.index_file(str(path), collection)
-                                        code_indexed += 1
-                                    except Exception as e:
-                                        logger.warning(f"Failed to index {path}: {e}")
-                                        code_errors += 1
-                        except Exception as e:
-                            logger.warning(f"Failed to glob {code_path}: {e}")
-                    else:
-                        # Direct path - can be absolute or relative to project root
-                        try:
-                            code_path_obj = Path(code_path)
-                            if not code_path_obj.is_absolute():
-                                code_path_obj = base_path / code_path
-                            
-                            if code_path_obj.exists():
-                                for collection in collections:
-                                    code_indexer.index_file(str(code_path_obj), collection)
-                                code_indexed += 1
-                            else:
-                                logger.warning(f"Code path not found: {code_path_obj}")
-                        except Exception as e:
-                            logger.warning(f"Failed to index {code_path}: {e}")
-                            code_errors += 1
-
-                if not code_files_found and code_indexed == 0:
+                if files_to_index:
+                    results = code_indexer.index_files(
+                        files_to_index, collections,
+                        on_indexed=on_indexed if file_index is not None else None,
+                        file_sizes={c.path: c.size for c in code_files}
+                    )
+                    code_indexed += results["indexed"]
+                    code_errors += results["failed"]
+                if file_index is not None:
+                    file_index.commit()
+
+                if not code_files and code_indexed == 0:
                     logger.warning(f"   ⚠️  No code files found! Check your config.code_paths.")
                     logger.warning(f"   Project root: {base_path}")
                     logger.warning(f"   Patterns tried: {config.code_paths}")
@@ -163,43 +215,13 @@ def main():
         logger.info("\n🧹 Cleaning up deleted files...")
         existing_files = set()
         
-        # Collect all existing file paths (normalize to forward slashes)
-        base_path = config.project_root
+        # Existing file paths come from the walks above (already forward slashes)
         if index_docs:
-            for pattern in config.cloud_docs:
-                for file_path in base_path.glob(pattern):
-                    if file_path.is_file() and file_path.suffix == '.md':
-                        try:
-                            # Always compute relative to base_path for consistency
-                            rel_path = str(file_path.relative_to(base_path))
-                            existing_files.add(rel_path.replace('\\', '/'))
-                        except ValueError:
-                            logger.warning(f"Could not get relative path for {file_path}")
+            existing_files.update(c.rel_path for c in doc_files)
         
         if index_code:
-            for code_path in config.code_paths:
-                if "*" in code_path:
-                    for file_path in base_path.glob(code_path):
-                        if file_path.is_file():
-                            try:
-                                rel_path = str(file_path.relative_to(base_path))
-                                existing_files.add(rel_path.replace('\\', '/'))
-                            except ValueError:
-                                logger.warning(f"Could not get relative path for {file_path}")
-                else:
-                    # Direct path: resolve and compute relative
-                    code_path_obj = Path(code_path)
-                    if not code_path_obj.is_absolute():
-                        code_path_obj = base_path / code_path
-                    else:
-                        code_path_obj = code_path_obj.resolve()
-                    
-                    if code_path_obj.exists() and code_path_obj.is_file():
-                        try:
-                            rel_path = str(code_path_obj.relative_to(base_path))
-                            existing_files.add(rel_path.replace('\\', '/'))
-                        except ValueError:
-                            logger.warning(f"Could not get relative path for {code_path_obj}")
+            # Paths outside the project root have no relative path (already warned)
+            existing_files.update(c.rel_path for c in code_files if c.rel_path)
         
         # Cleanup orphaned files (soft-delete by default, requires --prune to mark as deleted)
         total_cleaned = 0
@@ -221,8 +243,8 @@ def main():
         # Get collection stats
         stats = store.get_collection_stats()
         logger.info(f"\n📊 Collection Stats:")
-        for collection, stat in stats.items():
-            logger.info(f"   {collection}: {stat['count']} points")
+        for collection, coll_stats in stats.items():
+            logger.info(f"   {collection}: {coll_stats['count']} points")
 
         return 0
 
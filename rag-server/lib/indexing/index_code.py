@@ -47,7 +47,7 @@ def main():
         )
         logger.info("✅ Embedding manager initialized")
         
-        code_indexer = CodeIndexer(store, embedder_mgr)
+        code_indexer = CodeIndexer(store, embedder_mgr, parser_cache_path=config.parser_cache_file)
 
         total_indexed = 0
         total_errors = 0
@@ -1,10 +1,16 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, Iterator, Optional, Tuple
 import logging
+import re
 import sys
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from lib.indexing.file_walker import Candidate, find_matching_files
+
 try:
     from lib.core.vector_store import HybridVectorStore
     from config import Config
@@ -14,44 +20,57 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# Doc files read concurrently ahead of chunking/indexing (bounded by count and
+# by total file size, so a few huge docs don't all sit in memory at once)
+DOC_READ_THREADS = 16
+DOC_READ_AHEAD = 64
+DOC_READ_AHEAD_BYTES = 32 * 1024 * 1024
+# Cloud index_doc calls (embedding + upsert) run concurrently with reading and
+# chunking the next docs; at most twice this many are in flight
+DOC_INDEX_THREADS = 4
+# Chunks gathered across docs before one batched embedding call
+DOC_EMBED_BATCH_CHUNKS = 256
+
+# Doc type by path fragment, first match wins
+DOC_TYPE_RULES = (
+    (re.compile(r'proposal-plan/(?:development|testing)'), 'policy'),
+    (re.compile(r'software-development-life-cycle'), 'sdlc'),
+    (re.compile(r'complete-flows'), 'flow'),
+    (re.compile(r'infrastructure'), 'infrastructure'),
+    (re.compile(r'Discussion'), 'decision'),
+)
+
+# Numbered list item: "1. text" (digit, dot, then something besides whitespace)
+NUMBERED_RE = re.compile(r'\s*\d\.\s*\S')
+# Run of consecutive numbered lines at the start of a chunk (one scan per chunk)
+NUMBERED_RUN_RE = re.compile(r'(?:[^\S\n]*\d\.[^\S\n]*\S[^\n]*(?:\n|\Z))+')
+# Code fence at the start of any line of a chunk
+CODE_FENCE_RE = re.compile(r'^[^\S\n]*```', re.MULTILINE)
+# Separator logged around each doc's progress lines
+_BANNER = '=' * 70
+
+@lru_cache(maxsize=4096)
 def _detect_doc_type(file_path: str) -> str:
-    """Detect doc type from path"""
-    if 'proposal-plan/development' in file_path or 'proposal-plan/testing' in file_path:
-        return 'policy'
-    elif 'software-development-life-cycle' in file_path:
-        return 'sdlc'
-    elif 'complete-flows' in file_path:
-        return 'flow'
-    elif 'infrastructure' in file_path:
-        return 'infrastructure'
-    elif 'Discussion' in file_path:
-        return 'decision'
+    """Detect doc type from path (cached: every chunk of a file asks again)"""
+    for pattern, doc_type in DOC_TYPE_RULES:
+        if pattern.search(file_path):
+            return doc_type
     return 'other'
 
+def _is_numbered_line(line: str) -> bool:
+    """Detect a numbered list item like "1. ", "2. ", etc."""
+    return NUMBERED_RE.match(line) is not None
+
 def _is_numbered_list(lines: List[str], start_idx: int) -> bool:
     """Detect if lines starting at start_idx form a numbered list."""
     if start_idx >= len(lines):
         return False
-    line = lines[start_idx].strip()
-    # Check for pattern like "1. ", "2. ", etc.
-    return len(line) > 2 and line[0].isdigit() and line[1] == '.'
+    return _is_numbered_line(lines[start_idx])
 
 def _is_table_line(line: str) -> bool:
     """Detect if line is part of a markdown table."""
     return '|' in line
 
-def _get_list_length(lines: List[str], start_idx: int) -> int:
-    """Get number of items in a numbered list starting at start_idx."""
-    count = 0
-    i = start_idx
-    while i < len(lines):
-        line = lines[i].strip()
-        if not line or not (line[0].isdigit() and len(line) > 2 and line[1] == '.'):
-            break
-        count += 1
-        i += 1
-    return count
-
 def chunk_markdown(content: str, file_path: str, chunk_size: int = 1000, overlap: int = 100) -> List[Dict]:
     """
     Enhanced chunking: preserve structure (lists, tables), chunk by sections.
@@ -80,6 +99,13 @@ def chunk_markdown(content: str, file_path: str, chunk_size: int = 1000, overlap
     current_chunk = []
     current_section = "Introduction"
     line_start = 1
+    # Kept in step with current_chunk instead of re-joining it on every line:
+    # len('\n'.join(current_chunk)) + 1, whether any line is a table line, and
+    # whether its first line starts a numbered list (None = not classified yet;
+    # the first line only changes when the chunk starts over)
+    chunk_len = 0
+    chunk_has_table = False
+    chunk_is_list = None
     
     for i, line in enumerate(lines, 1):
         # Detect section headers
@@ -89,25 +115,34 @@ def chunk_markdown(content: str, file_path: str, chunk_size: int = 1000, overlap
                 chunks.append(_create_chunk(current_chunk, line_start, i - 1, current_section, file_path))
             # Start new chunk
             current_chunk = [line]
+            chunk_len = len(line) + 1
+            chunk_has_table = _is_table_line(line)
+            chunk_is_list = None
             current_section = line[3:].strip()
             line_start = i
         else:
             current_chunk.append(line)
-            chunk_text = '\n'.join(current_chunk)
+            chunk_len += len(line) + 1
+            chunk_has_table = chunk_has_table or _is_table_line(line)
             
             # Check if this is a numbered list or table - keep it together
-            if _is_numbered_list(current_chunk, 0) or _is_table_line('\n'.join(current_chunk)):
+            if chunk_is_list is None:
+                chunk_is_list = _is_numbered_list(current_chunk, 0)
+            if chunk_is_list or chunk_has_table:
                 # For lists/tables, only split if MUCH larger than chunk_size
-                if len(chunk_text) > chunk_size * 2:
-                    chunks.append(_create_chunk(current_chunk[:-overlap], line_start, i, current_section, file_path))
-                    current_chunk = current_chunk[-overlap:]
-                    line_start = i - overlap
+                limit = chunk_size * 2
             else:
                 # For regular text, normal splitting
-                if len(chunk_text) > chunk_size:
-                    chunks.append(_create_chunk(current_chunk[:-overlap], line_start, i, current_section, file_path))
-                    current_chunk = current_chunk[-overlap:]
-                    line_start = i - overlap
+                limit = chunk_size
+            if chunk_len - 1 > limit:
+                chunks.append(_create_chunk(current_chunk[:-overlap], line_start, i, current_section, file_path))
+                kept = current_chunk[-overlap:]
+                if len(kept) != len(current_chunk):
+                    chunk_len = sum(len(kept_line) + 1 for kept_line in kept)
+                    chunk_has_table = any(_is_table_line(kept_line) for kept_line in kept)
+                    chunk_is_list = None
+                current_chunk = kept
+                line_start = i - overlap
     
     # Add final chunk
     if current_chunk:
@@ -120,15 +155,19 @@ def _create_chunk(lines: List[str], line_start: int, line_end: int, section: str
     content = '\n'.join(lines)
     
     # Detect content type
-    if lines and _is_numbered_list(lines, 0):
+    list_run = NUMBERED_RUN_RE.match(content)
+    if list_run:
         content_type = "list"
-        list_length = _get_list_length(lines, 0)
+        # Items = newlines in the run, plus the last line if it ends the content
+        run = list_run.group()
+        list_length = run.count('\n') + (not run.endswith('\n'))
         is_complete = True
-    elif any(_is_table_line(line) for line in lines):
+    elif _is_table_line(content):
+        # Any line with a pipe (the joined content has one iff some line does)
         content_type = "table"
         list_length = None
         is_complete = True
-    elif any(line.strip().startswith('```') for line in lines):
+    elif CODE_FENCE_RE.search(content):
         content_type = "code"
         list_length = None
         is_complete = True
@@ -150,28 +189,72 @@ def _create_chunk(lines: List[str], line_start: int, line_end: int, section: str
         }
     }
 
-def index_all_documents(vector_store: HybridVectorStore, config: Config) -> Dict[str, int]:
+def _read_docs(candidates: List[Candidate]) -> Iterator[Tuple[Candidate, Optional[str], Optional[Exception]]]:
+    """
+    Yield (candidate, text, read error) in order, with up to DOC_READ_AHEAD
+    reads (DOC_READ_AHEAD_BYTES of file data) in flight on I/O threads, so
+    file latency overlaps with indexing.
+    """
+    if not candidates:
+        return
+    with ThreadPoolExecutor(max_workers=min(DOC_READ_THREADS, len(candidates))) as io_pool:
+        pending = deque()
+        pending_bytes = 0
+        upcoming = deque(candidates)
+        while pending or upcoming:
+            # Top up the window (always at least one read in flight)
+            while upcoming and (not pending or (
+                    len(pending) < DOC_READ_AHEAD and pending_bytes + upcoming[0].size <= DOC_READ_AHEAD_BYTES)):
+                candidate = upcoming.popleft()
+                pending.append((candidate, io_pool.submit(Path(candidate.path).read_text, encoding='utf-8')))
+                pending_bytes += candidate.size
+            candidate, future = pending.popleft()
+            pending_bytes -= candidate.size
+            try:
+                yield candidate, future.result(), None
+            except Exception as e:
+                yield candidate, None, e
+
+def _find_docs(base_path: Path, patterns: List[str]) -> Dict[str, List[Candidate]]:
+    """Markdown files matching each pattern (one walk for all patterns, no stat for other files)."""
+    return find_matching_files(base_path, patterns, suffixes=('.md',))
+
+def collect_cloud_docs(config: Config) -> List[Candidate]:
+    """
+    Resolve config.cloud_docs to markdown files, in one directory walk.
+
+    The result serves cloud indexing, the local mirror and orphan cleanup.
+    """
+    base_path = config.project_root
+    logger.info(f"   Searching for docs in: {base_path}")
+    logger.info(f"   Patterns: {config.cloud_docs}")
+    matched = _find_docs(base_path, config.cloud_docs)
+    files_found: Dict[str, Candidate] = {}
+    for pattern in config.cloud_docs:
+        if matched[pattern]:
+            logger.info(f"   Found {len(matched[pattern])} files matching '{pattern}'")
+            # Overlapping patterns: index each file once
+            for candidate in matched[pattern]:
+                files_found.setdefault(candidate.path, candidate)
+        else:
+            logger.warning(f"   No files found matching pattern: '{pattern}'")
+    return list(files_found.values())
+
+def index_all_documents(vector_store: HybridVectorStore, config: Config,
+                        doc_files: Optional[List[Candidate]] = None) -> Dict[str, int]:
     """
     Index all documents from config.cloud_docs and config.local_docs
     
+    Args:
+        doc_files: cloud_docs files already found by collect_cloud_docs (walked here if None)
+    
     Returns: {"cloud": count, "local": count, "errors": count}
     """
     base_path = config.project_root
     stats = {"cloud": 0, "local": 0, "errors": 0}
     
     # Index cloud docs
-    logger.info(f"   Searching for docs in: {base_path}")
-    logger.info(f"   Patterns: {config.cloud_docs}")
-    files_found = []
-    for pattern in config.cloud_docs:
-        pattern_path = base_path / pattern if not Path(pattern).is_absolute() else Path(pattern)
-        logger.debug(f"   Trying pattern: {pattern} (resolved: {pattern_path})")
-        matched = list(base_path.glob(pattern))
-        if matched:
-            logger.info(f"   Found {len(matched)} files matching '{pattern}'")
-            files_found.extend(matched)
-        else:
-            logger.warning(f"   No files found matching pattern: '{pattern}'")
+    files_found = collect_cloud_docs(config) if doc_files is None else doc_files
     
     if not files_found:
         logger.warning(f"   ⚠️  No documentation files found! Check your config.cloud_docs paths.")
@@ -179,71 +262,123 @@ def index_all_documents(vector_store: HybridVectorStore, config: Config) -> Dict
         logger.warning(f"   Patterns tried: {config.cloud_docs}")
         logger.warning(f"   Tip: Use 'python rag_cli.py stats' to see what's configured")
     
-    for file_path in files_found:
-        if file_path.is_file() and file_path.suffix == '.md':
+    # Chunks of each cloud doc, reused by the local mirror below (same content,
+    # path and chunk settings, so chunking again would give the same result)
+    mirror_chunks: Dict[str, List[Dict]] = {}
+    
+    # (candidate, chunk count, index_doc future) in submission order
+    indexing = deque()
+    
+    def finish_oldest():
+        candidate, chunk_count, future = indexing.popleft()
+        try:
+            if future.result():
+                stats["cloud"] += chunk_count
+            else:
+                stats["errors"] += 1
+        except Exception as e:
+            logger.error("Failed to index %s: %s", candidate.path, e)
+            stats["errors"] += 1
+    
+    # Docs chunked but not yet submitted: (candidate, rel_path, chunks)
+    group = []
+    group_chunks = 0
+    
+    def submit_group():
+        nonlocal group_chunks
+        # One embedding call for the new chunks of every doc in the group; each
+        # index_doc below then finds its vectors in the embedding cache
+        if len(group) > 1:
+            vector_store.prefetch_embeddings([(rel_path, chunks) for _, rel_path, chunks in group], ["cloud"])
+        for candidate, rel_path, chunks in group:
+            indexing.append((candidate, len(chunks), index_pool.submit(vector_store.index_doc, rel_path, "cloud", chunks)))
+            if len(indexing) >= 2 * DOC_INDEX_THREADS:
+                finish_oldest()
+        group.clear()
+        group_chunks = 0
+    
+    # First-time uploads skip per-insert HNSW rebuilds (no-op for populated collections)
+    with vector_store.bulk_load("cloud"), ThreadPoolExecutor(max_workers=DOC_INDEX_THREADS) as index_pool:
+        for candidate, content, read_error in _read_docs(files_found):
             try:
-                rel_path = str(file_path.relative_to(base_path))
-                logger.info(f"\n{'='*70}")
-                logger.info(f"📝 Indexing: {rel_path}")
-                logger.info(f"{'='*70}")
-                
-                content = file_path.read_text(encoding='utf-8')
+                rel_path = candidate.rel_path
+                logger.info("\n%s\n📝 Indexing: %s\n%s", _BANNER, rel_path, _BANNER)
+            
+                if read_error is not None:
+                    raise read_error
                 chunks = chunk_markdown(content, rel_path, 
                                        chunk_size=config.chunk_size, 
                                        overlap=config.chunk_overlap)
-                logger.info(f"   Generated {len(chunks)} chunks from file")
-                
-                if vector_store.index_doc(rel_path, "cloud", chunks):
-                    stats["cloud"] += len(chunks)
-                else:
-                    stats["errors"] += 1
+                logger.info("   Generated %d chunks from file", len(chunks))
+                if vector_store.local_enabled:
+                    mirror_chunks[candidate.path] = chunks
+            
+                # Upserts run on the pool (I/O releases the GIL) while the next
+                # docs are read, chunked and embedded
+                group.append((candidate, rel_path, chunks))
+                group_chunks += len(chunks)
+                if group_chunks >= DOC_EMBED_BATCH_CHUNKS:
+                    submit_group()
             except Exception as e:
-                logger.error(f"Failed to index {file_path}: {e}")
+                logger.error("Failed to index %s: %s", candidate.path, e)
                 stats["errors"] += 1
+        submit_group()
+        while indexing:
+            finish_oldest()
     
     # Index local docs (mirror cloud + local-only) - only if local storage is enabled
     if vector_store.local_enabled:
-        # First mirror all cloud docs to local
-        for pattern in config.cloud_docs:
-            for file_path in base_path.glob(pattern):
-                if file_path.is_file() and file_path.suffix == '.md':
-                    try:
-                        rel_path = str(file_path.relative_to(base_path))
-                        logger.info(f"\n{'='*70}")
-                        logger.info(f"📝 Indexing: {rel_path} (local)")
-                        logger.info(f"{'='*70}")
-                        
-                        content = file_path.read_text(encoding='utf-8')
-                        chunks = chunk_markdown(content, rel_path,
-                                               chunk_size=config.chunk_size,
-                                               overlap=config.chunk_overlap)
-                        logger.info(f"   Generated {len(chunks)} chunks from file")
-                        
-                        if vector_store.index_doc(rel_path, "local", chunks):
-                            stats["local"] += len(chunks)
-                        else:
-                            stats["errors"] += 1
-                    except Exception as e:
-                        logger.error(f"Failed to mirror {file_path} to local: {e}")
-                        stats["errors"] += 1
+        # First mirror all cloud docs to local (same files, no second walk);
+        # only docs the cloud pass couldn't chunk are read again
+        reread = {
+            candidate.path: (content, read_error)
+            for candidate, content, read_error in _read_docs(
+                [candidate for candidate in files_found if candidate.path not in mirror_chunks]
+            )
+        }
+        for candidate in files_found:
+            try:
+                rel_path = candidate.rel_path
+                logger.info("\n%s\n📝 Indexing: %s (local)\n%s", _BANNER, rel_path, _BANNER)
+                
+                chunks = mirror_chunks.pop(candidate.path, None)
+                if chunks is None:
+                    content, read_error = reread[candidate.path]
+                    if read_error is not None:
+                        raise read_error
+                    chunks = chunk_markdown(content, rel_path,
+                                           chunk_size=config.chunk_size,
+                                           overlap=config.chunk_overlap)
+                logger.info("   Generated %d chunks from file", len(chunks))
+                
+                if vector_store.index_doc(rel_path, "local", chunks):
+                    stats["local"] += len(chunks)
+                else:
+                    stats["errors"] += 1
+            except Exception as e:
+                logger.error("Failed to mirror %s to local: %s", candidate.path, e)
+                stats["errors"] += 1
         
         # Index local-only docs
-        for pattern in config.local_docs:
-            for file_path in base_path.glob(pattern):
-                if file_path.is_file() and file_path.suffix == '.md':
-                    try:
-                        content = file_path.read_text(encoding='utf-8')
-                        chunks = chunk_markdown(content, str(file_path.relative_to(base_path)),
-                                               chunk_size=config.chunk_size,
-                                               overlap=config.chunk_overlap)
-                        rel_path = str(file_path.relative_to(base_path))
-                        if vector_store.index_doc(rel_path, "local", chunks):
-                            stats["local"] += len(chunks)
-                        else:
-                            stats["errors"] += 1
-                    except Exception as e:
-                        logger.error(f"Failed to index local doc {file_path}: {e}")
-                        stats["errors"] += 1
+        local_only: Dict[str, Candidate] = {}
+        for candidates in _find_docs(base_path, config.local_docs).values():
+            for candidate in candidates:
+                local_only.setdefault(candidate.path, candidate)
+        for candidate, content, read_error in _read_docs(list(local_only.values())):
+            try:
+                if read_error is not None:
+                    raise read_error
+                rel_path = candidate.rel_path
+                chunks = chunk_markdown(content, rel_path,
+                                       chunk_size=config.chunk_size,
+                                       overlap=config.chunk_overlap)
+                if vector_store.index_doc(rel_path, "local", chunks):
+                    stats["local"] += len(chunks)
+                else:
+                    stats["errors"] += 1
+            except Exception as e:
+                logger.error("Failed to index local doc %s: %s", candidate.path, e)
+                stats["errors"] += 1
     else:
         logger.info("Local storage is disabled. Skipping local indexing.")
     
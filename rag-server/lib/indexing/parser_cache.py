@@ -0,0 +1,89 @@
+"""
+Parser Cache: Persist parsed code elements by file content hash.
+
+This module handles:
+- SQLite storage of CodeParser.parse_file() results, one row per file path
+- Content-hash validation, so a changed file is always re-parsed
+- Fail-open behavior: any cache error just means the file is parsed again
+
+Unchanged files skip tree-sitter entirely on re-index.
+"""
+
+import hashlib
+import logging
+import pickle
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Bump when CodeParser's element extraction changes, so old rows are ignored
+PARSER_CACHE_VERSION = b"1"
+
+
+class ParserCache:
+    """Content-hash keyed store of parsed code elements (SQLite, WAL mode)."""
+
+    def __init__(self, db_path: Path):
+        """
+        Open (or create) the cache database.
+
+        Args:
+            db_path: SQLite file; parent directories are created as needed
+        """
+        self.db_path = Path(db_path)
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        try:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            # Indexer worker processes share the file: wait for the writer lock
+            self._db = sqlite3.connect(str(self.db_path), timeout=30, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS parsed (path TEXT PRIMARY KEY, digest BLOB, elements BLOB)"
+            )
+            self._db.commit()
+        except Exception as e:
+            logger.warning(f"Parser cache unavailable ({self.db_path}): {e}")
+            self._db = None
+
+    @staticmethod
+    def digest(source: bytes, mode: str) -> bytes:
+        """128-bit digest of (cache version, parse mode, file bytes)."""
+        h = hashlib.blake2b(PARSER_CACHE_VERSION + b"\0" + mode.encode() + b"\0", digest_size=16)
+        h.update(source)
+        return h.digest()
+
+    def get(self, file_path: str, digest: bytes) -> Optional[List[Dict]]:
+        """Cached elements for file_path if its content digest still matches, else None."""
+        if self._db is None:
+            return None
+        try:
+            with self._lock:
+                row = self._db.execute(
+                    "SELECT digest, elements FROM parsed WHERE path = ?", (file_path,)
+                ).fetchone()
+            if row is None or row[0] != digest:
+                return None
+            return pickle.loads(row[1])
+        except Exception as e:
+            logger.debug(f"Parser cache read failed for {file_path}: {e}")
+            return None
+
+    def put(self, file_path: str, digest: bytes, elements: List[Dict]):
+        """Store (replace) the parsed elements for file_path."""
+        if self._db is None:
+            return
+        try:
+            blob = pickle.dumps(elements, protocol=pickle.HIGHEST_PROTOCOL)
+            with self._lock:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO parsed (path, digest, elements) VALUES (?, ?, ?)",
+                    (file_path, digest, blob)
+                )
+                self._db.commit()
+        except Exception as e:
+            logger.debug(f"Parser cache write failed for {file_path}: {e}")
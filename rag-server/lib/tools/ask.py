@@ -1,28 +1,54 @@
 from mcp.types import Tool
+from collections import namedtuple
 import logging
+import threading
 import time
 
 logger = logging.getLogger(__name__)
 
 try:
-    from ..core.vector_store import HybridVectorStore
     from ..core.embedding_manager import EmbeddingManager
     from ..core.query_analyzer import QueryAnalyzer
     from ..core.reranker import Reranker
     from ..core.answer_synthesizer import AnswerSynthesizer
     from ..utils.citation import format_citation
-    from ..config import load_config
+    from .shared import get_config_and_store
 except ImportError:
     import sys
     from pathlib import Path
     sys.path.insert(0, str(Path(__file__).parent.parent))
-    from lib.core.vector_store import HybridVectorStore
     from lib.core.embedding_manager import EmbeddingManager
     from lib.core.query_analyzer import QueryAnalyzer
     from lib.core.reranker import Reranker
     from lib.core.answer_synthesizer import AnswerSynthesizer
     from lib.utils.citation import format_citation
-    from config import load_config
+    from lib.tools.shared import get_config_and_store
+
+# Pipeline components, built on first use and shared by every call (loading the
+# embedding and reranker models dominates the cost of a fresh instance)
+_Services = namedtuple("_Services", "config store embedder_mgr query_analyzer reranker synthesizer")
+_services = None
+_services_lock = threading.Lock()
+
+def _get_services() -> _Services:
+    """Shared pipeline components (initialized once, thread-safe)."""
+    global _services
+    if _services is None:
+        with _services_lock:
+            if _services is None:
+                config, store = get_config_and_store()
+                _services = _Services(
+                    config=config,
+                    store=store,
+                    embedder_mgr=EmbeddingManager(
+                        doc_model=config.embedding_models.doc,
+                        code_model=config.embedding_models.code
+                    ),
+                    query_analyzer=QueryAnalyzer(),
+                    reranker=Reranker(model_name=config.embedding_models.reranking),
+                    synthesizer=AnswerSynthesizer(),
+                )
+    return _services
 
 def ask_tool(question: str, context: str = "") -> str:
     """
@@ -38,16 +64,8 @@ def ask_tool(question: str, context: str = "") -> str:
     """
     start_time = time.time()
     try:
-        # Load config and initialize components
-        config = load_config()
-        store = HybridVectorStore(config)
-        embedder_mgr = EmbeddingManager(
-            doc_model=config.embedding_models.doc,
-            code_model=config.embedding_models.code
-        )
-        query_analyzer = QueryAnalyzer()
-        reranker = Reranker(model_name=config.embedding_models.reranking)
-        synthesizer = AnswerSynthesizer()
+        # Shared components (models are loaded on the first call only)
+        config, store, embedder_mgr, query_analyzer, reranker, synthesizer = _get_services()
 
         search_query = f"{question} {context}".strip()
 
@@ -99,18 +117,24 @@ def ask_tool(question: str, context: str = "") -> str:
             synthesized_answer = "\n\n".join([r.content for r in results[:config.hybrid_retrieval.max_results]])
 
         # Step 5: Format final answer with citations
-        answer = f"**Answer to: {question}**\n\n"
-        answer += synthesized_answer
-        answer += "\n\n---\n\n"
-        answer += "**Sources:**\n"
+        parts = [
+            f"**Answer to: {question}**\n\n",
+            synthesized_answer,
+            "\n\n---\n\n",
+            "**Sources:**\n",
+        ]
         
-        # Add citations for each result
+        # Cite the top 5 distinct files (results from the same file are skipped,
+        # so keep scanning past the first 5 results if needed)
         seen_files = set()
-        for result in results[:5]:  # Top 5 sources
-            citation = format_citation(result.file_path, result.line_number)
-            if result.file_path not in seen_files:
-                answer += f"- {citation}\n"
-                seen_files.add(result.file_path)
+        for result in results:
+            if result.file_path in seen_files:
+                continue
+            parts.append(f"- {format_citation(result.file_path, result.line_number)}\n")
+            seen_files.add(result.file_path)
+            if len(seen_files) == 5:
+                break
+        answer = "".join(parts)
 
         elapsed = time.time() - start_time
         logger.info(f"✅ ask_tool completed in {elapsed:.2f}s: {len(results)} results, intent={analysis.intent.value}")
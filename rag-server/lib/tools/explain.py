@@ -1,15 +1,26 @@
+from collections import defaultdict
+from itertools import islice
 from mcp.types import Tool
 try:
-    from ..core.vector_store import HybridVectorStore
     from ..utils.citation import format_citation
-    from ..config import load_config
+    from .shared import get_config_and_store
 except ImportError:
     import sys
     from pathlib import Path
     sys.path.insert(0, str(Path(__file__).parent.parent))
-    from lib.core.vector_store import HybridVectorStore
     from lib.utils.citation import format_citation
-    from config import load_config
+    from lib.tools.shared import get_config_and_store
+
+# Doc types in output order, with their section headings
+TYPE_ORDER = ('flow', 'sdlc', 'policy', 'infrastructure', 'decision', 'other')
+TYPE_LABEL = {
+    'flow': 'Flows',
+    'sdlc': 'SDLC Documentation',
+    'policy': 'Policies & Standards',
+    'infrastructure': 'Infrastructure',
+    'decision': 'Decisions',
+    'other': 'Other'
+}
 
 def explain_tool(topic: str) -> str:
     """
@@ -18,8 +29,7 @@ def explain_tool(topic: str) -> str:
     Provides comprehensive explanations with context and rationale
     """
     try:
-        config = load_config()
-        store = HybridVectorStore(config)
+        config, store = get_config_and_store()
         
         # Search for topic
         results = store.search(topic, top_k=config.max_results)
@@ -27,52 +37,37 @@ def explain_tool(topic: str) -> str:
         if not results:
             return f"I couldn't find information about '{topic}'. Please try a different topic or use the search tool."
         
-        # Build comprehensive explanation
-        explanation = f"# Explanation: {topic}\n\n"
+        # Build comprehensive explanation (parts joined once at the end)
+        parts = [f"# Explanation: {topic}\n\n"]
         
         # Group by doc type
-        by_type = {}
+        by_type = defaultdict(list)
         for result in results:
-            doc_type = result.metadata.get('doc_type', 'other')
-            if doc_type not in by_type:
-                by_type[doc_type] = []
-            by_type[doc_type].append(result)
+            by_type[result.metadata.get('doc_type', 'other')].append(result)
         
         # Organize by type
-        type_order = ['flow', 'sdlc', 'policy', 'infrastructure', 'decision', 'other']
-        for doc_type in type_order:
+        for doc_type in TYPE_ORDER:
             if doc_type not in by_type:
                 continue
             
-            type_label = {
-                'flow': 'Flows',
-                'sdlc': 'SDLC Documentation',
-                'policy': 'Policies & Standards',
-                'infrastructure': 'Infrastructure',
-                'decision': 'Decisions',
-                'other': 'Other'
-            }.get(doc_type, doc_type.title())
-            
-            explanation += f"## {type_label}\n\n"
+            parts.append(f"## {TYPE_LABEL[doc_type]}\n\n")
             
             # Group by file
-            file_groups = {}
+            file_groups = defaultdict(list)
             for result in by_type[doc_type]:
-                if result.file_path not in file_groups:
-                    file_groups[result.file_path] = []
                 file_groups[result.file_path].append(result)
             
-            for file_path, file_results in list(file_groups.items())[:2]:  # Top 2 files per type
-                explanation += f"### {file_path}\n\n"
+            for file_path, file_results in islice(file_groups.items(), 2):  # Top 2 files per type
+                parts.append(f"### {file_path}\n\n")
                 for result in file_results[:2]:  # Top 2 chunks per file
                     citation = format_citation(result.file_path, result.line_number)
                     section = result.metadata.get('section', '')
                     if section:
-                        explanation += f"**{section}** [{citation}]\n\n"
-                    explanation += f"{result.content[:400].replace(chr(10), ' ')}\n\n"
+                        parts.append(f"**{section}** [{citation}]\n\n")
+                    parts.append(f"{result.content[:400].replace(chr(10), ' ')}\n\n")
         
-        explanation += "\n---\n*For more details, use the search tool with specific queries.*"
-        return explanation
+        parts.append("\n---\n*For more details, use the search tool with specific queries.*")
+        return "".join(parts)
     except Exception as e:
         return f"Error explaining topic: {str(e)}"
 
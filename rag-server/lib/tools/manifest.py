@@ -8,11 +8,22 @@ Provides tools for three-tier context engineering:
 
 import json
 import logging
+from functools import lru_cache
 from mcp.types import Tool
 from lib.core.tool_manifest import ToolManifest
 
 logger = logging.getLogger(__name__)
 
+# Tier 1 briefs are static: build and serialize the manifest once, at import
+_MANIFEST_CACHE = {
+    "manifest": ToolManifest.get_manifest(),
+    "validation": ToolManifest.validate_briefs(),
+    "total_tools": len(ToolManifest.TOOL_BRIEFS),
+    "tier": 1,
+    "description": "Lightweight tool briefs for initial discovery. Use get_tool_schema for full details."
+}
+_MANIFEST_JSON = json.dumps(_MANIFEST_CACHE, indent=2)
+
 def get_manifest_tool() -> str:
     """
     Get Tier 1 manifest - lightweight briefs for all tools.
@@ -21,23 +32,22 @@ def get_manifest_tool() -> str:
     Returns:
         JSON string with tool briefs
     """
-    try:
-        manifest = ToolManifest.get_manifest()
-        validation = ToolManifest.validate_briefs()
-        
-        result = {
-            "manifest": manifest,
-            "validation": validation,
-            "total_tools": len(manifest),
-            "tier": 1,
-            "description": "Lightweight tool briefs for initial discovery. Use get_tool_schema for full details."
-        }
-        
-        logger.info(f"Manifest requested: {len(manifest)} tools")
-        return json.dumps(result, indent=2)
-    except Exception as e:
-        logger.error(f"Error getting manifest: {str(e)}", exc_info=True)
-        return json.dumps({"error": str(e)})
+    logger.info(f"Manifest requested: {_MANIFEST_CACHE['total_tools']} tools")
+    return _MANIFEST_JSON
+
+@lru_cache(maxsize=64)
+def _tool_schema_json(tool_name: str) -> str:
+    """
+    Serialized Tier 2 response for a registered tool.
+    
+    Only called once the schema is registered (server.py registers them at
+    startup), so unregistered lookups are never cached.
+    """
+    return json.dumps({
+        "tool_name": tool_name,
+        "tier": 2,
+        "schema": ToolManifest.get_tool_schema(tool_name)
+    }, indent=2)
 
 def get_tool_schema_tool(tool_name: str) -> str:
     """
@@ -70,11 +80,7 @@ def get_tool_schema_tool(tool_name: str) -> str:
                 }, indent=2)
         
         logger.info(f"Tool schema requested: {tool_name}")
-        return json.dumps({
-            "tool_name": tool_name,
-            "tier": 2,
-            "schema": schema
-        }, indent=2)
+        return _tool_schema_json(tool_name)
     except Exception as e:
         logger.error(f"Error getting tool schema: {tool_name}: {str(e)}", exc_info=True)
         return json.dumps({"error": str(e)})
@@ -7,8 +7,15 @@ Supports:
 - Detailed results with metadata
 """
 
+import asyncio
+import heapq
 import logging
+import queue
+import threading
 import time
+from collections import defaultdict, namedtuple
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from mcp.types import Tool
 
 logger = logging.getLogger(__name__)
@@ -16,16 +23,124 @@ logger = logging.getLogger(__name__)
 try:
     from ..core.vector_store import HybridVectorStore
     from ..core.embedding_manager import EmbeddingManager
-    from ..config import load_config
     from ..utils.citation import format_citation
+    from .shared import get_config_and_store
 except ImportError:
     import sys
     from pathlib import Path
     sys.path.insert(0, str(Path(__file__).parent.parent))
     from lib.core.vector_store import HybridVectorStore
     from lib.core.embedding_manager import EmbeddingManager
-    from config import load_config
     from lib.utils.citation import format_citation
+    from lib.tools.shared import get_config_and_store
+
+# Most queries taken into one hybrid_search_batch call
+SEARCH_BATCH_MAX = 32
+# Groups (distinct embedder / top_k / filters) searched at the same time
+SEARCH_GROUP_WORKERS = 4
+# Longest a caller waits for its results, in seconds (cloud + local search)
+SEARCH_TIMEOUT = 60.0
+# Value a result counts as having when its payload lacks the filtered field
+PAYLOAD_DEFAULTS = {"content_type": "doc", "language": "unknown", "code_type": "function"}
+
+
+class _SearchBatcher:
+    """
+    Coalesce concurrent searches into store.hybrid_search_batch calls.
+    
+    One worker thread takes a query and everything queued behind it (up to
+    SEARCH_BATCH_MAX), so searches that arrive while a batch is running are
+    embedded and sent to Qdrant together. A lone search is sent right away.
+    Each group of compatible queries is searched on its own pool thread, so a
+    slow group doesn't hold up the others.
+    """
+
+    def __init__(self, store: HybridVectorStore, timeout: float = SEARCH_TIMEOUT,
+                 max_workers: int = SEARCH_GROUP_WORKERS):
+        self.store = store
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="search-group")
+        self._queue = queue.Queue()
+        self._worker = None
+        self._worker_lock = threading.Lock()
+
+    def search(self, query: str, embedder, top_k: int, filters: dict):
+        """Blocking hybrid_search (payload filters applied by Qdrant) through the batch worker."""
+        future = Future()
+        self._queue.put((query, (embedder, top_k, tuple(sorted(filters.items()))), future))
+        if self._worker is None:
+            with self._worker_lock:
+                if self._worker is None:
+                    self._worker = threading.Thread(target=self._run, name="search-batcher", daemon=True)
+                    self._worker.start()
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            raise TimeoutError(f"Search did not complete within {self.timeout:g}s") from None
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < SEARCH_BATCH_MAX:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            # One batched call per (embedder, top_k, filters)
+            groups = defaultdict(list)
+            for query, key, future in batch:
+                groups[key].append((query, future))
+            for (embedder, top_k, filters), items in groups.items():
+                self._executor.submit(self._search_group, embedder, top_k, dict(filters), items)
+
+    def _search_group(self, embedder, top_k: int, filters: dict, items):
+        if len(items) > 1:
+            try:
+                results = self.store.hybrid_search_batch(
+                    [query for query, _ in items], embedder, top_k=top_k,
+                    filters=filters, missing_as=PAYLOAD_DEFAULTS
+                )
+                for (_, future), query_results in zip(items, results):
+                    future.set_result(query_results)
+                return
+            except Exception as e:
+                logger.warning(f"Batched search of {len(items)} queries failed, searching one by one: {e}")
+        # Single query (or failed batch): each caller gets its own results or error
+        for query, future in items:
+            try:
+                future.set_result(self.store.hybrid_search(
+                    query=query, embedder=embedder, top_k=top_k,
+                    filters=filters, missing_as=PAYLOAD_DEFAULTS
+                ))
+            except Exception as e:
+                future.set_exception(e)
+
+
+# Embedding models and search batcher, built on first use and shared by both
+# tools; the store is the process-wide one from shared.py, so writes made by the
+# vector CRUD tools clear the caches these searches read
+_Services = namedtuple("_Services", "config store embedder_mgr batcher")
+_services = None
+_services_lock = threading.Lock()
+
+
+def _get_services() -> _Services:
+    """Shared search components (initialized once, thread-safe)."""
+    global _services
+    if _services is None:
+        with _services_lock:
+            if _services is None:
+                config, store = get_config_and_store()
+                _services = _Services(
+                    config=config,
+                    store=store,
+                    embedder_mgr=EmbeddingManager(
+                        doc_model=config.embedding_models.doc,
+                        code_model=config.embedding_models.code
+                    ),
+                    batcher=_SearchBatcher(store),
+                )
+    return _services
 
 
 def search_tool(
@@ -48,12 +163,7 @@ def search_tool(
     """
     start_time = time.time()
     try:
-        config = load_config()
-        store = HybridVectorStore(config)
-        embedder_mgr = EmbeddingManager(
-            doc_model=config.embedding_models.doc,
-            code_model=config.embedding_models.code
-        )
+        _, _, embedder_mgr, batcher = _get_services()
 
         # Choose embedder based on content type
         if content_type == "code":
@@ -64,37 +174,18 @@ def search_tool(
         # Perform search
         logger.debug(f"Search: query='{query}', type={content_type}, lang={language}, top_k={top_k}")
         
-        results = store.hybrid_search(
-            query=query,
-            embedder=embedder,
-            top_k=top_k
-        )
-        
-        if not results:
-            return f"No results found for: '{query}'"
-        
-        # Filter results
-        filtered_results = []
-        for result in results:
-            # Filter by content type
-            if content_type != "all":
-                result_type = result.metadata.get("content_type", "doc")
-                if result_type != content_type:
-                    continue
-
-            # Filter by language
-            if language != "all":
-                result_lang = result.metadata.get("language", "unknown")
-                if result_lang != language:
-                    continue
-
-            filtered_results.append(result)
+        # Content type and language filters run inside the Qdrant query ("all" = no filter)
+        filters = {key: value for key, value in (("content_type", content_type), ("language", language))
+                   if value != "all"}
+        filtered_results = batcher.search(query, embedder, top_k, filters)
 
         if not filtered_results:
-            return f"No results matching filters: type={content_type}, language={language}"
+            if filters:
+                return f"No results matching filters: type={content_type}, language={language}"
+            return f"No results found for: '{query}'"
 
-        # Format results
-        answer = f"**Search Results for: '{query}'** ({len(filtered_results)} found)\n\n"
+        # Format results (parts joined once at the end)
+        parts = [f"**Search Results for: '{query}'** ({len(filtered_results)} found)\n\n"]
 
         for i, result in enumerate(filtered_results[:top_k], 1):
             citation = format_citation(result.file_path, result.line_number)
@@ -102,22 +193,26 @@ def search_tool(
             score = result.score
 
             # Format content preview (first 500 chars)
-            preview = result.content[:500].replace('\n', ' ')
+            content = result.content
+            preview = content[:500].replace('\n', ' ')
+            ellipsis = '...' if len(content) > 500 else ''
 
-            answer += f"**{i}. {citation}** (Score: {score:.2f}, Type: {content_type_label})\n"
-            answer += f"{preview}{'...' if len(result.content) > 500 else ''}\n\n"
+            parts.append(f"**{i}. {citation}** (Score: {score:.2f}, Type: {content_type_label})\n")
+            parts.append(f"{preview}{ellipsis}\n\n")
 
         # Add metadata summary
-        answer += "---\n"
-        answer += f"**Search Summary:**\n"
-        answer += f"- Results: {len(filtered_results)} of {len(results)} total\n"
-        answer += f"- Content Type: {content_type}\n"
-        answer += f"- Language: {language}\n"
+        parts.append(
+            "---\n"
+            "**Search Summary:**\n"
+            f"- Results: {len(filtered_results)}\n"
+            f"- Content Type: {content_type}\n"
+            f"- Language: {language}\n"
+        )
 
         elapsed = time.time() - start_time
         logger.info(f"✅ search_tool completed in {elapsed:.2f}s: {len(filtered_results)} results (type={content_type}, lang={language})")
         logger.debug(f"Search complete: {len(filtered_results)} results returned")
-        return answer
+        return "".join(parts)
 
     except Exception as e:
         elapsed = time.time() - start_time
@@ -144,85 +239,81 @@ def code_search_tool(
         Formatted code search results
     """
     try:
-        config = load_config()
-        store = HybridVectorStore(config)
-        embedder_mgr = EmbeddingManager(
-            doc_model=config.embedding_models.doc,
-            code_model=config.embedding_models.code
-        )
+        _, _, embedder_mgr, batcher = _get_services()
 
         # Use code embedder
         code_embedder = embedder_mgr.get_embedder("code")
 
         logger.debug(f"Code search: query='{query}', lang={language}, type={code_type}, top_k={top_k}")
 
-        results = store.hybrid_search(
-            query=query,
-            embedder=code_embedder,
-            top_k=top_k
-        )
-
-        if not results:
-            return f"No code found matching: '{query}'"
-
-        # Filter by language and code type
-        filtered_results = []
-        for result in results:
-            # Check content type is code
-            if result.metadata.get("content_type") != "code":
-                continue
-
-            # Filter by language
-            if language != "all":
-                result_lang = result.metadata.get("language", "unknown")
-                if result_lang != language:
-                    continue
-
-            # Filter by code type (function, class, method)
-            if code_type != "all":
-                result_type = result.metadata.get("code_type", "function")
-                if result_type != code_type:
-                    continue
-
-            filtered_results.append(result)
+        # Code results only, filtered by language and code type (function, class, method)
+        # inside the Qdrant query
+        filters = {"content_type": "code"}
+        if language != "all":
+            filters["language"] = language
+        if code_type != "all":
+            filters["code_type"] = code_type
+        filtered_results = batcher.search(query, code_embedder, top_k, filters)
 
         if not filtered_results:
             return f"No code found matching: '{query}' (language={language}, type={code_type})"
 
         # Format results
-        answer = f"**Code Search Results for: '{query}'**\n\n"
+        parts = [f"**Code Search Results for: '{query}'**\n\n"]
 
-        # Group by file and language
-        by_file = {}
+        # Group by file
+        by_file = defaultdict(list)
         for result in filtered_results:
-            file_path = result.file_path
-            if file_path not in by_file:
-                by_file[file_path] = []
-            by_file[file_path].append(result)
+            by_file[result.file_path].append(result)
 
-        for file_path, file_results in sorted(by_file.items())[:5]:  # Top 5 files
+        # First 5 files by path, without sorting all of them
+        for file_path, file_results in heapq.nsmallest(5, by_file.items(), key=lambda item: item[0]):
             lang = file_results[0].metadata.get("language", "unknown")
-            answer += f"**File: {file_path}** ({lang})\n\n"
+            parts.append(f"**File: {file_path}** ({lang})\n\n")
 
             for result in file_results[:3]:  # Top 3 per file
                 code_name = result.metadata.get("name", "Unknown")
                 code_type_name = result.metadata.get("code_type", "code")
                 lines = result.line_number
 
-                answer += f"- **{code_type_name}: {code_name}** (line {lines})\n"
-                answer += f"```{lang}\n{result.content}\n```\n\n"
+                parts.append(f"- **{code_type_name}: {code_name}** (line {lines})\n")
+                parts.append(f"```{lang}\n{result.content}\n```\n\n")
 
-        answer += "---\n"
-        answer += f"Found {len(filtered_results)} code elements matching your query\n"
+        parts.append(f"---\nFound {len(filtered_results)} code elements matching your query\n")
 
         logger.debug(f"Code search complete: {len(filtered_results)} results")
-        return answer
+        return "".join(parts)
 
     except Exception as e:
         logger.error(f"Code search error: {str(e)}", exc_info=True)
         return f"Code search error: {str(e)}"
 
 
+async def asearch_tool(
+    query: str,
+    content_type: str = "all",
+    language: str = "all",
+    top_k: int = 10
+) -> str:
+    """
+    Async search_tool for event-loop callers (e.g. MCP handlers).
+
+    Embedding, the Qdrant query and formatting run in a worker thread, so the
+    loop keeps serving other requests; concurrent calls share search batches.
+    """
+    return await asyncio.to_thread(search_tool, query, content_type, language, top_k)
+
+
+async def acode_search_tool(
+    query: str,
+    language: str = "all",
+    code_type: str = "all",
+    top_k: int = 10
+) -> str:
+    """Async code_search_tool for event-loop callers (runs in a worker thread)."""
+    return await asyncio.to_thread(code_search_tool, query, language, code_type, top_k)
+
+
 # MCP Tool definition
 search_tool_mcp = Tool(
     name="search",
@@ -0,0 +1,42 @@
+"""
+Shared Store: One config and HybridVectorStore for every tool in the process.
+
+Tools that read (search, ask, explain) and tools that write (vector CRUD,
+index_repository) must use the same store instance: writes clear that
+instance's query and semantic result caches, so a write through a separate
+instance would leave the search tools serving stale results.
+"""
+
+import threading
+
+try:
+    from ..core.vector_store import HybridVectorStore
+    from ..config import load_config
+except ImportError:
+    import sys
+    from pathlib import Path
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+    from lib.core.vector_store import HybridVectorStore
+    from config import load_config
+
+# Loaded on first use (embedding model load + Qdrant connection)
+_config = None
+_store = None
+_init_lock = threading.Lock()
+
+
+def get_config_and_store():
+    """
+    Shared (config, HybridVectorStore), initialized once (thread-safe).
+
+    The config is shared too: treat it as read-only (callers that need to
+    change settings, like index_repository, load their own copy).
+    """
+    global _config, _store
+    if _store is None:
+        with _init_lock:
+            if _store is None:
+                config = load_config()
+                _store = HybridVectorStore(config)
+                _config = config
+    return _config, _store
@@ -21,7 +21,6 @@ logger = logging.getLogger(__name__)
 
 try:
     from ..core.vector_store import (
-        HybridVectorStore,
         VectorStoreError,
         ValidationError,
         PointNotFoundError,
@@ -29,6 +28,7 @@ try:
         BatchLimitExceededError
     )
     from ..config import load_config
+    from .shared import get_config_and_store
     from qdrant_client.models import PointStruct, Filter, FieldCondition, MatchValue
     from qdrant_client.http.exceptions import UnexpectedResponse
 except ImportError:
@@ -36,7 +36,6 @@ except ImportError:
     from pathlib import Path
     sys.path.insert(0, str(Path(__file__).parent.parent))
     from lib.core.vector_store import (
-        HybridVectorStore,
         VectorStoreError,
         ValidationError,
         PointNotFoundError,
@@ -44,6 +43,7 @@ except ImportError:
         BatchLimitExceededError
     )
     from config import load_config
+    from lib.tools.shared import get_config_and_store
     from qdrant_client.models import PointStruct, Filter, FieldCondition, MatchValue
     from qdrant_client.http.exceptions import UnexpectedResponse
 
@@ -149,8 +149,7 @@ def add_vector(content: str = "", metadata: Dict = None, vector: Optional[List[f
     """
     start_time = time.time()
     try:
-        config = load_config()
-        store = HybridVectorStore(config)
+        config, store = get_config_and_store()
         store.ensure_collection_exists("cloud")
         
         # Validate input
@@ -162,6 +161,36 @@ def add_vector(content: str = "", metadata: Dict = None, vector: Optional[List[f
                 suggestions=ERROR_SUGGESTIONS["VALIDATION_ERROR"]
             )
         
+        # Standalone content already stored (same text, live standalone point):
+        # update that point's metadata instead of embedding and inserting a duplicate
+        file_path = (metadata or {}).get("file_path", "")
+        content_hash = store._content_hash(content) if content else None
+        if content_hash and not file_path and not vector:
+            existing_id = store.find_by_content_hash(content_hash, "cloud")
+            if existing_id is not None:
+                if metadata:
+                    store.cloud_client.set_payload(
+                        collection_name=store.cloud_collection,
+                        payload=metadata,
+                        points=[existing_id]
+                    )
+                    store.invalidate_search_cache("cloud")
+                elapsed = time.time() - start_time
+                logger.info(f"✅ add_vector found existing content in {elapsed:.2f}s: vector_id={existing_id}")
+                return _create_response(
+                    success=True,
+                    data={
+                        "vector_id": existing_id,
+                        "metadata": metadata or {},
+                        "deduplicated": True
+                    },
+                    metadata={
+                        "timing_ms": round(elapsed * 1000, 2),
+                        "operation": "add_vector"
+                    },
+                    errors=[]
+                )
+        
         # Get or generate vector
         if vector:
             store.validate_vector(vector)
@@ -183,10 +212,13 @@ def add_vector(content: str = "", metadata: Dict = None, vector: Optional[List[f
         metadata.setdefault("is_deleted", False)
         if content and "content" not in metadata:
             metadata["content"] = content
+        if content_hash:
+            metadata.setdefault("content_hash", content_hash)
         
         # Generate ID
-        file_path = metadata.get("file_path", "")
         line_start = metadata.get("line_start", 0)
+        if file_path:
+            metadata.setdefault("file_path_norm", store._normalize_path(file_path))
         vector_id = store.generate_point_id(content_for_id, file_path, line_start)
         
         # Create point
@@ -197,6 +229,7 @@ def add_vector(content: str = "", metadata: Dict = None, vector: Optional[List[f
             collection_name=store.cloud_collection,
             points=[point_struct]
         )
+        store.invalidate_search_cache("cloud")
         
         elapsed = time.time() - start_time
         logger.info(f"✅ add_vector completed in {elapsed:.2f}s: vector_id={vector_id}")
@@ -263,8 +296,7 @@ def get_vector(vector_id, include_vector: bool = False) -> str:
                 suggestions=["Provide vector_id as integer or string"]
             )
         
-        config = load_config()
-        store = HybridVectorStore(config)
+        config, store = get_config_and_store()
         store.ensure_collection_exists("cloud")
         
         # Retrieve point
@@ -365,8 +397,7 @@ def update_vector(vector_id, content: Optional[str] = None,
                 suggestions=["Provide vector_id as integer or string"]
             )
         
-        config = load_config()
-        store = HybridVectorStore(config)
+        config, store = get_config_and_store()
         store.ensure_collection_exists("cloud")
         
         # Check if point exists (retrieve with vector to allow metadata-only updates)
@@ -415,8 +446,16 @@ def update_vector(vector_id, content: Optional[str] = None,
         updated_payload = existing_payload.copy()
         if metadata:
             updated_payload.update(metadata)
+            if "file_path" in metadata:
+                # Re-derive so per-file lookups and cleanup follow the new file_path
+                if updated_payload["file_path"]:
+                    updated_payload["file_path_norm"] = store._normalize_path(updated_payload["file_path"])
+                else:
+                    updated_payload.pop("file_path_norm", None)
         if content:
             updated_payload["content"] = content
+            # Keep the hash add_vector deduplicates on in step with the new text
+            updated_payload["content_hash"] = store._content_hash(content)
         updated_payload.setdefault("is_deleted", False)
         
         # Create updated point
@@ -427,6 +466,7 @@ def update_vector(vector_id, content: Optional[str] = None,
             collection_name=store.cloud_collection,
             points=[point_struct]
         )
+        store.invalidate_search_cache("cloud")
         
         elapsed = time.time() - start_time
         logger.info(f"✅ update_vector completed in {elapsed:.2f}s: vector_id={vector_id}")
@@ -487,8 +527,7 @@ def delete_vector(vector_id, soft_delete: bool = False) -> str:
                 suggestions=["Provide vector_id as integer or string"]
             )
         
-        config = load_config()
-        store = HybridVectorStore(config)
+        config, store = get_config_and_store()
         store.ensure_collection_exists("cloud")
         
         # Check if point exists
@@ -519,6 +558,7 @@ def delete_vector(vector_id, soft_delete: bool = False) -> str:
                 collection_name=store.cloud_collection,
                 points_selector=[vector_id]
             )
+        store.invalidate_search_cache("cloud")
         
         elapsed = time.time() - start_time
         logger.info(f"✅ delete_vector completed in {elapsed:.2f}s: vector_id={vector_id}, soft={soft_delete}")
@@ -570,8 +610,7 @@ def delete_all(collection: str = "cloud", confirm: bool = False) -> str:
                 suggestions=["Set confirm=True if you really want to delete all data", "This operation cannot be undone"]
             )
         
-        config = load_config()
-        store = HybridVectorStore(config)
+        config, store = get_config_and_store()
         
         # Validate collection
         if collection not in ["cloud", "local"]:
@@ -635,13 +674,12 @@ def delete_all(collection: str = "cloud", confirm: bool = False) -> str:
             # Delete all points by IDs
             if all_point_ids:
                 # Delete in batches to avoid overwhelming the API
-                batch_size_delete = 1000
-                for i in range(0, len(all_point_ids), batch_size_delete):
-                    batch_ids = all_point_ids[i:i + batch_size_delete]
+                for batch_ids in store.chunk_batch(all_point_ids, 1000):
                     client.delete(
                         collection_name=coll_name,
                         points_selector=batch_ids
                     )
+                store.invalidate_search_cache(collection)
             
             logger.info(f"✅ delete_all completed: Deleted {count_before:,} points from {collection} collection")
         else:
@@ -690,8 +728,7 @@ def search_similar(query: str, top_k: int = 10, vector: Optional[List[float]] =
     """
     start_time = time.time()
     try:
-        config = load_config()
-        store = HybridVectorStore(config)
+        config, store = get_config_and_store()
         store.ensure_collection_exists("cloud")
         
         # Validate top_k
@@ -718,11 +755,10 @@ def search_similar(query: str, top_k: int = 10, vector: Optional[List[float]] =
         if filter:
             qdrant_filter = store.parse_filter(filter)
         
-        # Search
-        from qdrant_client.models import NearestQuery
+        # Search (query_points accepts lists and numpy arrays)
         search_results = store.cloud_client.query_points(
             collection_name=store.cloud_collection,
-            query=NearestQuery(nearest=query_vector),
+            query=query_vector,
             limit=top_k,
             query_filter=qdrant_filter
         )
@@ -785,8 +821,7 @@ def search_by_metadata(filter: Dict, limit: int = 10, offset: int = 0) -> str:
     """
     start_time = time.time()
     try:
-        config = load_config()
-        store = HybridVectorStore(config)
+        config, store = get_config_and_store()
         store.ensure_collection_exists("cloud")
         
         # Validate limit
@@ -812,17 +847,21 @@ def search_by_metadata(filter: Dict, limit: int = 10, offset: int = 0) -> str:
             error_msg = str(e)
             if "Index required" in error_msg or "Bad request" in error_msg or isinstance(e, UnexpectedResponse):
                 logger.warning(f"Qdrant filter failed (likely unindexed field), falling back to Python filtering: {e}")
-                # Scroll all points (with reasonable limit for fallback)
-                scroll_limit = min(limit * 10, 10000)  # Get more points for filtering
-                all_points, _ = store.cloud_client.scroll(
-                    collection_name=store.cloud_collection,
-                    limit=scroll_limit,
-                    offset=0,
-                    with_payload=True,
-                    with_vectors=False
-                )
-                # Filter in Python
-                points = store._filter_points_in_python(all_points, filter)
+                # Follow the scroll cursor page by page, filtering each page in Python,
+                # until enough matches for this page of results (or the collection ends)
+                points = []
+                scroll_offset = None
+                while len(points) < offset + limit:
+                    page, scroll_offset = store.cloud_client.scroll(
+                        collection_name=store.cloud_collection,
+                        limit=512,
+                        offset=scroll_offset,
+                        with_payload=True,
+                        with_vectors=False
+                    )
+                    points.extend(store._filter_points_in_python(page, filter))
+                    if scroll_offset is None:
+                        break
                 # Apply pagination manually
                 points = points[offset:offset + limit]
             else:
@@ -916,9 +955,10 @@ def index_repository(
         if not repo_path.is_dir():
             raise ValueError(f"Repository path must be a directory: {repository_path}")
         
-        # Load config (will use existing .env for Qdrant)
+        # Own config copy (its paths are overridden below); the store is shared so
+        # the search tools' caches see the writes
         config = load_config()
-        store = HybridVectorStore(config)
+        _, store = get_config_and_store()
         
         # Override project_root temporarily
         original_project_root = config.project_root
@@ -1049,7 +1089,7 @@ def index_repository(
                     doc_model=config.embedding_models.doc,
                     code_model=config.embedding_models.code
                 )
-                code_indexer = CodeIndexer(store, embedder_mgr)
+                code_indexer = CodeIndexer(store, embedder_mgr, parser_cache_path=config.parser_cache_file)
                 
                 # Count files first
                 code_files = []
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Test the single-walk glob matcher (lib/indexing/file_walker.py).
+
+Pins the glob -> regex translation against Path.glob() on a temporary tree:
+for every pattern, find_matching_files must return exactly the files
+Path.glob() finds (trailing "**" is the documented exception).
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from lib.indexing.file_walker import find_matching_files, glob_to_regex
+
+TREE = [
+    "README.md",
+    ".hidden.md",
+    "setup.py",
+    "docs/guide.md",
+    "docs/api.md",
+    "docs/a1.md",
+    "docs/b2.md",
+    "docs/notes.txt",
+    "docs/deep/nested/page.md",
+    "docs/deep/page.md",
+    "src/app.py",
+    "src/app.ts",
+    "src/pkg/__init__.py",
+    "src/pkg/mod.py",
+    "src/node_modules/lib/index.js",
+    "tests/test_app.py",
+]
+
+PATTERNS = [
+    "*.md",
+    "*.py",
+    "**/*.md",
+    "**/*.py",
+    "docs/*.md",
+    "docs/**/*.md",
+    "docs/?1.md",
+    "docs/[ab]?.md",
+    "docs/[!a]*.md",
+    "src/**/*.py",
+    "src/pkg/*",
+    "**/pkg/*.py",
+    "src/*.ts",
+    "./docs/*.md",
+    "docs/deep/page.md",
+    "missing/**/*.md",
+]
+
+
+def _make_tree(base: Path):
+    for rel_path in TREE:
+        path = base / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(rel_path)
+
+
+def _glob_files(base: Path, pattern: str):
+    return sorted(p.relative_to(base).as_posix() for p in base.glob(pattern) if p.is_file())
+
+
+def _walker_files(base: Path, pattern: str, **kwargs):
+    return sorted(c.rel_path for c in find_matching_files(base, [pattern], **kwargs)[pattern])
+
+
+def test_matches_path_glob():
+    """Every pattern finds the same files as Path.glob"""
+    with tempfile.TemporaryDirectory() as tmp:
+        base = Path(tmp)
+        _make_tree(base)
+        for pattern in PATTERNS:
+            expected = _glob_files(base, pattern)
+            actual = _walker_files(base, pattern)
+            assert actual == expected, f"{pattern}: walker {actual} != Path.glob {expected}"
+    return True
+
+
+def test_trailing_double_star():
+    """A trailing "**" matches every file below (Path.glob before 3.13: directories only)"""
+    with tempfile.TemporaryDirectory() as tmp:
+        base = Path(tmp)
+        _make_tree(base)
+        assert _walker_files(base, "docs/**") == sorted(p for p in TREE if p.startswith("docs/"))
+    return True
+
+
+def test_all_patterns_in_one_walk():
+    """Several patterns at once give the same per-pattern results as one at a time"""
+    with tempfile.TemporaryDirectory() as tmp:
+        base = Path(tmp)
+        _make_tree(base)
+        matches = find_matching_files(base, PATTERNS)
+        for pattern in PATTERNS:
+            assert sorted(c.rel_path for c in matches[pattern]) == _glob_files(base, pattern), pattern
+    return True
+
+
+def test_excludes_and_suffixes():
+    """Excluded directories are pruned; suffixes drop files before matching"""
+    with tempfile.TemporaryDirectory() as tmp:
+        base = Path(tmp)
+        _make_tree(base)
+        everything = _walker_files(base, "**/*", exclude_patterns=("**/node_modules/**",))
+        assert "src/node_modules/lib/index.js" not in everything
+        assert "src/app.ts" in everything
+        assert _walker_files(base, "**/*", suffixes=(".md",)) == _glob_files(base, "**/*.md")
+    return True
+
+
+def test_regex_translation():
+    """Wildcards never cross "/" and "**" spans zero or more directories"""
+    cases = [
+        ("*.md", "a.md", True),
+        ("*.md", "docs/a.md", False),
+        ("docs/?.md", "docs/a.md", True),
+        ("docs/?.md", "docs/ab.md", False),
+        ("**/*.md", "a.md", True),
+        ("**/*.md", "x/y/a.md", True),
+        ("docs/**/*.md", "docs/a.md", True),
+        ("docs/**/*.md", "docsx/a.md", False),
+        ("docs/[!a]*.md", "docs/b.md", True),
+        ("docs/[!a]*.md", "docs/a.md", False),
+        ("a+b(1).md", "a+b(1).md", True),
+        ("docs\\*.md", "docs/a.md", True),
+    ]
+    for pattern, path, expected in cases:
+        assert bool(glob_to_regex(pattern).match(path)) == expected, (pattern, path)
+    return True
+
+
+def main():
+    """Run all file walker tests"""
+    print("\n" + "="*60)
+    print("FILE WALKER TESTS")
+    print("="*60)
+
+    tests = [
+        ("Matches Path.glob", test_matches_path_glob),
+        ("Trailing **", test_trailing_double_star),
+        ("All patterns in one walk", test_all_patterns_in_one_walk),
+        ("Excludes and suffixes", test_excludes_and_suffixes),
+        ("Regex translation", test_regex_translation),
+    ]
+    passed = 0
+    for name, test in tests:
+        try:
+            test()
+            print(f"   [PASS]: {name}")
+            passed += 1
+        except Exception as e:
+            print(f"   [FAIL]: {name}: {e!r}")
+
+    print(f"\n   Results: {passed}/{len(tests)} tests passed")
+    return 0 if passed == len(tests) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
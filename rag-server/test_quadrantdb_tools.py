@@ -15,6 +15,7 @@ import sys
 import json
 import logging
 import os
+import uuid
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent))
@@ -234,6 +235,56 @@ def test_delete_vector(vector_id, soft_delete=True):
         return False
 
 
+def test_dedup_after_update():
+    """add_vector must not dedup against a point whose content was updated away"""
+    print("\n" + "="*60)
+    print("[TEST 7] Testing add -> update -> add deduplication...")
+    print("="*60)
+    
+    marker = uuid.uuid4().hex
+    original = f"Dedup check original text {marker}"
+    ids = []
+    try:
+        data = json.loads(add_vector(content=original))
+        if not data["success"]:
+            print(f"[FAIL] add_vector: {data['errors']}")
+            return False
+        first_id = data["data"]["vector_id"]
+        ids.append(first_id)
+        
+        data = json.loads(update_vector(first_id, content=f"Dedup check replacement text {marker}"))
+        if not data["success"]:
+            print(f"[FAIL] update_vector: {data['errors']}")
+            return False
+        
+        # The original text is no longer stored anywhere, so this must insert a new point
+        data = json.loads(add_vector(content=original, metadata={"tag": marker}))
+        if not data["success"]:
+            print(f"[FAIL] second add_vector: {data['errors']}")
+            return False
+        second_id = data["data"]["vector_id"]
+        ids.append(second_id)
+        if second_id == first_id or data["data"].get("deduplicated"):
+            print(f"[FAIL] second add_vector deduplicated against updated point {first_id}")
+            return False
+        
+        updated = json.loads(get_vector(first_id))
+        if updated["data"]["metadata"].get("tag") == marker:
+            print(f"[FAIL] Metadata of the second add was written to updated point {first_id}")
+            return False
+        
+        print(f"[OK] add -> update -> add stored a new point: {second_id}")
+        return True
+    except Exception as e:
+        print(f"[ERROR] dedup test failed with exception: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+    finally:
+        for vector_id in set(ids):
+            delete_vector(vector_id, soft_delete=False)
+
+
 def run_all_tests():
     """Run all QUADRANTDB tool tests"""
     print("="*60)
@@ -266,6 +317,9 @@ def run_all_tests():
     vector_id2 = test_add_vector()
     results["delete_vector_hard"] = test_delete_vector(vector_id2, soft_delete=False) if vector_id2 else False
     
+    # Test 8: add -> update -> add must not deduplicate against the updated point
+    results["dedup_after_update"] = test_dedup_after_update()
+    
     # Summary
     print("\n" + "="*60)
     print("Test Summary")
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Test the search batcher (lib/tools/search.py) against a stub store.
+
+No Qdrant or embedding model needed: the stub records the calls the batcher
+makes and can hold a search open to simulate a slow query.
+"""
+
+import sys
+import threading
+from concurrent.futures import Future
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from lib.tools.search import _SearchBatcher
+
+
+class StubStore:
+    """Answers hybrid_search / hybrid_search_batch with '<query>:<embedder>' results."""
+
+    def __init__(self):
+        self.calls = []
+        self.gates = {}  # query -> Event the search waits on before answering
+        self.started = {}  # query -> Event set once the search is running
+        self.fail_batch = False
+        self._lock = threading.Lock()
+
+    def hold(self, query):
+        self.gates[query] = threading.Event()
+        self.started[query] = threading.Event()
+
+    def _answer(self, query, embedder):
+        if query in self.gates:
+            self.started[query].set()
+            self.gates[query].wait(5)
+        return [f"{query}:{embedder}"]
+
+    def hybrid_search(self, query, embedder, top_k, filters=None, missing_as=None):
+        with self._lock:
+            self.calls.append(("single", [query], embedder, top_k, filters))
+        return self._answer(query, embedder)
+
+    def hybrid_search_batch(self, queries, embedder, top_k, filters=None, missing_as=None):
+        with self._lock:
+            self.calls.append(("batch", list(queries), embedder, top_k, filters))
+        if self.fail_batch:
+            raise RuntimeError("batch endpoint unavailable")
+        return [self._answer(query, embedder) for query in queries]
+
+
+def _search_in_thread(batcher, query, embedder, results):
+    def run():
+        try:
+            results[query] = batcher.search(query, embedder, 5, {})
+        except Exception as e:
+            results[query] = e
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread
+
+
+def _enqueue(batcher, query, embedder, top_k=5, filters=None):
+    """Queue a search without waiting (queued before the worker starts = drained together)"""
+    future = Future()
+    batcher._queue.put((query, (embedder, top_k, tuple(sorted((filters or {}).items()))), future))
+    return future
+
+
+def test_lone_search():
+    """A single search goes straight to hybrid_search"""
+    store = StubStore()
+    batcher = _SearchBatcher(store)
+    assert batcher.search("alpha", "doc", 5, {"language": "python"}) == ["alpha:doc"]
+    assert store.calls == [("single", ["alpha"], "doc", 5, {"language": "python"})]
+    return True
+
+
+def test_queued_searches_are_batched():
+    """Searches queued together go out in one hybrid_search_batch call"""
+    store = StubStore()
+    batcher = _SearchBatcher(store)
+    futures = {q: _enqueue(batcher, q, "doc") for q in ("first", "second", "third")}
+    assert batcher.search("fourth", "doc", 5, {}) == ["fourth:doc"]
+
+    for query, future in futures.items():
+        assert future.result(5) == [f"{query}:doc"]
+    assert store.calls == [("batch", ["first", "second", "third", "fourth"], "doc", 5, {})]
+    return True
+
+
+def test_groups_run_concurrently():
+    """A slow group doesn't block a group with a different embedder"""
+    store = StubStore()
+    store.hold("slow")
+    batcher = _SearchBatcher(store)
+    results = {}
+    slow = _search_in_thread(batcher, "slow", "doc", results)
+    assert store.started["slow"].wait(5)
+
+    # Would wait behind "slow" if groups were searched one after another
+    assert batcher.search("fast", "code", 5, {}) == ["fast:code"]
+    assert "slow" not in results
+
+    store.gates["slow"].set()
+    slow.join(5)
+    assert results["slow"] == ["slow:doc"]
+    return True
+
+
+def test_different_filters_not_mixed():
+    """Queries with different embedder / top_k / filters are never sent in one batch"""
+    store = StubStore()
+    batcher = _SearchBatcher(store)
+    futures = {
+        "py1": _enqueue(batcher, "py1", "doc", filters={"language": "python"}),
+        "ts": _enqueue(batcher, "ts", "doc", filters={"language": "typescript"}),
+        "top3": _enqueue(batcher, "top3", "doc", top_k=3),
+        "code": _enqueue(batcher, "code", "code"),
+    }
+    assert batcher.search("py2", "doc", 5, {"language": "python"}) == ["py2:doc"]
+
+    for query, future in futures.items():
+        assert future.result(5)[0].startswith(f"{query}:")
+    groups = sorted((kind, queries) for kind, queries, _, _, _ in store.calls)
+    assert groups == [
+        ("batch", ["py1", "py2"]),
+        ("single", ["code"]),
+        ("single", ["top3"]),
+        ("single", ["ts"]),
+    ], groups
+    return True
+
+
+def test_batch_failure_falls_back():
+    """If hybrid_search_batch fails, each query is searched on its own"""
+    store = StubStore()
+    store.fail_batch = True
+    batcher = _SearchBatcher(store)
+    future = _enqueue(batcher, "a", "doc")
+    assert batcher.search("b", "doc", 5, {}) == ["b:doc"]
+
+    assert future.result(5) == ["a:doc"]
+    assert [kind for kind, *_ in store.calls] == ["batch", "single", "single"]
+    return True
+
+
+def test_timeout():
+    """A caller gets TimeoutError instead of waiting forever on a stuck search"""
+    store = StubStore()
+    store.hold("stuck")
+    batcher = _SearchBatcher(store, timeout=0.2)
+    try:
+        batcher.search("stuck", "doc", 5, {})
+    except TimeoutError:
+        pass
+    else:
+        raise AssertionError("expected TimeoutError")
+    finally:
+        store.gates["stuck"].set()
+
+    # The batcher keeps serving after a timeout
+    assert batcher.search("next", "doc", 5, {}) == ["next:doc"]
+    return True
+
+
+def main():
+    """Run all batcher tests"""
+    print("\n" + "="*60)
+    print("SEARCH BATCHER TESTS")
+    print("="*60)
+
+    tests = [
+        ("Lone search", test_lone_search),
+        ("Queued searches batched", test_queued_searches_are_batched),
+        ("Groups run concurrently", test_groups_run_concurrently),
+        ("Different filters not mixed", test_different_filters_not_mixed),
+        ("Batch failure fallback", test_batch_failure_falls_back),
+        ("Timeout", test_timeout),
+    ]
+    passed = 0
+    for name, test in tests:
+        try:
+            test()
+            print(f"   [PASS]: {name}")
+            passed += 1
+        except Exception as e:
+            print(f"   [FAIL]: {name}: {e!r}")
+
+    print(f"\n   Results: {passed}/{len(tests)} tests passed")
+    return 0 if passed == len(tests) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())